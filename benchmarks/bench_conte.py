@@ -0,0 +1,63 @@
+"""Benchmark: parse_conte on contes with thousands of scenes.
+
+Usage:
+    python benchmarks/bench_conte.py [--scenes 1000,2000,4000,8000]
+
+Each size is parsed with a cold cache and then again with a warm one.
+Exits non-zero if cold parse time grows faster than linearly.
+"""
+
+import argparse
+import sys
+import time
+import warnings
+
+from oslo import conte
+
+SCALING_TOLERANCE = 2.0
+
+
+def _make_conte(n_scenes: int) -> str:
+    blocks = [
+        f"## シーン {i}\n"
+        f"**映像**: 国会議事堂の外観、夕暮れ時の荘厳な雰囲気 {i}\n"
+        f"**ナレーション**: 中道勢力の結集を掲げて新党が発足しました。シーン{i}です。\n"
+        f"**数字**: {i}万人\n"
+        for i in range(1, n_scenes + 1)
+    ]
+    return "# ベンチマーク\n\n**フック**: テスト\n\n" + "\n".join(blocks) + "\n## 説明\n本文\n"
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scenes", default="1000,2000,4000,8000")
+    args = parser.parse_args()
+    sizes = [int(s) for s in args.scenes.split(",")]
+
+    print(f"{'scenes':>7} {'cold':>9} {'warm':>9}")
+    timings = []
+    for n in sizes:
+        text = _make_conte(n)
+        conte._parse_cache.clear()
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            start = time.perf_counter()
+            conte.parse_conte(text)
+            conte.parse_conte_title(text)
+            conte.parse_conte_hook(text)
+            cold = time.perf_counter() - start
+            start = time.perf_counter()
+            conte.parse_conte(text)
+            warm = time.perf_counter() - start
+        timings.append((n, cold))
+        print(f"{n:>7} {cold * 1000:>7.1f}ms {warm * 1000:>7.1f}ms")
+
+    (n_small, t_small), (n_large, t_large) = timings[0], timings[-1]
+    growth = t_large / max(t_small, 1e-9)
+    limit = (n_large / n_small) * SCALING_TOLERANCE
+    print(f"growth x{growth:.1f} for x{n_large / n_small:g} scenes (limit x{limit:g})")
+    return 0 if growth <= limit else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
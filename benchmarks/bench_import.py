@@ -0,0 +1,83 @@
+"""Benchmark: module import time of cheap CLI commands.
+
+Usage:
+    python benchmarks/bench_import.py [--budget-ms 300] [--conte contes/001_....md]
+
+Runs each command in a fresh interpreter under ``python -X importtime``,
+sums the self time of every imported module and lists any heavy
+third-party package (openai, moviepy, ...) the command pulled in. Exits
+with status 1 if a command exceeds the budget or imports a heavy package,
+so it can run in CI.
+"""
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+# Packages only the commands that call an API or render video may import
+HEAVY_MODULES = ("openai", "moviepy", "pydub", "PIL", "numpy", "google", "httpx")
+_IMPORT_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)")
+_RUN_CLI = "import sys; from oslo.cli import main; sys.argv[0] = 'oslo'; main()"
+
+
+def measure(args: list[str], env: dict[str, str]) -> tuple[float, dict[str, float]]:
+    """Return (total import ms, {heavy package: cumulative ms}) for one command."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _RUN_CLI, *args],
+        capture_output=True,
+        text=True,
+        env=env,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"oslo {' '.join(args)} failed:\n{proc.stdout}{proc.stderr}")
+    total_us = 0
+    heavy: dict[str, float] = {}
+    for line in proc.stderr.splitlines():
+        m = _IMPORT_LINE.match(line)
+        if not m:
+            continue
+        total_us += int(m[1])
+        name = m[4]
+        if name in HEAVY_MODULES:
+            heavy[name] = int(m[2]) / 1000
+    return total_us / 1000, heavy
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--budget-ms", type=float, default=300.0)
+    parser.add_argument("--conte", type=Path, help="conte file for `oslo check`")
+    args = parser.parse_args()
+
+    conte = args.conte or next(iter(sorted(Path("contes").glob("*.md"))), None)
+    commands = [
+        ["--version"],
+        ["--help"],
+        ["profile", "list"],
+        ["library", "list"],
+        ["store", "info"],
+    ]
+    if conte is not None:
+        commands.append(["check", str(conte)])
+
+    failed = False
+    with tempfile.TemporaryDirectory() as tmp:
+        # Keep `store info` and cache writes out of the real cache directory
+        env = {**os.environ, "OSLO_CACHE_DIR": str(Path(tmp) / "cache")}
+        print(f"{'command':<40} {'imports':>9}  heavy")
+        for command in commands:
+            total_ms, heavy = measure(command, env)
+            over = total_ms > args.budget_ms
+            failed |= over or bool(heavy)
+            heavy_text = ", ".join(f"{n} ({ms:.0f}ms)" for n, ms in heavy.items()) or "-"
+            flag = "  OVER BUDGET" if over else ""
+            print(f"{'oslo ' + ' '.join(command):<40} {total_ms:>7.0f}ms  {heavy_text}{flag}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
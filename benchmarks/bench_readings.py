@@ -0,0 +1,89 @@
+"""Benchmark: compiled readings trie vs. the per-entry str.replace loop.
+
+Usage:
+    python benchmarks/bench_readings.py [--sizes 100,1000,10000,50000]
+
+For each dictionary size, applies the dictionary to a ~2,000 character
+narration with both approaches and reports the time per application. Also
+times a cold YAML load against a warm load from the on-disk cache.
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import yaml
+
+from oslo.readings import ReadingsMatcher, load_layered_readings
+
+_KANJI = [chr(c) for c in range(0x4E00, 0x4E00 + 2000)]
+_KANA = [chr(c) for c in range(0x3042, 0x3094)]
+_NARRATION = "政治の世界では、多くの議員が新しい政策について議論を重ねています。" * 60
+
+
+def _make_dictionary(size: int, rng: random.Random) -> dict[str, str]:
+    readings: dict[str, str] = {}
+    while len(readings) < size:
+        key = "".join(rng.choices(_KANJI, k=rng.randint(2, 5)))
+        readings[key] = "".join(rng.choices(_KANA, k=len(key) * 2))
+    return readings
+
+
+def _replace_loop(text: str, readings: dict[str, str]) -> str:
+    for kanji, reading in readings.items():
+        text = text.replace(kanji, reading)
+    return text
+
+
+def _per_call(func, *args, repeat: int = 5) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func(*args)
+    return (time.perf_counter() - start) / repeat
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="100,1000,10000,50000")
+    args = parser.parse_args()
+    sizes = [int(s) for s in args.sizes.split(",")]
+    rng = random.Random(0)
+
+    # Sprinkle some dictionary keys into the text so there are matches
+    print(f"{'entries':>8} {'loop':>10} {'trie':>10} {'speedup':>8} {'yaml':>8} {'cached':>8}")
+    for size in sizes:
+        readings = _make_dictionary(size, rng)
+        keys = list(readings)[:50]
+        text = _NARRATION + "".join(keys)
+
+        matcher = ReadingsMatcher(readings)
+        assert matcher.apply(text).count(keys[0]) == 0
+        t_loop = _per_call(_replace_loop, text, readings)
+        t_trie = _per_call(matcher.apply, text)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            os.environ["OSLO_CACHE_DIR"] = str(Path(tmp) / "cache")
+            path = Path(tmp) / "readings.yml"
+            path.write_text(
+                yaml.dump({"人名": readings}, allow_unicode=True), encoding="utf-8"
+            )
+            start = time.perf_counter()
+            load_layered_readings([path])
+            t_cold = time.perf_counter() - start
+            start = time.perf_counter()
+            load_layered_readings([path])
+            t_warm = time.perf_counter() - start
+
+        print(
+            f"{size:>8} {t_loop * 1000:>8.2f}ms {t_trie * 1000:>8.2f}ms "
+            f"{t_loop / t_trie:>7.1f}x {t_cold:>7.2f}s {t_warm:>7.3f}s"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,83 @@
+"""Benchmark: text analysis and scene splitting on multi-megabyte inputs.
+
+Usage:
+    python benchmarks/bench_text_processor.py [--sizes 1,2,4,8]
+
+Prints seconds and MB/s per input size for each stage and exits non-zero if
+the largest input takes disproportionally longer than the smallest one
+(i.e. scaling is worse than linear).
+"""
+
+import argparse
+import sys
+import time
+
+from oslo.text_processor import (
+    _merge_short_segments,
+    _split_into_sentences,
+    analyze_text,
+    split_into_scenes,
+)
+
+_JA_SENTENCE = "人工知能の急速な発展により、私たちの働き方は大きく変わろうとしています。"
+_EN_SENTENCE = "Artificial intelligence is changing the way we work every day. "
+
+# Allowed slack on top of linear growth before the run is flagged
+SCALING_TOLERANCE = 2.0
+
+
+def _make_text(sentence: str, megabytes: float) -> str:
+    target = int(megabytes * 1024 * 1024)
+    unit = len(sentence.encode("utf-8"))
+    paragraph = sentence * 4 + "\n\n"
+    return paragraph * max(1, target // (unit * 4))
+
+
+def _timed(func, *args, **kwargs) -> float:
+    analyze_text.cache_clear()
+    start = time.perf_counter()
+    func(*args, **kwargs)
+    return time.perf_counter() - start
+
+
+def _run(label: str, sentence: str, sizes: list[float]) -> bool:
+    print(f"\n{label}")
+    print(f"  {'MB':>5} {'analyze':>9} {'merge':>9} {'split':>9}   MB/s (split)")
+    results = []
+    for mb in sizes:
+        text = _make_text(sentence, mb)
+        sentences = _split_into_sentences(text)
+        t_analyze = _timed(analyze_text, text)
+        t_merge = _timed(_merge_short_segments, sentences)
+        t_split = _timed(split_into_scenes, text, max_duration=float("inf"))
+        results.append((mb, t_analyze + t_merge + t_split))
+        print(
+            f"  {mb:>5g} {t_analyze:>8.3f}s {t_merge:>8.3f}s {t_split:>8.3f}s"
+            f"   {mb / t_split:>8.1f}"
+        )
+
+    (mb_small, t_small), (mb_large, t_large) = results[0], results[-1]
+    growth = t_large / max(t_small, 1e-9)
+    limit = (mb_large / mb_small) * SCALING_TOLERANCE
+    ok = growth <= limit
+    print(f"  growth x{growth:.1f} for x{mb_large / mb_small:g} input (limit x{limit:g})")
+    return ok
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="1,2,4,8", help="Input sizes in MB")
+    args = parser.parse_args()
+    sizes = [float(s) for s in args.sizes.split(",")]
+
+    ok = _run("Japanese", _JA_SENTENCE, sizes)
+    ok = _run("English", _EN_SENTENCE, sizes) and ok
+    if not ok:
+        print("\nFAIL: scaling is worse than linear")
+        return 1
+    print("\nOK: linear scaling")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
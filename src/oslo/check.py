@@ -0,0 +1,183 @@
+"""Offline pre-flight validation of contes: parse, resolve, estimate, cost."""
+
+from __future__ import annotations
+
+import os
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from oslo.config import ImageGenConfig, LibraryConfig, TTSConfig, VideoConfig
+from oslo.text_processor import DEFAULT_RATE, SpeakingRate, estimate_duration
+
+# Approximate list prices in USD, used for estimates only
+TTS_COST_PER_MINUTE = {"gpt-4o-mini-tts": 0.015}
+DEFAULT_TTS_COST_PER_MINUTE = 0.015
+OPENAI_IMAGE_COST = {"low": 0.016, "medium": 0.063, "high": 0.25}
+GEMINI_IMAGE_COST = {"gemini-3-pro-image-preview": 0.134, "gemini-2.5-flash-image": 0.039}
+DEFAULT_GEMINI_IMAGE_COST = 0.134
+
+# Typical wall-clock seconds per API call, for time estimates
+TTS_SECONDS_PER_CALL = 4.0
+IMAGE_SECONDS_PER_CALL = {"openai": 30.0, "gemini": 20.0}
+
+
+@dataclass(frozen=True)
+class CheckSettings:
+    """Generation settings a conte is checked against."""
+
+    video: VideoConfig = field(default_factory=VideoConfig)
+    tts: TTSConfig = field(default_factory=TTSConfig)
+    image_gen: ImageGenConfig = field(default_factory=ImageGenConfig)
+    library: LibraryConfig = field(default_factory=LibraryConfig)
+    rate: SpeakingRate = DEFAULT_RATE
+    profile_name: str | None = None
+    library_dir: Path | None = None
+
+
+@dataclass
+class ConteReport:
+    """Result of checking one conte file."""
+
+    path: Path
+    title: str | None = None
+    is_conte: bool = True
+    scenes: int = 0
+    tts_calls: int = 0
+    image_calls: int = 0
+    library_images: int = 0
+    auto_matched: int = 0  # library images assigned by text similarity
+    readings_applied: int = 0
+    predicted_duration: float = 0.0
+    cost: float = 0.0
+    api_seconds: float = 0.0
+    errors: list[str] = field(default_factory=list)
+    warnings: list[str] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+
+def image_cost(config: ImageGenConfig) -> float:
+    """Approximate cost in USD of one generated image."""
+    if config.provider == "openai":
+        return OPENAI_IMAGE_COST.get(config.quality, OPENAI_IMAGE_COST["medium"])
+    return GEMINI_IMAGE_COST.get(config.model, DEFAULT_GEMINI_IMAGE_COST)
+
+
+def tts_cost(config: TTSConfig, seconds: float) -> float:
+    """Approximate cost in USD of `seconds` of synthesized narration."""
+    per_minute = TTS_COST_PER_MINUTE.get(config.model, DEFAULT_TTS_COST_PER_MINUTE)
+    return per_minute * seconds / 60.0
+
+
+def check_conte(path: Path, settings: CheckSettings) -> ConteReport:
+    """Validate one conte without any network access."""
+    from oslo.conte import (
+        FIELD_LIBRARY_IMAGE,
+        FIELD_NARRATION,
+        parse_conte,
+        parse_conte_document,
+    )
+    from oslo.image_matcher import assign_library_images
+    from oslo.library import resolve_image_path
+    from oslo.readings import find_readings_files, load_layered_readings
+    from oslo.tts import tts_request_count
+
+    report = ConteReport(path=path)
+    try:
+        text = path.read_text(encoding="utf-8")
+    except (OSError, UnicodeDecodeError) as e:
+        report.errors.append(f"cannot read file: {e}")
+        return report
+
+    doc = parse_conte_document(text)
+    report.title = doc.title.value if doc.title else None
+    if not doc.scenes:
+        report.is_conte = False
+        return report
+    report.scenes = len(doc.scenes)
+
+    for node in doc.scenes:
+        if node.value(FIELD_NARRATION) is None:
+            report.errors.append(
+                f"scene {node.number} (line {node.line}): narration is missing or empty"
+            )
+    if report.errors:
+        return report
+    for node in doc.scenes:
+        slug = node.value(FIELD_LIBRARY_IMAGE)
+        if slug:
+            try:
+                resolve_image_path(slug, settings.library_dir)
+            except (FileNotFoundError, ValueError) as e:
+                report.errors.append(f"scene {node.number} (line {node.line}): {e}")
+
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        scenes = parse_conte(text)
+    report.warnings.extend(str(w.message) for w in caught)
+
+    readings = load_layered_readings(find_readings_files(path, settings.profile_name))
+    for scene in scenes:
+        if readings:
+            scene.tts_text = readings.apply(scene.narration_text)
+            if scene.tts_text != scene.narration_text:
+                report.readings_applied += 1
+
+    report.predicted_duration = sum(estimate_duration(s.tts_text, settings.rate) for s in scenes)
+    if report.predicted_duration > settings.video.max_duration:
+        report.errors.append(
+            f"predicted duration {report.predicted_duration:.0f}s exceeds "
+            f"max {settings.video.max_duration:.0f}s"
+        )
+    elif report.predicted_duration < settings.video.min_duration:
+        report.warnings.append(
+            f"predicted duration {report.predicted_duration:.0f}s is under "
+            f"min {settings.video.min_duration:.0f}s"
+        )
+
+    if settings.library.auto_match:
+        report.auto_matched = len(
+            assign_library_images(
+                scenes, settings.library_dir, threshold=settings.library.match_threshold
+            )
+        )
+    report.library_images = sum(1 for s in scenes if s.library_image)
+    report.image_calls = len(scenes) - report.library_images
+    report.tts_calls = tts_request_count(scenes, settings.tts)
+    report.cost = tts_cost(settings.tts, report.predicted_duration) + report.image_calls * (
+        image_cost(settings.image_gen)
+    )
+    report.api_seconds = report.tts_calls * TTS_SECONDS_PER_CALL + report.image_calls * (
+        IMAGE_SECONDS_PER_CALL.get(settings.image_gen.provider, 30.0)
+    )
+    return report
+
+
+def collect_conte_paths(paths: list[Path]) -> list[Path]:
+    """Expand directories into their *.md files (research notes excluded)."""
+    result: list[Path] = []
+    for path in paths:
+        if path.is_dir():
+            result.extend(
+                p for p in sorted(path.glob("*.md")) if not p.name.endswith(".research.md")
+            )
+        else:
+            result.append(path)
+    return result
+
+
+def check_contes(
+    paths: list[Path], settings: CheckSettings, jobs: int | None = None
+) -> list[ConteReport]:
+    """Check contes in parallel worker processes, preserving input order."""
+    if not paths:
+        return []
+    jobs = jobs or os.cpu_count() or 1
+    if jobs == 1 or len(paths) == 1:
+        return [check_conte(p, settings) for p in paths]
+    with ProcessPoolExecutor(max_workers=min(jobs, len(paths))) as pool:
+        return list(pool.map(check_conte, paths, [settings] * len(paths)))
@@ -4,8 +4,6 @@ from pathlib import Path
 
 import click
 
-from oslo.config import load_config
-
 
 @click.group()
 @click.version_option(package_name="oslo")
@@ -47,6 +45,113 @@ def main():
     default=None,
     help="Image generation provider (default: gemini)",
 )
+@click.option(
+    "--tts-single-request/--tts-per-scene",
+    "tts_single_request",
+    default=None,
+    help="Synthesize all narration in one TTS request and split scenes by pauses",
+)
+@click.option(
+    "--auto-library/--no-auto-library",
+    "auto_library",
+    default=None,
+    help="Use matching library images instead of generating them (default: off)",
+)
+@click.option(
+    "--promote-images/--no-promote-images",
+    "promote_images",
+    default=None,
+    help="Add generated images to the library (with prompt provenance) for reuse",
+)
+@click.option(
+    "--no-store",
+    is_flag=True,
+    default=False,
+    help="Don't keep artifacts in the shared artifact store",
+)
+@click.option(
+    "--max-concurrency",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Upper bound on parallel API calls per provider (adapts below it; default 8)",
+)
+@click.option(
+    "--min-concurrency",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Lower bound the adaptive limit never drops below on errors (default 1)",
+)
+@click.option(
+    "--hedge-images",
+    type=click.Choice(["same", "other"]),
+    default=None,
+    help="Send a backup image request when one runs past its usual latency, "
+    "to the same or the other provider; the first to finish wins",
+)
+@click.option(
+    "--max-hedges",
+    type=click.IntRange(min=0),
+    default=None,
+    help="Backup image requests allowed per run with --hedge-images (default 3)",
+)
+@click.option(
+    "--image-route",
+    type=click.Choice(["fastest", "cheapest", "deadline"]),
+    default=None,
+    help="Pick the image provider per scene from rolling latency/error/cost stats, "
+    "falling back to the other provider when one is degraded",
+)
+@click.option(
+    "--route-deadline",
+    type=click.FloatRange(min=0, min_open=True),
+    default=None,
+    help="Seconds per image for --image-route deadline (default 30)",
+)
+@click.option(
+    "--deadline",
+    type=click.FloatRange(min=0, min_open=True),
+    default=None,
+    help="Seconds from the first API call until all images must be ready; "
+    "late scenes get a local fallback background",
+)
+@click.option(
+    "--scene-deadline",
+    type=click.FloatRange(min=0, min_open=True),
+    default=None,
+    help="Seconds one scene's image may take before it gets a fallback background",
+)
+@click.option(
+    "--draft",
+    is_flag=True,
+    default=False,
+    help="Render with cheap draft images (low quality / faster model) and keep the "
+    "draft for --final",
+)
+@click.option(
+    "--final",
+    is_flag=True,
+    default=False,
+    help="Render from the draft, regenerating only approved scenes' images at high "
+    "quality and reusing narration, subtitles and other images",
+)
+@click.option(
+    "--approve",
+    type=str,
+    default=None,
+    help="With --final: scenes to approve, e.g. '1,3-5' or 'all' (adds to earlier approvals)",
+)
+@click.option(
+    "--record",
+    type=click.Path(dir_okay=False, path_type=Path),
+    default=None,
+    help="Record every TTS/image/vision response into this fixture archive (.zip)",
+)
+@click.option(
+    "--replay",
+    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+    default=None,
+    help="Answer provider calls from a recorded fixture archive, fully offline",
+)
 @click.option(
     "--keep-temp",
     is_flag=True,
@@ -64,10 +169,23 @@ def main():
 )
 def generate(
     input_file, output, voice, speed, max_duration, image_quality, image_provider,
-    keep_temp, verbose, yes, profile_name,
+    tts_single_request, auto_library, promote_images, no_store, max_concurrency, min_concurrency,
+    hedge_images, max_hedges, image_route, route_deadline, deadline, scene_deadline, draft, final,
+    approve, record, replay, keep_temp, verbose, yes, profile_name,
 ):
     """Generate a short video from a text file."""
-    from oslo.pipeline import generate_video
+    import contextlib
+
+    from oslo.pipeline import finalize_video, generate_video
+
+    if record and replay:
+        raise click.UsageError("--record and --replay cannot be used together")
+    if draft and final:
+        raise click.UsageError("--draft and --final cannot be used together")
+    if approve and not final:
+        raise click.UsageError("--approve requires --final")
+    if min_concurrency and max_concurrency and min_concurrency > max_concurrency:
+        raise click.UsageError("--min-concurrency cannot exceed --max-concurrency")
 
     profile_defaults = None
     if profile_name:
@@ -79,7 +197,9 @@ def generate(
             click.echo(f"Using profile: {profile_name}")
 
     if output is None:
-        output = input_file.with_suffix(".mp4")
+        output = input_file.with_suffix(".draft.mp4" if draft else ".mp4")
+
+    from oslo.config import load_config
 
     config = load_config(
         voice=voice,
@@ -87,20 +207,225 @@ def generate(
         max_duration=max_duration,
         image_quality=image_quality,
         image_provider=image_provider,
+        tts_single_request=tts_single_request,
+        auto_library=auto_library,
+        promote_images=promote_images,
+        use_store=False if no_store else None,
+        max_concurrency=max_concurrency,
+        min_concurrency=min_concurrency,
+        hedge_images=hedge_images,
+        max_hedges=max_hedges,
+        image_route=image_route,
+        route_deadline=route_deadline,
+        deadline=deadline,
+        scene_deadline=scene_deadline,
+        image_tier="draft" if draft else "final" if final else None,
         profile_defaults=profile_defaults,
+        require_api_keys=replay is None,
     )
 
-    generate_video(
-        input_file=input_file,
-        output_file=output,
-        config=config,
-        keep_temp=keep_temp,
-        verbose=verbose,
-        skip_confirm=yes,
-    )
+    fixtures = contextlib.nullcontext()
+    if record or replay:
+        from oslo.fixtures import use_fixtures
+
+        fixtures = use_fixtures(record or replay, "record" if record else "replay")
+
+    from oslo.fixtures import FixtureMissingError
+
+    with fixtures as archive:
+        try:
+            if final:
+                finalize_video(
+                    input_file=input_file,
+                    output_file=output,
+                    config=config,
+                    approve=approve,
+                    keep_temp=keep_temp,
+                    verbose=verbose,
+                    skip_confirm=yes,
+                    profile_name=profile_name,
+                )
+            else:
+                generate_video(
+                    input_file=input_file,
+                    output_file=output,
+                    config=config,
+                    keep_temp=keep_temp,
+                    verbose=verbose,
+                    skip_confirm=yes,
+                    profile_name=profile_name,
+                    draft=draft,
+                )
+        except FixtureMissingError as e:
+            raise click.ClickException(f"{e} (re-record with --record)") from e
+        if archive is not None:
+            if record:
+                click.echo(f"Recorded {archive.recorded} response(s) to {record}")
+            else:
+                click.echo(f"Replayed {archive.hits} response(s) from {replay}")
     click.echo(f"Video saved to {output}")
 
 
+@main.command()
+@click.argument("input_file", type=click.Path(exists=True, dir_okay=False, path_type=Path))
+@click.option(
+    "-o",
+    "--output-dir",
+    type=click.Path(file_okay=False, path_type=Path),
+    default=None,
+    help="Directory for part_NN.md contes. Defaults to <input_name>_series/",
+)
+@click.option(
+    "--max-duration",
+    type=float,
+    default=None,
+    help="Maximum duration per part in seconds (default 90)",
+)
+@click.option("--title", type=str, default=None, help="Series title (default: file name)")
+@click.option(
+    "--profile",
+    "profile_name",
+    type=str,
+    default=None,
+    help="Profile name for generation defaults (e.g., tiktok-politics)",
+)
+def series(input_file, output_dir, max_duration, title, profile_name):
+    """Split a long text file into a series of conte files, one per short."""
+    from oslo.rate_model import RateModel
+    from oslo.series import write_series
+
+    profile_defaults = None
+    if profile_name:
+        from oslo.profile import load_profile
+
+        profile_defaults = load_profile(profile_name).generation
+
+    from oslo.config import load_config
+
+    config = load_config(
+        max_duration=max_duration,
+        profile_defaults=profile_defaults,
+        require_api_keys=False,
+    )
+    rate = RateModel.load().rate_for(config.tts)
+
+    if output_dir is None:
+        output_dir = input_file.with_name(f"{input_file.stem}_series")
+
+    count = 0
+    for path in write_series(
+        input_file,
+        output_dir,
+        max_duration=config.video.max_duration,
+        rate=rate,
+        title=title,
+        image_style_prefix=config.image_style_prefix,
+    ):
+        count += 1
+        click.echo(f"  {path}")
+    click.echo(f"Wrote {count} part(s) to {output_dir}")
+    if count:
+        click.echo(f"Render with: for f in {output_dir}/part_*.md; do oslo generate \"$f\"; done")
+
+
+@main.command()
+@click.argument(
+    "paths", nargs=-1, required=True, type=click.Path(exists=True, path_type=Path)
+)
+@click.option("--max-duration", type=float, default=None, help="Maximum video duration")
+@click.option(
+    "--image-quality",
+    type=click.Choice(["low", "medium", "high"]),
+    default=None,
+    help="Image generation quality (OpenAI only)",
+)
+@click.option(
+    "--image-provider",
+    type=click.Choice(["openai", "gemini"]),
+    default=None,
+    help="Image generation provider (default: gemini)",
+)
+@click.option(
+    "--profile",
+    "profile_name",
+    type=str,
+    default=None,
+    help="Profile name for generation defaults (e.g., tiktok-politics)",
+)
+@click.option("-j", "--jobs", type=int, default=None, help="Parallel workers (default: CPUs)")
+@click.pass_context
+def check(ctx, paths, max_duration, image_quality, image_provider, profile_name, jobs):
+    """Validate contes offline and estimate API calls, cost and time."""
+    from oslo.check import CheckSettings, check_contes, collect_conte_paths
+    from oslo.rate_model import RateModel
+
+    profile_defaults = None
+    if profile_name:
+        from oslo.profile import load_profile
+
+        profile_defaults = load_profile(profile_name).generation
+
+    from oslo.config import load_config
+
+    config = load_config(
+        max_duration=max_duration,
+        image_quality=image_quality,
+        image_provider=image_provider,
+        profile_defaults=profile_defaults,
+        require_api_keys=False,
+    )
+    settings = CheckSettings(
+        video=config.video,
+        tts=config.tts,
+        image_gen=config.image_gen,
+        library=config.library,
+        rate=RateModel.load().rate_for(config.tts),
+        profile_name=profile_name,
+    )
+    reports = check_contes(collect_conte_paths(list(paths)), settings, jobs)
+    skipped = [r for r in reports if not r.is_conte]
+    reports = [r for r in reports if r.is_conte]
+    if not reports:
+        raise click.ClickException("No contes found")
+
+    name_width = max(24, *(len(r.path.name) for r in reports))
+    click.echo(
+        f"{'Conte':<{name_width}} {'Scenes':>6} {'Dur':>5} {'TTS':>4} {'Img':>4} "
+        f"{'Lib':>4} {'Cost':>7} {'Time':>6}  Status"
+    )
+    for r in reports:
+        status = "OK" if r.ok else f"ERROR ({len(r.errors)})"
+        click.echo(
+            f"{r.path.name:<{name_width}} {r.scenes:>6} {r.predicted_duration:>4.0f}s "
+            f"{r.tts_calls:>4} {r.image_calls:>4} {r.library_images:>4} "
+            f"{f'${r.cost:.2f}':>7} {r.api_seconds:>5.0f}s  {status}"
+        )
+    click.echo(
+        f"{'Total':<{name_width}} {sum(r.scenes for r in reports):>6} "
+        f"{sum(r.predicted_duration for r in reports):>4.0f}s "
+        f"{sum(r.tts_calls for r in reports):>4} {sum(r.image_calls for r in reports):>4} "
+        f"{sum(r.library_images for r in reports):>4} "
+        f"{f'${sum(r.cost for r in reports):.2f}':>7} "
+        f"{sum(r.api_seconds for r in reports):>5.0f}s"
+    )
+
+    for r in reports:
+        for msg in r.errors:
+            click.echo(f"  [-] {r.path}: {msg}")
+        for msg in r.warnings:
+            click.echo(f"  [!] {r.path}: {msg}")
+        if r.auto_matched:
+            click.echo(f"  [+] {r.path}: {r.auto_matched} scene(s) auto-matched to library images")
+    for r in skipped:
+        click.echo(f"  Skipped {r.path} (no scene headers)")
+
+    failed = sum(1 for r in reports if not r.ok)
+    if failed:
+        click.echo(f"{failed} of {len(reports)} conte(s) failed the check.")
+        ctx.exit(1)
+    click.echo(f"All {len(reports)} conte(s) passed.")
+
+
 @main.group()
 def profile():
     """Manage SNS account profiles."""
@@ -159,6 +484,8 @@ def profile_show(name):
             click.echo(f"    Image style:      {gen.image_style_prefix[:60]}...")
         if gen.max_duration is not None:
             click.echo(f"    Max duration:     {gen.max_duration}s")
+        if gen.tts_single_request is not None:
+            click.echo(f"    TTS single req:   {gen.tts_single_request}")
 
     if prof.content.tone or prof.content.target_audience or prof.content.guidelines:
         click.echo("  Content:")
@@ -259,8 +586,12 @@ def library():
 
 
 @library.command("add")
-@click.argument("image_path", type=click.Path(exists=True, path_type=Path))
-@click.option("--slug", type=str, default=None, help="カスタムスラッグ（省略時は自動連番）")
+@click.argument(
+    "image_paths", nargs=-1, required=True, type=click.Path(exists=True, path_type=Path)
+)
+@click.option(
+    "--slug", type=str, default=None, help="カスタムスラッグ（省略時は自動連番、画像1枚のみ）"
+)
 @click.option("--source", type=str, default="", help="出典・ソース")
 @click.option(
     "--skip-analysis",
@@ -268,18 +599,34 @@ def library():
     default=False,
     help="GPT-4o vision による自動メタデータ抽出をスキップ",
 )
-def library_add(image_path, slug, source, skip_analysis):
-    """画像をライブラリに追加する。"""
-    from oslo.library import add_image, analyze_image
+@click.option(
+    "--allow-duplicate",
+    is_flag=True,
+    default=False,
+    help="既存画像とほぼ同一（知覚ハッシュが近い）でも追加する",
+)
+@click.option(
+    "--concurrency",
+    "-j",
+    type=click.IntRange(1, 64),
+    default=8,
+    show_default=True,
+    help="同時に実行する画像分析の上限（429 やエラーが出ると自動で減らす）",
+)
+def library_add(image_paths, slug, source, skip_analysis, allow_duplicate, concurrency):
+    """画像をライブラリに追加する（複数ファイル・ディレクトリ指定可）。"""
+    from oslo.library import add_images, collect_image_paths
 
-    tags = ()
-    description = ""
+    files = collect_image_paths(image_paths)
+    if not files:
+        raise click.ClickException("追加できる画像が見つかりません")
+    if slug and len(files) > 1:
+        raise click.UsageError("--slug は画像1枚のときだけ指定できます")
 
+    api_key = None
     if not skip_analysis:
-        import json
         import os
 
-        import openai
         from dotenv import load_dotenv
 
         load_dotenv()
@@ -288,37 +635,81 @@ def library_add(image_path, slug, source, skip_analysis):
             raise click.ClickException(
                 "OPENAI_API_KEY が必要です（--skip-analysis でスキップ可能）"
             )
+        click.echo(f"画像を分析中... ({len(files)}枚, 同時最大 {concurrency})")
 
-        click.echo("画像を分析中...")
-        try:
-            result = analyze_image(api_key, image_path)
-            tags = tuple(result.get("tags", []))
-            description = result.get("description", "")
-            click.echo(f"  タグ: {', '.join(tags)}")
-            click.echo(f"  説明: {description}")
-        except (
-            json.JSONDecodeError, openai.APIError, openai.APIConnectionError,
-        ) as e:
-            click.echo(f"  分析に失敗しました: {e}")
-            click.echo("  空のメタデータで続行します。")
-
-    meta = add_image(
-        image_path,
-        slug=slug,
-        tags=tags,
-        description=description,
-        source=source,
-    )
-    click.echo(f"追加しました: {meta.slug} ({meta.path})")
+        from oslo.concurrency import configure
+        from oslo.config import ConcurrencyConfig
+
+        configure(
+            ConcurrencyConfig(
+                ceiling=concurrency, initial=min(ConcurrencyConfig.initial, concurrency)
+            )
+        )
+
+    def report(result):
+        name = result.source_path.name
+        if result.duplicates:
+            click.echo(f"  スキップ（重複）: {name} ≈ {', '.join(result.duplicates)}")
+        elif not result.added:
+            click.echo(f"  失敗: {name}: {result.error}")
+        else:
+            meta = result.meta
+            if result.error:
+                click.echo(f"  {name}: {result.error}（空のメタデータで続行）")
+            click.echo(f"追加しました: {meta.slug} ({meta.path})")
+            if meta.tags:
+                click.echo(f"  タグ: {', '.join(meta.tags)}")
+            if meta.description:
+                click.echo(f"  説明: {meta.description}")
+
+    try:
+        results = add_images(
+            files,
+            api_key=api_key,
+            source=source,
+            slug=slug,
+            concurrency=concurrency,
+            allow_duplicate=allow_duplicate,
+            on_result=report,
+        )
+    except ValueError as e:
+        raise click.ClickException(str(e)) from e
+
+    added = sum(1 for r in results if r.added)
+    skipped = sum(1 for r in results if r.duplicates)
+    if len(results) > 1:
+        click.echo(f"\n{added}/{len(results)} 枚を追加しました（重複スキップ {skipped}）")
+        if api_key:
+            from oslo.clients import connection_stats
+            from oslo.concurrency import limiter_stats
+
+            click.echo(f"  HTTP: {connection_stats().describe()}")
+            for stats in limiter_stats():
+                click.echo(f"  {stats.describe()}")
+    elif skipped:
+        raise click.ClickException("追加を中止しました（--allow-duplicate で強制追加）")
 
 
 @library.command("list")
 @click.option("--tag", type=str, default=None, help="タグでフィルタ")
-def library_list(tag):
+@click.option(
+    "--query",
+    "-q",
+    type=str,
+    default=None,
+    help='検索クエリ（例: \'政治 -夜\', \'tag:安倍* OR desc:会見\', \'source:unsplash\'）',
+)
+def library_list(tag, query):
     """ライブラリの画像一覧を表示する。"""
-    from oslo.library import list_images, search_images
+    from oslo.library import list_images, query_images, search_images
+    from oslo.library_query import QuerySyntaxError
 
-    if tag:
+    if query:
+        try:
+            images = query_images(query, tags=[tag] if tag else None)
+        except QuerySyntaxError as e:
+            raise click.BadParameter(str(e), param_hint="--query") from e
+    elif tag:
         images = search_images([tag])
     else:
         images = list_images()
@@ -334,6 +725,32 @@ def library_list(tag):
         click.echo(f"  {img.slug:<20} [{tags_str}]  {desc_str}")
 
 
+@library.command("dedupe")
+@click.option(
+    "--threshold",
+    type=click.IntRange(0, 64),
+    default=None,
+    help="同一とみなすハッシュ距離の上限（デフォルト: 6）",
+)
+def library_dedupe(threshold):
+    """ほぼ同一の画像のグループを表示する。"""
+    from oslo.imagehash import DUPLICATE_THRESHOLD
+    from oslo.library import find_duplicate_clusters
+
+    clusters = find_duplicate_clusters(
+        threshold=DUPLICATE_THRESHOLD if threshold is None else threshold
+    )
+    if not clusters:
+        click.echo("重複は見つかりませんでした。")
+        return
+
+    click.echo(f"Duplicate clusters ({len(clusters)}):")
+    for number, cluster in enumerate(clusters, start=1):
+        click.echo(f"  [{number}]")
+        for meta in cluster:
+            click.echo(f"    {meta.slug:<20} {meta.added:<10}  {meta.path.name}")
+
+
 @library.command("show")
 @click.argument("slug")
 def library_show(slug):
@@ -347,3 +764,244 @@ def library_show(slug):
     click.echo(f"  Description: {meta.description}")
     click.echo(f"  Source:      {meta.source}")
     click.echo(f"  Added:       {meta.added}")
+    if meta.phash:
+        click.echo(f"  PHash:       {meta.phash}")
+
+
+@main.group()
+def store():
+    """Inspect and clean the shared artifact store."""
+
+
+def _open_store():
+    from oslo.config import load_config
+    from oslo.store import ArtifactStore
+
+    config = load_config(require_api_keys=False)
+    return ArtifactStore.from_config(config.store)
+
+
+@store.command("info")
+def store_info():
+    """Show store location, size and recent runs."""
+    artifact_store = _open_store()
+    stats = artifact_store.stats()
+    quota = artifact_store.quota_bytes
+    click.echo(f"Store: {artifact_store.root}")
+    click.echo(f"  Blobs: {stats.blobs} ({stats.bytes / 1e6:.1f} MB)")
+    click.echo(f"  Quota: {quota / 1e6:.1f} MB" if quota is not None else "  Quota: none")
+    runs = artifact_store.list_refs("runs")
+    click.echo(f"  Runs:  {len(runs)}")
+    for name in runs[-5:]:
+        click.echo(f"    {name.removeprefix('runs/')}")
+
+
+@store.command("gc")
+@click.option("--quota", type=str, default=None, help="Evict down to this size (e.g. 2G)")
+def store_gc(quota):
+    """Evict least recently used artifacts that no run references."""
+    from oslo.utils import parse_size
+
+    artifact_store = _open_store()
+    try:
+        quota_bytes = parse_size(quota) if quota else None
+    except ValueError as e:
+        raise click.BadParameter(str(e), param_hint="--quota") from e
+    freed = artifact_store.evict(quota_bytes)
+    click.echo(f"Freed {freed / 1e6:.1f} MB")
+
+
+@main.command("fake-api")
+@click.option("--host", default="127.0.0.1", show_default=True)
+@click.option("--port", type=int, default=8089, show_default=True)
+@click.option(
+    "--latency",
+    "latencies",
+    multiple=True,
+    metavar="[ENDPOINT=]SPEC",
+    help="Response delay, e.g. 0.5, uniform:0.2,1.5 or images=lognormal:8,0.4 "
+    "(endpoints: speech, images, chat, gemini). Repeatable.",
+)
+@click.option(
+    "--error",
+    "errors",
+    multiple=True,
+    metavar="STATUS=RATE",
+    help="Answer this fraction of requests with an error, e.g. 429=0.05. Repeatable.",
+)
+@click.option("--rpm", type=click.IntRange(min=1), default=None, help="Requests per minute limit")
+@click.option("--quota", type=click.IntRange(min=0), default=None, help="Total successful requests")
+@click.option("--chunk-delay", type=float, default=0.0, help="Delay between streamed audio chunks")
+@click.option("--seed", type=int, default=None, help="Seed for latency and error sampling")
+def fake_api(host, port, latencies, errors, rpm, quota, chunk_delay, seed):
+    """Serve a local stand-in for the OpenAI and Gemini APIs for load testing."""
+    from oslo.fakeapi import ENDPOINTS, FakeAPIConfig, FakeAPIServer, Latency
+
+    latency = {}
+    for spec in latencies:
+        endpoint, sep, value = spec.rpartition("=")
+        endpoint = endpoint if sep else "default"
+        if endpoint not in (*ENDPOINTS, "default"):
+            raise click.BadParameter(f"Unknown endpoint: {endpoint}", param_hint="--latency")
+        try:
+            latency[endpoint] = Latency.parse(value)
+        except ValueError as e:
+            raise click.BadParameter(str(e), param_hint="--latency") from e
+    error_rates = {}
+    for spec in errors:
+        status, _, rate = spec.partition("=")
+        try:
+            error_rates[int(status)] = float(rate)
+        except ValueError as e:
+            raise click.BadParameter(f"Expected STATUS=RATE: {spec}", param_hint="--error") from e
+
+    config = FakeAPIConfig(
+        latency=latency,
+        errors=error_rates,
+        rpm=rpm,
+        quota=quota,
+        chunk_delay=chunk_delay,
+        seed=seed,
+    )
+    server = FakeAPIServer(config, host, port)
+    click.echo(f"Fake API listening on {server.url} (stats at {server.url}/stats)")
+    click.echo("Point oslo at it with:")
+    click.echo(f"  export OPENAI_BASE_URL={server.openai_base_url}")
+    click.echo(f"  export GOOGLE_GEMINI_BASE_URL={server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        for endpoint, counts in server.stats().items():
+            summary = ", ".join(f"{status}: {n}" for status, n in counts.items())
+            click.echo(f"  {endpoint:<7} {summary}")
+
+
+@main.command()
+@click.option("--host", default="127.0.0.1", show_default=True)
+@click.option("--port", type=int, default=8765, show_default=True)
+@click.option(
+    "--socket",
+    "socket_path",
+    type=click.Path(dir_okay=False, path_type=Path),
+    default=None,
+    help="Listen on a Unix socket instead of a TCP port",
+)
+@click.option(
+    "--workers",
+    "-j",
+    type=click.IntRange(1, 32),
+    default=2,
+    show_default=True,
+    help="Warm render worker processes",
+)
+@click.option(
+    "--state-dir",
+    type=click.Path(file_okay=False, path_type=Path),
+    default=None,
+    help="Where job inputs and videos are kept (default: the oslo cache)",
+)
+@click.option(
+    "--input-root",
+    type=click.Path(exists=True, file_okay=False, path_type=Path),
+    default=None,
+    help='Allow jobs to name an "input" file under this directory (default: text only)',
+)
+@click.option(
+    "--retention",
+    type=click.FloatRange(min=0),
+    default=24.0,
+    show_default=True,
+    help="Hours to keep finished videos before deleting them",
+)
+def serve(host, port, socket_path, workers, state_dir, input_root, retention):
+    """Run a render daemon with warm workers and a local job API."""
+    import signal
+
+    from oslo.serve import RenderDaemon, make_server
+
+    def stop(signum, frame):
+        raise KeyboardInterrupt
+
+    # Service managers stop daemons with SIGTERM; shut down the same way as Ctrl-C
+    signal.signal(signal.SIGTERM, stop)
+
+    daemon = RenderDaemon(
+        state_dir, workers=workers, input_root=input_root, retention=retention * 3600
+    )
+    click.echo(f"Starting {workers} worker(s)...")
+    daemon.start()
+    server = make_server(daemon, host, port, socket_path)
+    where = socket_path or f"http://{host}:{server.server_address[1]}"
+    click.echo(f"Accepting jobs on {where}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if socket_path:
+            socket_path.unlink(missing_ok=True)
+        daemon.shutdown()
+
+
+@main.command()
+@click.argument("input_file", type=click.Path(exists=True, dir_okay=False, path_type=Path))
+@click.option(
+    "-o",
+    "--output",
+    type=click.Path(path_type=Path),
+    default=None,
+    help="Where to save the video with --wait. Defaults to <input_name>.mp4",
+)
+@click.option("--profile", "profile_name", type=str, default=None, help="Profile name")
+@click.option("--priority", type=int, default=0, show_default=True, help="Higher runs first")
+@click.option("--server", "server_url", default="http://127.0.0.1:8765", show_default=True)
+@click.option(
+    "--socket",
+    "socket_path",
+    type=click.Path(dir_okay=False, path_type=Path),
+    default=None,
+    help="Talk to a daemon on a Unix socket",
+)
+@click.option("--wait", is_flag=True, default=False, help="Wait for the video and download it")
+def submit(input_file, output, profile_name, priority, server_url, socket_path, wait):
+    """Queue a text or conte file on a running `oslo serve` daemon."""
+    import time
+
+    import httpx
+
+    transport = httpx.HTTPTransport(uds=str(socket_path)) if socket_path else None
+    base_url = "http://oslo" if socket_path else server_url
+    with httpx.Client(base_url=base_url, transport=transport, timeout=30.0) as client:
+        try:
+            resp = client.post(
+                "/jobs",
+                json={
+                    "text": input_file.read_text(encoding="utf-8"),
+                    "filename": input_file.name,
+                    "profile": profile_name,
+                    "priority": priority,
+                },
+            )
+        except httpx.TransportError as e:
+            raise click.ClickException(f"Cannot reach oslo serve: {e}") from e
+        if resp.status_code != 201:
+            raise click.ClickException(resp.json().get("error", resp.text))
+        job = resp.json()
+        click.echo(f"Queued job {job['id']}")
+        if not wait:
+            return
+
+        while job["status"] in ("queued", "running"):
+            time.sleep(1.0)
+            job = client.get(f"/jobs/{job['id']}").json()
+        if job["status"] != "done":
+            raise click.ClickException(f"Job {job['status']}: {job.get('error', '')}")
+        output = output or input_file.with_suffix(".mp4")
+        with client.stream("GET", f"/jobs/{job['id']}/video") as video, open(output, "wb") as f:
+            for chunk in video.iter_bytes():
+                f.write(chunk)
+        click.echo(f"Video saved to {output} (rendered in {job['render_seconds']:.1f}s)")
@@ -0,0 +1,158 @@
+"""Process-wide API clients sharing one pooled HTTP connection pool.
+
+TTS, image generation and vision analysis all talk to a handful of API
+hosts. Routing them through a single httpx client keeps TLS connections
+alive between calls instead of handshaking for every request, and the
+SDK client objects themselves are built once per API key.
+"""
+
+from __future__ import annotations
+
+import importlib.util
+import os
+import threading
+from dataclasses import dataclass
+
+CONNECT_TIMEOUT = 10.0
+# Image generation regularly takes a minute or more per request
+READ_TIMEOUT = 300.0
+MAX_CONNECTIONS = 32
+MAX_KEEPALIVE_CONNECTIONS = 16
+KEEPALIVE_EXPIRY = 90.0
+
+
+@dataclass(frozen=True)
+class ConnectionStats:
+    requests: int
+    connections: int
+
+    @property
+    def reused(self) -> int:
+        """Requests served on an already open connection."""
+        return max(0, self.requests - self.connections)
+
+    def describe(self) -> str:
+        return (
+            f"{self.requests} request(s) over {self.connections} connection(s), "
+            f"{self.reused} reused"
+        )
+
+
+_lock = threading.Lock()
+_pid: int | None = None
+_http_client = None
+_openai_clients: dict[str, object] = {}
+_gemini_clients: dict[str, object] = {}
+_requests = 0
+_connections = 0
+
+
+def http2_available() -> bool:
+    """HTTP/2 needs the optional h2 package (pip install httpx[http2])."""
+    return importlib.util.find_spec("h2") is not None
+
+
+def _trace(event: str, info: dict) -> None:
+    global _connections
+    if event == "connection.connect_tcp.complete":
+        with _lock:
+            _connections += 1
+
+
+def _on_request(request) -> None:
+    global _requests
+    with _lock:
+        _requests += 1
+    request.extensions["trace"] = _trace
+
+
+def _check_fork() -> None:
+    # Pooled sockets must not be shared with a forked child; start afresh
+    global _pid, _http_client, _requests, _connections
+    if _pid != os.getpid():
+        _pid = os.getpid()
+        _http_client = None
+        _openai_clients.clear()
+        _gemini_clients.clear()
+        _requests = _connections = 0
+
+
+def _timeout():
+    import httpx
+
+    return httpx.Timeout(READ_TIMEOUT, connect=CONNECT_TIMEOUT)
+
+
+def get_http_client():
+    """Return the shared httpx client, creating it on first use."""
+    import httpx
+
+    global _http_client
+    with _lock:
+        _check_fork()
+        if _http_client is None:
+            _http_client = httpx.Client(
+                http2=http2_available(),
+                limits=httpx.Limits(
+                    max_connections=MAX_CONNECTIONS,
+                    max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+                    keepalive_expiry=KEEPALIVE_EXPIRY,
+                ),
+                timeout=_timeout(),
+                follow_redirects=True,
+                event_hooks={"request": [_on_request]},
+            )
+        return _http_client
+
+
+def get_openai_client(api_key: str):
+    """Return the OpenAI client for api_key, sharing the connection pool."""
+    from openai import OpenAI
+
+    http_client = get_http_client()
+    with _lock:
+        client = _openai_clients.get(api_key)
+        if client is None:
+            # The SDK passes its own default timeout on every request, which
+            # would override the pool's; give it the same one explicitly
+            client = OpenAI(api_key=api_key, http_client=http_client, timeout=_timeout())
+            _openai_clients[api_key] = client
+        return client
+
+
+def get_gemini_client(api_key: str):
+    """Return the Gemini client for api_key, sharing the connection pool."""
+    from google import genai
+    from google.genai import types
+
+    http_client = get_http_client()
+    with _lock:
+        client = _gemini_clients.get(api_key)
+        if client is None:
+            client = genai.Client(
+                api_key=api_key,
+                # Without a timeout here the SDK sends timeout=None per request,
+                # which disables the pool's timeout altogether
+                http_options=types.HttpOptions(
+                    httpx_client=http_client, timeout=int(READ_TIMEOUT * 1000)
+                ),
+            )
+            _gemini_clients[api_key] = client
+        return client
+
+
+def connection_stats() -> ConnectionStats:
+    with _lock:
+        return ConnectionStats(requests=_requests, connections=_connections)
+
+
+def close_clients() -> None:
+    """Close the shared pool and forget all clients (the next call reopens them)."""
+    global _http_client, _requests, _connections
+    with _lock:
+        if _http_client is not None and _pid == os.getpid():
+            _http_client.close()
+        _http_client = None
+        _openai_clients.clear()
+        _gemini_clients.clear()
+        _requests = _connections = 0
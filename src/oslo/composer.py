@@ -1,5 +1,6 @@
 """Video composition using MoviePy."""
 
+import functools
 import platform
 from pathlib import Path
 
@@ -41,8 +42,9 @@ TITLE_BG_COLOR = (230, 180, 0, 230)  # Near-opaque yellow/orange bar
 TITLE_Y_POSITION = 0.15  # 15% from top (below TikTok header)
 
 
+@functools.cache
 def _find_cjk_font() -> str | None:
-    """Find a CJK-capable font on the system."""
+    """Find a CJK-capable font on the system (looked up once per process)."""
     if platform.system() == "Darwin":
         candidates = [
             "/System/Library/Fonts/ヒラギノ角ゴシック W6.ttc",
@@ -0,0 +1,244 @@
+"""Adaptive per-provider concurrency limits (AIMD).
+
+Each provider ("openai-tts", "gemini-image", ...) has a window of
+requests allowed in flight. Until the first failure every success adds
+a slot (slow start, so a healthy provider reaches the ceiling quickly);
+after that a success adds 1/window, about one slot per full window of
+successes. A 429, 5xx or timeout halves the window, at most once per
+round trip: a failure of a request that started before the last cut
+reflects the old window and is ignored.
+Successes far slower than the fastest seen hold the window instead of
+growing it, so the limit stops climbing once the provider is queueing.
+
+A caller that gives up on a request (a deadline) cannot cancel the SDK
+call, but can abandon its slots: they are freed at once, and the
+abandoned work cannot take new ones, so retries stop too.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from oslo.config import ConcurrencyConfig
+from oslo.utils import RETRYABLE_ERRORS, classify_error
+
+DECREASE_FACTOR = 0.5
+# A success this many times slower than the fastest one does not grow the window
+SLOW_FACTOR = 3.0
+
+
+class RequestAbandoned(RuntimeError):
+    """Raised when abandoned work asks for a limiter slot (never retried)."""
+
+
+class Abandon:
+    """Token for work that may be given up on; see AdaptiveLimiter.slot()."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._releases: list[Callable[[], None]] = []
+        self.abandoned = False
+
+    def register(self, release: Callable[[], None]) -> bool:
+        """Call release() on abandon(); False if already abandoned."""
+        with self._lock:
+            if not self.abandoned:
+                self._releases.append(release)
+            return not self.abandoned
+
+    def abandon(self) -> None:
+        with self._lock:
+            self.abandoned = True
+            releases, self._releases = self._releases, []
+        for release in releases:
+            release()
+
+
+@dataclass(frozen=True)
+class LimiterStats:
+    name: str
+    window: float
+    peak_in_flight: int
+    successes: int
+    throttled: int
+    failures: int
+    mean_latency: float
+
+    def describe(self) -> str:
+        return (
+            f"{self.name}: window {self.window:.1f} (peak {self.peak_in_flight} in flight), "
+            f"{self.successes} ok, {self.throttled} throttled, {self.failures} failed, "
+            f"mean {self.mean_latency:.1f}s"
+        )
+
+
+class AdaptiveLimiter:
+    """Blocks callers while a provider's in-flight requests fill its window."""
+
+    def __init__(self, name: str, config: ConcurrencyConfig | None = None):
+        self.name = name
+        self._cond = threading.Condition()
+        self._in_flight = 0
+        self._peak = 0
+        self._successes = 0
+        self._throttled = 0
+        self._failures = 0
+        self._latency_total = 0.0
+        self._fastest: float | None = None
+        self._last_cut = 0.0
+        self.window: float | None = None
+        self.configure(config or ConcurrencyConfig())
+
+    def configure(self, config: ConcurrencyConfig) -> None:
+        """Apply bounds; a window learned so far is kept, clamped to them."""
+        with self._cond:
+            self.adaptive = config.adaptive
+            self.floor = max(1, config.floor)
+            self.ceiling = max(self.floor, config.ceiling)
+            if not self.adaptive:
+                window = self.ceiling
+            elif self.window is None:
+                window = config.initial
+            else:
+                window = self.window
+            self.window = float(min(max(window, self.floor), self.ceiling))
+            self._cond.notify_all()
+
+    @property
+    def limit(self) -> int:
+        return int(self.window)
+
+    def acquire(self) -> float:
+        """Wait for a free slot; returns the start time to pass to release()."""
+        with self._cond:
+            while self._in_flight >= self.limit:
+                self._cond.wait()
+            self._in_flight += 1
+            self._peak = max(self._peak, self._in_flight)
+            return time.monotonic()
+
+    def release(self, started: float, error: BaseException | None = None) -> None:
+        """Free a slot and adjust the window from the request's outcome."""
+        now = time.monotonic()
+        with self._cond:
+            self._in_flight -= 1
+            if error is None:
+                self._on_success(now - started)
+            else:
+                self._on_failure(classify_error(error), started, now)
+            self._cond.notify_all()
+
+    def _free(self) -> None:
+        """Give a slot back without feedback (its request was abandoned)."""
+        with self._cond:
+            self._in_flight -= 1
+            self._cond.notify_all()
+
+    @contextlib.contextmanager
+    def slot(self, abandon: Abandon | None = None):
+        """Hold a slot for the block.
+
+        With an Abandon token the slot is freed as soon as it is abandoned,
+        even while the block still runs; once abandoned, slot() raises
+        RequestAbandoned instead of waiting.
+        """
+        if abandon is not None and abandon.abandoned:
+            raise RequestAbandoned("request abandoned after its deadline")
+        started = self.acquire()
+        held = [True]
+        lock = threading.Lock()
+
+        def drop() -> bool:
+            with lock:
+                was_held, held[0] = held[0], False
+            return was_held
+
+        def on_abandon() -> None:
+            if drop():
+                self._free()
+
+        if abandon is not None and not abandon.register(on_abandon):
+            on_abandon()
+            raise RequestAbandoned("request abandoned after its deadline")
+        error: BaseException | None = None
+        try:
+            yield
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            if drop():
+                self.release(started, error)
+
+    def _on_success(self, latency: float) -> None:
+        self._successes += 1
+        self._latency_total += latency
+        if self._fastest is None or latency < self._fastest:
+            self._fastest = latency
+        if not self.adaptive or latency > SLOW_FACTOR * self._fastest:
+            return
+        step = 1.0 if not self._last_cut else 1.0 / self.window
+        self.window = min(self.ceiling, self.window + step)
+
+    def _on_failure(self, kind: str, started: float, now: float) -> None:
+        if kind == "rate_limit":
+            self._throttled += 1
+        else:
+            self._failures += 1
+        if not self.adaptive or kind not in RETRYABLE_ERRORS or started < self._last_cut:
+            return
+        self.window = max(self.floor, self.window * DECREASE_FACTOR)
+        self._last_cut = now
+
+    def stats(self) -> LimiterStats:
+        with self._cond:
+            return LimiterStats(
+                name=self.name,
+                window=self.window,
+                peak_in_flight=self._peak,
+                successes=self._successes,
+                throttled=self._throttled,
+                failures=self._failures,
+                mean_latency=self._latency_total / self._successes if self._successes else 0.0,
+            )
+
+
+_lock = threading.Lock()
+_config = ConcurrencyConfig()
+_limiters: dict[str, AdaptiveLimiter] = {}
+
+
+def configure(config: ConcurrencyConfig) -> None:
+    """Set bounds for all provider limiters, including ones already in use."""
+    global _config
+    with _lock:
+        _config = config
+        limiters = list(_limiters.values())
+    for limiter in limiters:
+        limiter.configure(config)
+
+
+def get_limiter(name: str) -> AdaptiveLimiter:
+    with _lock:
+        limiter = _limiters.get(name)
+        if limiter is None:
+            limiter = _limiters[name] = AdaptiveLimiter(name, _config)
+        return limiter
+
+
+def limiter_stats() -> list[LimiterStats]:
+    with _lock:
+        limiters = sorted(_limiters.values(), key=lambda lim: lim.name)
+    return [limiter.stats() for limiter in limiters]
+
+
+def reset_limiters() -> None:
+    """Forget all limiters and their stats (the next call starts fresh)."""
+    global _config
+    with _lock:
+        _limiters.clear()
+        _config = ConcurrencyConfig()
@@ -6,8 +6,6 @@ import os
 from dataclasses import dataclass, field
 from typing import TYPE_CHECKING
 
-from dotenv import load_dotenv
-
 if TYPE_CHECKING:
     from oslo.profile import GenerationDefaults
 
@@ -27,15 +25,73 @@ class TTSConfig:
     voice: str = "nova"
     speed: float = 1.0
     output_format: str = "mp3"
+    single_request: bool = False  # Synthesize all scenes at once, split by silence
+
+
+DEFAULT_IMAGE_MODELS = {"openai": "gpt-image-1", "gemini": "gemini-3-pro-image-preview"}
+# Cheaper models and OpenAI quality used for draft renders (--draft)
+DRAFT_IMAGE_MODELS = {"openai": "gpt-image-1", "gemini": "gemini-2.5-flash-image"}
+TIER_IMAGE_QUALITY = {"draft": "low", "final": "high"}
+
+
+@dataclass(frozen=True)
+class HedgeConfig:
+    enabled: bool = False  # Send a backup request when an image call runs long
+    target: str = "same"  # "same" provider, or "other" configured provider
+    percentile: float = 0.9  # Hedge once a request outlasts this latency percentile
+    min_samples: int = 4  # Latencies needed before the percentile is trusted
+    initial_delay: float = 30.0  # Hedge delay (seconds) until then
+    max_hedges: int = 3  # Backup requests allowed per run
+
+
+@dataclass(frozen=True)
+class RouterConfig:
+    enabled: bool = False  # Pick the image provider per scene from rolling stats
+    objective: str = "fastest"  # "fastest", "cheapest" or "deadline"
+    deadline: float = 30.0  # Seconds per image for the "deadline" objective
+    degraded_error_rate: float = 0.5  # Providers failing this often are tried last
 
 
 @dataclass(frozen=True)
 class ImageGenConfig:
     provider: str = "gemini"  # "openai" or "gemini"
-    model: str = "gemini-3-pro-image-preview"
+    model: str = DEFAULT_IMAGE_MODELS["gemini"]
     size: str = "1024x1536"  # OpenAI only
     quality: str = "medium"  # OpenAI only
     aspect_ratio: str = "9:16"  # Gemini only
+    hedge: HedgeConfig = field(default_factory=HedgeConfig)
+    routing: RouterConfig = field(default_factory=RouterConfig)
+
+
+@dataclass(frozen=True)
+class LibraryConfig:
+    auto_match: bool = False  # Assign library images to scenes by text similarity
+    match_threshold: float = 0.25  # Minimum TF-IDF cosine score for a match
+    promote_generated: bool = False  # Add generated scene images to the library
+
+
+DEFAULT_STORE_QUOTA = 5 << 30  # 5 GiB
+
+
+@dataclass(frozen=True)
+class StoreConfig:
+    enabled: bool = True  # Keep run artifacts in the shared content-addressed store
+    directory: str | None = None  # None: <cache dir>/store (env OSLO_STORE_DIR)
+    quota_bytes: int | None = DEFAULT_STORE_QUOTA  # env OSLO_STORE_QUOTA, e.g. "10G"
+
+
+@dataclass(frozen=True)
+class ConcurrencyConfig:
+    adaptive: bool = True  # Grow/shrink in-flight API calls per provider (AIMD)
+    initial: int = 2  # In-flight calls per provider before any feedback
+    floor: int = 1  # env OSLO_MIN_CONCURRENCY
+    ceiling: int = 8  # env OSLO_MAX_CONCURRENCY
+
+
+@dataclass(frozen=True)
+class DeadlineConfig:
+    run: float | None = None  # Seconds from the first API call until images must be ready
+    scene: float | None = None  # Seconds one scene's image may take
 
 
 DEFAULT_IMAGE_STYLE_PREFIX = (
@@ -51,6 +107,10 @@ class AppConfig:
     tts: TTSConfig = field(default_factory=TTSConfig)
     image_gen: ImageGenConfig = field(default_factory=ImageGenConfig)
     image_style_prefix: str = DEFAULT_IMAGE_STYLE_PREFIX
+    library: LibraryConfig = field(default_factory=LibraryConfig)
+    store: StoreConfig = field(default_factory=StoreConfig)
+    concurrency: ConcurrencyConfig = field(default_factory=ConcurrencyConfig)
+    deadline: DeadlineConfig = field(default_factory=DeadlineConfig)
 
 
 def load_config(
@@ -60,16 +120,36 @@ def load_config(
     max_duration: float | None = None,
     image_quality: str | None = None,
     image_provider: str | None = None,
+    tts_single_request: bool | None = None,
+    auto_library: bool | None = None,
+    promote_images: bool | None = None,
+    use_store: bool | None = None,
+    max_concurrency: int | None = None,
+    min_concurrency: int | None = None,
+    hedge_images: str | None = None,
+    max_hedges: int | None = None,
+    image_route: str | None = None,
+    route_deadline: float | None = None,
+    deadline: float | None = None,
+    scene_deadline: float | None = None,
+    image_tier: str | None = None,
     profile_defaults: GenerationDefaults | None = None,
+    require_api_keys: bool = True,
 ) -> AppConfig:
     """Load configuration from environment variables and apply CLI/profile overrides.
 
     Priority: CLI flags > profile defaults > code defaults.
+    image_tier ("draft" or "final") sets the image quality over the profile's;
+    only an explicit image_quality beats it. "draft" also switches to the
+    provider's cheaper model.
+    Offline commands pass require_api_keys=False to skip key validation.
     """
+    from dotenv import load_dotenv
+
     load_dotenv()
 
     openai_api_key = os.environ.get("OPENAI_API_KEY", "")
-    if not openai_api_key:
+    if not openai_api_key and require_api_keys:
         raise ValueError("OPENAI_API_KEY environment variable is required")
 
     google_api_key = os.environ.get("GOOGLE_API_KEY", "")
@@ -87,12 +167,17 @@ def load_config(
     resolved_image_quality = _resolve(image_quality, "image_quality")
     resolved_image_provider = _resolve(image_provider, "image_provider")
     resolved_style = _resolve(None, "image_style_prefix")
+    resolved_single_request = _resolve(tts_single_request, "tts_single_request")
+    resolved_auto_library = _resolve(auto_library, "auto_library")
+    resolved_promote_images = _resolve(promote_images, "promote_images")
 
     tts_kwargs: dict = {}
     if resolved_voice is not None:
         tts_kwargs["voice"] = resolved_voice
     if resolved_speed is not None:
         tts_kwargs["speed"] = resolved_speed
+    if resolved_single_request is not None:
+        tts_kwargs["single_request"] = resolved_single_request
 
     video_kwargs: dict = {}
     if resolved_max_duration is not None:
@@ -101,17 +186,39 @@ def load_config(
     image_kwargs: dict = {}
     if resolved_image_provider is not None:
         image_kwargs["provider"] = resolved_image_provider
-    if resolved_image_quality is not None:
+    # An explicit --image-quality beats the tier; the tier beats the profile
+    if image_quality is not None:
+        image_kwargs["quality"] = image_quality
+    elif image_tier is not None:
+        image_kwargs["quality"] = TIER_IMAGE_QUALITY[image_tier]
+    elif resolved_image_quality is not None:
         image_kwargs["quality"] = resolved_image_quality
+    if hedge_images is not None:
+        hedge_kwargs: dict = {"enabled": True, "target": hedge_images}
+        if max_hedges is not None:
+            hedge_kwargs["max_hedges"] = max_hedges
+        image_kwargs["hedge"] = HedgeConfig(**hedge_kwargs)
+    if image_route is not None:
+        route_kwargs: dict = {"enabled": True, "objective": image_route}
+        if route_deadline is not None:
+            route_kwargs["deadline"] = route_deadline
+        image_kwargs["routing"] = RouterConfig(**route_kwargs)
 
     # Set provider-appropriate model default when provider is explicitly set
     image_config = ImageGenConfig(**image_kwargs)
     if "provider" in image_kwargs and "model" not in image_kwargs:
         if image_config.provider == "openai":
-            image_config = ImageGenConfig(**{**image_kwargs, "model": "gpt-image-1"})
+            image_config = ImageGenConfig(
+                **{**image_kwargs, "model": DEFAULT_IMAGE_MODELS["openai"]}
+            )
+
+    if image_tier == "draft":
+        image_config = ImageGenConfig(
+            **{**image_kwargs, "model": DRAFT_IMAGE_MODELS[image_config.provider]}
+        )
 
     # Validate Google API key when using Gemini provider
-    if image_config.provider == "gemini" and not google_api_key:
+    if image_config.provider == "gemini" and not google_api_key and require_api_keys:
         raise ValueError(
             "GOOGLE_API_KEY environment variable is required when using Gemini image provider"
         )
@@ -120,11 +227,54 @@ def load_config(
     if resolved_style is not None:
         style_kwargs["image_style_prefix"] = resolved_style
 
+    library_kwargs: dict = {}
+    if resolved_auto_library is not None:
+        library_kwargs["auto_match"] = resolved_auto_library
+    if resolved_promote_images is not None:
+        library_kwargs["promote_generated"] = resolved_promote_images
+
+    store_kwargs: dict = {}
+    if use_store is not None:
+        store_kwargs["enabled"] = use_store
+    if os.environ.get("OSLO_STORE_DIR"):
+        store_kwargs["directory"] = os.environ["OSLO_STORE_DIR"]
+    if os.environ.get("OSLO_STORE_QUOTA"):
+        from oslo.utils import parse_size
+
+        store_kwargs["quota_bytes"] = parse_size(os.environ["OSLO_STORE_QUOTA"])
+
+    concurrency_kwargs: dict = {}
+    if max_concurrency is None and os.environ.get("OSLO_MAX_CONCURRENCY"):
+        max_concurrency = int(os.environ["OSLO_MAX_CONCURRENCY"])
+    if min_concurrency is None and os.environ.get("OSLO_MIN_CONCURRENCY"):
+        min_concurrency = int(os.environ["OSLO_MIN_CONCURRENCY"])
+    if max_concurrency is not None or min_concurrency is not None:
+        for name, value in (("Minimum", min_concurrency), ("Maximum", max_concurrency)):
+            if value is not None and value < 1:
+                raise ValueError(f"{name} concurrency must be at least 1")
+        floor = min_concurrency or ConcurrencyConfig.floor
+        ceiling = max_concurrency or ConcurrencyConfig.ceiling
+        if floor > ceiling:
+            raise ValueError(
+                f"Minimum concurrency ({floor}) exceeds maximum concurrency ({ceiling})"
+            )
+        concurrency_kwargs["floor"] = floor
+        concurrency_kwargs["ceiling"] = ceiling
+        concurrency_kwargs["initial"] = min(max(ConcurrencyConfig.initial, floor), ceiling)
+
+    for name, value in (("Deadline", deadline), ("Scene deadline", scene_deadline)):
+        if value is not None and value <= 0:
+            raise ValueError(f"{name} must be positive")
+
     return AppConfig(
         openai_api_key=openai_api_key,
         google_api_key=google_api_key,
         video=VideoConfig(**video_kwargs),
         tts=TTSConfig(**tts_kwargs),
         image_gen=image_config,
+        library=LibraryConfig(**library_kwargs),
+        store=StoreConfig(**store_kwargs),
+        concurrency=ConcurrencyConfig(**concurrency_kwargs),
+        deadline=DeadlineConfig(run=deadline, scene=scene_deadline),
         **style_kwargs,
     )
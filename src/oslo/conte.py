@@ -1,77 +1,206 @@
 """Conte (storyboard) Markdown parser."""
 
+import hashlib
 import re
 import warnings
+from collections import OrderedDict
+from dataclasses import dataclass
 
 from oslo.text_processor import IMAGE_STYLE_PREFIX, Scene, generate_image_prompt
 
-_SCENE_HEADER_PATTERN = re.compile(r"^##\s*(?:シーン|Scene)\b.*$", re.MULTILINE)
-_ANY_H2_PATTERN = re.compile(r"^##\s", re.MULTILINE)
-_VISUAL_PATTERN = re.compile(r"\*\*映像\*\*\s*[:：]\s*(.+?)(?=\n\*\*|$)", re.DOTALL)
-_NARRATION_PATTERN = re.compile(
-    r"\*\*ナレーション\*\*\s*[:：]\s*(.+?)(?=\n\*\*|$)",
-    re.DOTALL,
-)
-_STAT_PATTERN = re.compile(
-    r"\*\*数字\*\*\s*[:：]\s*(.+?)(?=\n\*\*|$)",
-    re.DOTALL,
-)
-_LIBRARY_IMAGE_PATTERN = re.compile(
-    r"\*\*画像\*\*\s*[:：]\s*(.+?)(?=\n\*\*|$)",
-    re.DOTALL,
-)
-_TITLE_PATTERN = re.compile(r"^#\s+(.+)$", re.MULTILINE)
-_HOOK_PATTERN = re.compile(
-    r"\*\*フック\*\*\s*[:：]\s*(.+?)(?=\n\*\*|\n##|$)",
-    re.DOTALL,
-)
+# Line-level tokens; headers are matched against the start of a single line,
+# field markers anywhere in it
+_SCENE_HEADER_PATTERN = re.compile(r"##\s*(?:シーン|Scene)\b")
+_TITLE_PATTERN = re.compile(r"#\s+(.+)")
+_FIELD_PATTERN = re.compile(r"\*\*([^*\n]+)\*\*\s*[:：]\s*")
+# What may precede a field marker without being text: indentation and a list bullet
+_LIST_MARKER_PATTERN = re.compile(r"\s*(?:[-*+]|\d+[.)])?\s*")
 _NO_TEXT_SUFFIX = "Do not include any text, words, or letters in the image."
 
+FIELD_VISUAL = "映像"
+FIELD_NARRATION = "ナレーション"
+FIELD_STAT = "数字"
+FIELD_LIBRARY_IMAGE = "画像"
+FIELD_HOOK = "フック"
+
+# Parsed documents kept in memory, keyed by content hash
+_PARSE_CACHE_SIZE = 64
+_parse_cache: OrderedDict[bytes, "ConteDocument"] = OrderedDict()
+
+
+@dataclass(frozen=True)
+class ConteField:
+    """A **名前**: value field. Line numbers are 1-based."""
+
+    name: str
+    value: str
+    line: int
+
+
+@dataclass(frozen=True)
+class ConteSceneNode:
+    """A ## シーン block and the fields inside it."""
+
+    number: int  # 1-based position among scenes
+    heading: str
+    line: int
+    fields: tuple[ConteField, ...] = ()
+
+    def field(self, name: str) -> ConteField | None:
+        """Return the first field with the given name, if any."""
+        for fld in self.fields:
+            if fld.name == name:
+                return fld
+        return None
+
+    def value(self, name: str) -> str | None:
+        """Return the stripped value of a field, or None if missing or empty."""
+        fld = self.field(name)
+        return fld.value if fld and fld.value else None
+
+
+@dataclass(frozen=True)
+class ConteDocument:
+    """Syntax tree of a conte: title, hook and scenes."""
+
+    title: ConteField | None = None
+    hook: ConteField | None = None
+    scenes: tuple[ConteSceneNode, ...] = ()
+
+
+def _is_h2(line: str) -> bool:
+    return line.startswith("##") and (len(line) == 2 or line[2].isspace())
+
+
+def _tokenize(text: str) -> ConteDocument:
+    """Build a ConteDocument in a single pass over the lines of text.
+
+    A field marker may follow a list bullet or other text on its line. Its
+    value runs to the next field marker, the next line starting with ``**``
+    or the end of the enclosing block; scene blocks end at the next ``##``
+    header of any kind.
+    """
+    title: ConteField | None = None
+    hook: ConteField | None = None
+    scenes: list[ConteSceneNode] = []
+
+    # State of the scene block and field being collected
+    scene_heading: str | None = None
+    scene_line = 0
+    fields: list[ConteField] = []
+    field_name: str | None = None
+    field_line = 0
+    field_lines: list[str] = []
+    seen_scene = False
+
+    def close_field() -> None:
+        nonlocal field_name, hook
+        if field_name is None:
+            return
+        value = "\n".join(field_lines).strip()
+        fld = ConteField(field_name, value, field_line)
+        if scene_heading is not None:
+            fields.append(fld)
+        elif field_name == FIELD_HOOK and hook is None and value:
+            hook = fld
+        field_name = None
+
+    def close_scene() -> None:
+        nonlocal scene_heading
+        close_field()
+        if scene_heading is not None:
+            scenes.append(
+                ConteSceneNode(len(scenes) + 1, scene_heading, scene_line, tuple(fields))
+            )
+            fields.clear()
+            scene_heading = None
+
+    for lineno, line in enumerate(text.split("\n"), start=1):
+        if title is None:
+            m = _TITLE_PATTERN.match(line)
+            if m:
+                title = ConteField("title", m.group(1).strip(), lineno)
+
+        if _SCENE_HEADER_PATTERN.match(line):
+            close_scene()
+            scene_heading = line.lstrip("#").strip()
+            scene_line = lineno
+            seen_scene = True
+            continue
+        if _is_h2(line):
+            close_scene()
+            continue
+
+        in_scene = scene_heading is not None
+        markers = list(_FIELD_PATTERN.finditer(line))
+        # Before the first scene only the hook is a field
+        if markers and (in_scene or not seen_scene):
+            lead = line[: markers[0].start()]
+            if field_name is not None and not _LIST_MARKER_PATTERN.fullmatch(lead):
+                field_lines.append(lead)
+            for m, following in zip(markers, markers[1:] + [None]):
+                close_field()
+                field_name = m.group(1).strip()
+                field_line = lineno
+                field_lines = [line[m.end() : following.start() if following else None]]
+            continue
+        if line.startswith("**"):
+            close_field()
+            continue
+        if field_name is not None:
+            field_lines.append(line)
+
+    close_scene()
+    close_field()
+    return ConteDocument(title=title, hook=hook, scenes=tuple(scenes))
+
+
+def parse_conte_document(text: str) -> ConteDocument:
+    """Parse conte markdown into a ConteDocument, cached by content hash."""
+    key = hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+    doc = _parse_cache.get(key)
+    if doc is not None:
+        _parse_cache.move_to_end(key)
+        return doc
+    doc = _tokenize(text)
+    _parse_cache[key] = doc
+    if len(_parse_cache) > _PARSE_CACHE_SIZE:
+        _parse_cache.popitem(last=False)
+    return doc
+
 
 def parse_conte_hook(text: str) -> str | None:
     """Extract hook text from conte (before first scene header)."""
-    first_scene = _SCENE_HEADER_PATTERN.search(text)
-    search_area = text[: first_scene.start()] if first_scene else text
-    match = _HOOK_PATTERN.search(search_area)
-    return match.group(1).strip() if match else None
+    hook = parse_conte_document(text).hook
+    return hook.value if hook else None
 
 
 def parse_conte_title(text: str) -> str | None:
     """Extract the title (first H1 heading) from conte markdown."""
-    match = _TITLE_PATTERN.search(text)
-    return match.group(1).strip() if match else None
+    title = parse_conte_document(text).title
+    return title.value if title else None
 
 
 def is_conte_format(text: str) -> bool:
     """Return True when the input has at least one conte scene header."""
-    return bool(_SCENE_HEADER_PATTERN.search(text))
+    return bool(parse_conte_document(text).scenes)
 
 
 def parse_conte(text: str, image_style_prefix: str | None = None) -> list[Scene]:
     """Parse conte markdown and return a list of Scene objects."""
     style_prefix = image_style_prefix or IMAGE_STYLE_PREFIX
-    matches = list(_SCENE_HEADER_PATTERN.finditer(text))
-    if not matches:
+    doc = parse_conte_document(text)
+    if not doc.scenes:
         raise ValueError("No scenes found in conte markdown")
 
-    # Use all ## headers as block boundaries (not just scene headers)
-    all_h2_starts = [m.start() for m in _ANY_H2_PATTERN.finditer(text)]
-
     scenes: list[Scene] = []
-    for i, match in enumerate(matches):
-        start = match.end()
-        # Find the next ## header of any kind after this scene header
-        end = len(text)
-        for h2_start in all_h2_starts:
-            if h2_start > match.start():
-                end = h2_start
-                break
-        block = text[start:end].strip()
-
-        narration_text = _extract_required_narration(block, i + 1)
-        visual_text = _extract_visual(block)
-        stat_overlay = _extract_stat_overlay(block)
-        library_image = _extract_library_image(block)
+    for i, node in enumerate(doc.scenes):
+        narration_text = node.value(FIELD_NARRATION)
+        if narration_text is None:
+            raise ValueError(f"Narration not found in scene {i + 1} (line {node.line})")
+        visual_text = node.value(FIELD_VISUAL)
+        stat_overlay = node.value(FIELD_STAT)
+        library_image = node.value(FIELD_LIBRARY_IMAGE)
 
         if stat_overlay is None:
             warnings.warn(
@@ -97,45 +226,24 @@ def parse_conte(text: str, image_style_prefix: str | None = None) -> list[Scene]
                 image_prompt=image_prompt,
                 stat_overlay=stat_overlay,
                 library_image=library_image,
+                visual_text=visual_text,
             )
         )
 
-    if not scenes:
-        raise ValueError("No scenes found in conte markdown")
-
     return scenes
 
 
-def _extract_stat_overlay(block: str) -> str | None:
-    """Extract stat overlay text from a single scene block."""
-    match = _STAT_PATTERN.search(block)
-    if not match:
-        return None
-    stat_text = match.group(1).strip()
-    return stat_text or None
-
-
-def _extract_visual(block: str) -> str | None:
-    """Extract visual description from a single scene block."""
-    match = _VISUAL_PATTERN.search(block)
-    if not match:
-        return None
-    visual_text = match.group(1).strip()
-    return visual_text or None
-
-
-def _extract_library_image(block: str) -> str | None:
-    """Extract library image slug from a scene block."""
-    match = _LIBRARY_IMAGE_PATTERN.search(block)
-    if not match:
-        return None
-    slug = match.group(1).strip()
-    return slug or None
-
-
-def _extract_required_narration(block: str, scene_number: int) -> str:
-    """Extract narration from a single scene block or raise ValueError."""
-    match = _NARRATION_PATTERN.search(block)
-    if not match or not match.group(1).strip():
-        raise ValueError(f"Narration not found in scene {scene_number}")
-    return match.group(1).strip()
+def render_conte(scenes: list[Scene], title: str | None = None) -> str:
+    """Render scenes back into conte markdown (title, narration and fields)."""
+    lines: list[str] = []
+    if title:
+        lines += [f"# {title}", ""]
+    for scene in scenes:
+        lines.append(f"## シーン {scene.index + 1}")
+        if scene.library_image:
+            lines.append(f"**画像**: {scene.library_image}")
+        lines.append(f"**ナレーション**: {scene.narration_text}")
+        if scene.stat_overlay:
+            lines.append(f"**数字**: {scene.stat_overlay}")
+        lines.append("")
+    return "\n".join(lines)
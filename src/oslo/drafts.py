@@ -0,0 +1,116 @@
+"""Draft/final workflow: cheap draft images first, upgrade only approved scenes.
+
+A draft run (`oslo generate --draft`) renders every image at draft quality
+and records a manifest as an artifact-store ref (drafts/<input>). The
+manifest names the blobs of each scene's narration audio and image, plus
+the subtitles, so they stay pinned in the store. A final run
+(`--final`) checks the narration and prompts against the manifest. It
+then regenerates only the approved scenes' images at final quality,
+reuses every other artifact untouched, and records the upgrades so later
+finals skip them.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from datetime import datetime
+from pathlib import Path
+
+from oslo.store import ArtifactStore
+from oslo.text_processor import Scene
+
+# Image tiers recorded per scene. Only "draft" and "fallback" images are
+# upgraded when a scene is approved; library photos are already final.
+DRAFT, FINAL, LIBRARY, FALLBACK = "draft", "final", "library", "fallback"
+
+
+def draft_ref_name(input_file: Path) -> str:
+    """Ref holding the draft manifest for an input file (stable per absolute path)."""
+    resolved = str(input_file.resolve())
+    return f"drafts/{input_file.stem}-{hashlib.sha256(resolved.encode()).hexdigest()[:8]}"
+
+
+def build_manifest(
+    input_file: Path,
+    output_file: Path,
+    scenes: list[Scene],
+    artifacts: dict,
+    tiers: list[str],
+    image_models: list[str | None],
+) -> dict:
+    """Manifest for a draft run; artifacts are the run's store digests."""
+    return {
+        "input": str(input_file),
+        "output": str(output_file),
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "scenes": [
+            {
+                "scene": scene.index + 1,
+                "narration": scene.narration_text,
+                "image_prompt": scene.image_prompt,
+                "library_image": scene.library_image,
+                "tier": tier,
+                "model": model,
+                "approved": False,
+            }
+            for scene, tier, model in zip(scenes, tiers, image_models)
+        ],
+        "artifacts": {
+            "audio": artifacts["audio"],
+            "images": artifacts["images"],
+            "subtitles": artifacts["subtitles"],
+        },
+    }
+
+
+def load_manifest(store: ArtifactStore, input_file: Path) -> dict | None:
+    return store.get_ref(draft_ref_name(input_file))
+
+
+def save_manifest(store: ArtifactStore, input_file: Path, manifest: dict) -> None:
+    store.set_ref(draft_ref_name(input_file), manifest)
+
+
+def parse_scene_numbers(spec: str, count: int) -> set[int]:
+    """Parse "all" or 1-based numbers and ranges ("1,3-5") into scene indices."""
+    if spec.strip().lower() == "all":
+        return set(range(count))
+    indices: set[int] = set()
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        first, sep, last = part.partition("-")
+        try:
+            start = int(first)
+            end = int(last) if sep else start
+        except ValueError:
+            raise ValueError(f"Invalid scene number: {part!r}") from None
+        if not 1 <= start <= end <= count:
+            raise ValueError(f"Scene {part} is out of range (1-{count})")
+        indices.update(range(start - 1, end))
+    return indices
+
+
+def check_scenes(manifest: dict, scenes: list[Scene]) -> None:
+    """Raise ValueError if the conte no longer matches the draft it came from."""
+    recorded = manifest["scenes"]
+    if len(recorded) != len(scenes):
+        raise ValueError(
+            f"The draft has {len(recorded)} scenes but the input now has {len(scenes)}"
+        )
+    for entry, scene in zip(recorded, scenes):
+        if (entry["narration"], entry["image_prompt"]) != (
+            scene.narration_text,
+            scene.image_prompt,
+        ):
+            raise ValueError(f"Scene {scene.index + 1} changed since the draft")
+
+
+def scenes_to_upgrade(manifest: dict) -> list[int]:
+    """Indices of approved scenes whose image is not final yet."""
+    return [
+        i
+        for i, entry in enumerate(manifest["scenes"])
+        if entry["approved"] and entry["tier"] in (DRAFT, FALLBACK)
+    ]
@@ -0,0 +1,370 @@
+"""Local stand-in for the OpenAI and Gemini endpoints oslo calls.
+
+Serves audio/speech (streamed silent MP3 or WAV), images/generations
+(b64_json PNG), chat/completions (image analysis JSON) and Gemini
+generateContent (inline PNG) with configurable latency, injected 429/5xx
+errors, a requests-per-minute limit and a total request quota. Point the
+SDKs at it with OPENAI_BASE_URL and GOOGLE_GEMINI_BASE_URL.
+"""
+
+from __future__ import annotations
+
+import base64
+import hashlib
+import io
+import json
+import math
+import random
+import re
+import struct
+import threading
+import time
+import wave
+import zlib
+from collections import Counter, deque
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ENDPOINTS = ("speech", "images", "chat", "gemini")
+
+_GEMINI_PATH = re.compile(r"/models/([^/:]+):generateContent$")
+# One MPEG-1 Layer III frame, 128 kbps, 44.1 kHz, mono. All-zero side
+# information decodes as 1152 samples of silence.
+_MP3_FRAME = b"\xff\xfb\x90\xc0" + bytes(413)
+_MP3_FRAME_SECONDS = 1152 / 44100
+# Rough Japanese narration pace used to size the fake audio
+_SECONDS_PER_CHAR = 0.12
+_STREAM_CHUNK = 4096
+
+
+@dataclass(frozen=True)
+class Latency:
+    """A response delay distribution, in seconds.
+
+    fixed: a; uniform: between a and b; lognormal: median a, sigma b.
+    """
+
+    kind: str = "fixed"
+    a: float = 0.0
+    b: float = 0.0
+
+    def sample(self, rng: random.Random) -> float:
+        if self.kind == "uniform":
+            return rng.uniform(self.a, self.b)
+        if self.kind == "lognormal":
+            return rng.lognormvariate(math.log(self.a), self.b) if self.a > 0 else 0.0
+        return self.a
+
+    @classmethod
+    def parse(cls, text: str) -> Latency:
+        """Parse "0.5", "fixed:0.5", "uniform:0.2,1.5" or "lognormal:0.8,0.5"."""
+        kind, sep, params = text.partition(":")
+        if not sep:
+            kind, params = "fixed", text
+        try:
+            values = [float(v) for v in params.split(",") if v.strip()]
+        except ValueError as e:
+            raise ValueError(f"Invalid latency: {text!r}") from e
+        expected = {"fixed": 1, "uniform": 2, "lognormal": 2}.get(kind)
+        if expected is None or len(values) != expected or min(values) < 0:
+            raise ValueError(f"Invalid latency: {text!r}")
+        return cls(kind, *values)
+
+
+@dataclass(frozen=True)
+class FakeAPIConfig:
+    # Endpoint name (see ENDPOINTS) -> latency; "default" applies to the rest
+    latency: dict[str, Latency] = field(default_factory=dict)
+    # HTTP status -> probability of answering with it instead of success
+    errors: dict[int, float] = field(default_factory=dict)
+    rpm: int | None = None
+    quota: int | None = None
+    # Delay between streamed speech chunks
+    chunk_delay: float = 0.0
+    seed: int | None = None
+
+    def latency_for(self, endpoint: str) -> Latency:
+        return self.latency.get(endpoint) or self.latency.get("default") or Latency()
+
+
+# Payload builders -----------------------------------------------------------
+
+
+def silent_mp3(seconds: float) -> bytes:
+    return _MP3_FRAME * max(1, round(seconds / _MP3_FRAME_SECONDS))
+
+
+def silent_wav(seconds: float, rate: int = 24000) -> bytes:
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(rate)
+        w.writeframes(bytes(2 * max(1, int(seconds * rate))))
+    return buffer.getvalue()
+
+
+def solid_png(width: int, height: int, seed: str) -> bytes:
+    """A single-colour RGB PNG; the colour is derived from seed."""
+    rgb = hashlib.blake2b(seed.encode("utf-8"), digest_size=3).digest()
+    row = b"\x00" + rgb * width
+    raw = zlib.compress(row * height, 6)
+
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        body = kind + data
+        return struct.pack(">I", len(data)) + body + struct.pack(">I", zlib.crc32(body))
+
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header) + chunk(b"IDAT", raw) + chunk(b"IEND", b"")
+
+
+def _parse_size(size: str) -> tuple[int, int]:
+    try:
+        w, h = (int(v) for v in size.lower().split("x"))
+        return max(1, min(w, 4096)), max(1, min(h, 4096))
+    except (AttributeError, ValueError):
+        return 1024, 1024
+
+
+def _aspect_size(ratio: str, long_side: int = 1024) -> tuple[int, int]:
+    try:
+        w, h = (float(v) for v in ratio.split(":"))
+    except (AttributeError, ValueError):
+        return long_side, long_side
+    if w >= h:
+        return long_side, max(1, round(long_side * h / w))
+    return max(1, round(long_side * w / h)), long_side
+
+
+# Server ---------------------------------------------------------------------
+
+
+class FakeAPIServer(ThreadingHTTPServer):
+    """Threaded HTTP server answering like the OpenAI and Gemini APIs.
+
+    Use as a context manager to serve from a background thread.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, config: FakeAPIConfig | None = None, host: str = "127.0.0.1", port: int = 0):
+        super().__init__((host, port), _Handler)
+        self.config = config or FakeAPIConfig()
+        self._rng = random.Random(self.config.seed)
+        self._lock = threading.Lock()
+        self._recent: deque[float] = deque()
+        self._served = 0
+        self.counts: Counter[tuple[str, int]] = Counter()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def openai_base_url(self) -> str:
+        return f"{self.url}/v1"
+
+    def admit(self, endpoint: str) -> tuple[int, float, str]:
+        """Decide a request's fate: (status, delay seconds, error kind)."""
+        with self._lock:
+            now = time.monotonic()
+            if self.config.quota is not None and self._served >= self.config.quota:
+                return 429, 0.0, "quota"
+            if self.config.rpm is not None:
+                while self._recent and now - self._recent[0] >= 60.0:
+                    self._recent.popleft()
+                if len(self._recent) >= self.config.rpm:
+                    return 429, 60.0 - (now - self._recent[0]), "rate"
+                self._recent.append(now)
+            roll = self._rng.random()
+            delay = self.config.latency_for(endpoint).sample(self._rng)
+            for status, probability in sorted(self.config.errors.items()):
+                if roll < probability:
+                    return status, delay, "injected"
+                roll -= probability
+            self._served += 1
+            return 200, delay, ""
+
+    def record(self, endpoint: str, status: int) -> None:
+        with self._lock:
+            self.counts[(endpoint, status)] += 1
+
+    def stats(self) -> dict[str, dict[str, int]]:
+        """Responses per endpoint and status code."""
+        with self._lock:
+            result: dict[str, dict[str, int]] = {}
+            for (endpoint, status), count in sorted(self.counts.items()):
+                result.setdefault(endpoint, {})[str(status)] = count
+            return result
+
+    def __enter__(self) -> FakeAPIServer:
+        self._thread = threading.Thread(
+            target=self.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.shutdown()
+        self.server_close()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; don't let Nagle hold the body
+    disable_nagle_algorithm = True
+    server: FakeAPIServer
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.rstrip("/") == "/stats":
+            self._send_json(200, self.server.stats())
+        else:
+            self._send_json(404, {"error": {"message": f"Unknown path {self.path}"}})
+
+    def do_POST(self):
+        path = self.path.split("?", 1)[0]
+        if path.endswith("/audio/speech"):
+            endpoint = "speech"
+        elif path.endswith("/images/generations"):
+            endpoint = "images"
+        elif path.endswith("/chat/completions"):
+            endpoint = "chat"
+        elif _GEMINI_PATH.search(path):
+            endpoint = "gemini"
+        else:
+            self._send_json(404, {"error": {"message": f"Unknown path {path}"}})
+            return
+
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            body = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            self._send_json(400, {"error": {"message": "Invalid JSON body"}})
+            return
+
+        status, delay, error = self.server.admit(endpoint)
+        if delay > 0 and error != "rate":
+            time.sleep(delay)
+        self.server.record(endpoint, status)
+        if status != 200:
+            self._send_error(endpoint, status, error, delay)
+            return
+        getattr(self, f"_serve_{endpoint}")(body, path)
+
+    # Responses ------------------------------------------------------------
+
+    def _send_json(self, status: int, payload: dict, headers: dict | None = None) -> None:
+        data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_error(self, endpoint: str, status: int, error: str, delay: float) -> None:
+        headers = {}
+        if error == "rate":
+            headers["Retry-After"] = str(max(1, math.ceil(delay)))
+        if endpoint == "gemini":
+            gemini_status = {429: "RESOURCE_EXHAUSTED", 503: "UNAVAILABLE"}.get(status, "INTERNAL")
+            payload = {
+                "error": {"code": status, "message": f"Fake {error} error", "status": gemini_status}
+            }
+        else:
+            kind = {"quota": "insufficient_quota", "rate": "rate_limit_exceeded"}.get(
+                error, "server_error" if status >= 500 else "rate_limit_exceeded"
+            )
+            payload = {"error": {"message": f"Fake {error} error", "type": kind, "code": kind}}
+        self._send_json(status, payload, headers)
+
+    def _serve_speech(self, body: dict, path: str) -> None:
+        seconds = len(body.get("input", "")) * _SECONDS_PER_CHAR / float(body.get("speed") or 1.0)
+        if body.get("response_format") == "wav":
+            audio, content_type = silent_wav(seconds), "audio/wav"
+        else:
+            audio, content_type = silent_mp3(seconds), "audio/mpeg"
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for start in range(0, len(audio), _STREAM_CHUNK):
+            piece = audio[start : start + _STREAM_CHUNK]
+            self.wfile.write(f"{len(piece):x}\r\n".encode() + piece + b"\r\n")
+            self.wfile.flush()
+            if self.server.config.chunk_delay:
+                time.sleep(self.server.config.chunk_delay)
+        self.wfile.write(b"0\r\n\r\n")
+
+    def _serve_images(self, body: dict, path: str) -> None:
+        width, height = _parse_size(body.get("size", ""))
+        png = solid_png(width, height, body.get("prompt", ""))
+        self._send_json(
+            200,
+            {
+                "created": int(time.time()),
+                "data": [{"b64_json": base64.b64encode(png).decode()}],
+            },
+        )
+
+    def _serve_chat(self, body: dict, path: str) -> None:
+        content = json.dumps(
+            {"tags": ["テスト", "風景", "建物"], "description": "テスト用のダミー画像の説明"},
+            ensure_ascii=False,
+        )
+        self._send_json(
+            200,
+            {
+                "id": f"chatcmpl-fake{time.monotonic_ns()}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": body.get("model", "gpt-4o"),
+                "choices": [
+                    {
+                        "index": 0,
+                        "message": {"role": "assistant", "content": content},
+                        "finish_reason": "stop",
+                    }
+                ],
+                "usage": {"prompt_tokens": 100, "completion_tokens": 40, "total_tokens": 140},
+            },
+        )
+
+    def _serve_gemini(self, body: dict, path: str) -> None:
+        generation = body.get("generationConfig") or {}
+        ratio = (generation.get("imageConfig") or {}).get("aspectRatio", "1:1")
+        prompt = " ".join(
+            part.get("text", "")
+            for content in body.get("contents", [])
+            for part in content.get("parts", [])
+        )
+        png = solid_png(*_aspect_size(ratio), prompt)
+        self._send_json(
+            200,
+            {
+                "candidates": [
+                    {
+                        "content": {
+                            "role": "model",
+                            "parts": [
+                                {
+                                    "inlineData": {
+                                        "mimeType": "image/png",
+                                        "data": base64.b64encode(png).decode(),
+                                    }
+                                }
+                            ],
+                        },
+                        "finishReason": "STOP",
+                        "index": 0,
+                    }
+                ],
+                "modelVersion": _GEMINI_PATH.search(path).group(1),
+            },
+        )
@@ -0,0 +1,193 @@
+"""Record and replay provider responses for offline, deterministic runs.
+
+In record mode every TTS, image and vision response is stored in a zip
+archive under a fingerprint of the request that produced it. In replay
+mode the same requests are answered from the archive without touching
+the network, so a recorded `generate` can be rerun offline for profiling
+or to reproduce a bug. A request missing from the archive is an error in
+replay mode rather than a silent API call.
+
+Decisions that choose which requests are made at all (library
+auto-matching, image provider ranking) depend on local state that can
+change after recording. They are recorded as JSON "decision" entries and
+replayed too, so a replay makes exactly the recorded requests.
+
+    with use_fixtures(Path("run.zip"), "record"):
+        generate_video(...)
+"""
+
+from __future__ import annotations
+
+import contextlib
+import hashlib
+import json
+import os
+import threading
+import zipfile
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+MODES = ("record", "replay")
+# Part of every fingerprint; bump when request fields change meaning
+FIXTURE_VERSION = 1
+# Set to "record:<path>" or "replay:<path>" to enable fixtures in any command
+FIXTURES_ENV = "OSLO_FIXTURES"
+# Archive kind holding recorded decisions rather than provider responses
+DECISION_KIND = "decision"
+
+
+class FixtureMissingError(LookupError):
+    """Raised in replay mode when a request was never recorded."""
+
+
+def fingerprint(kind: str, request: dict) -> str:
+    """Stable hex digest identifying a provider request."""
+    payload = json.dumps(
+        {"version": FIXTURE_VERSION, "kind": kind, "request": request},
+        sort_keys=True,
+        ensure_ascii=False,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class FixtureArchive:
+    """A zip of recorded responses: <kind>/<fingerprint> plus a .json request.
+
+    Recording appends to an existing archive, so several runs can share
+    one. Safe to use from multiple threads of one process.
+    """
+
+    def __init__(self, path: Path, mode: str):
+        if mode not in MODES:
+            raise ValueError(f"Fixture mode must be one of {', '.join(MODES)}: {mode!r}")
+        if mode == "replay" and not path.exists():
+            raise FileNotFoundError(f"Fixture archive not found: {path}")
+        self.path = path
+        self.mode = mode
+        self._zip = zipfile.ZipFile(path, "a" if mode == "record" else "r")
+        self._names = set(self._zip.namelist())
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.recorded = 0
+
+    def __enter__(self) -> FixtureArchive:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        with self._lock:
+            self._zip.close()
+
+    def get(self, kind: str, request: dict) -> bytes | None:
+        name = f"{kind}/{fingerprint(kind, request)}"
+        with self._lock:
+            if name not in self._names:
+                return None
+            self.hits += 1
+            return self._zip.read(name)
+
+    def put(self, kind: str, request: dict, data: bytes) -> None:
+        name = f"{kind}/{fingerprint(kind, request)}"
+        with self._lock:
+            if name in self._names:
+                return
+            # Audio and images are already compressed
+            self._zip.writestr(name, data, compress_type=zipfile.ZIP_STORED)
+            self._zip.writestr(
+                f"{name}.json",
+                json.dumps(request, ensure_ascii=False, indent=2),
+                compress_type=zipfile.ZIP_DEFLATED,
+            )
+            self._names.add(name)
+            self.recorded += 1
+
+    def fetch(self, kind: str, request: dict, call: Callable[[], bytes]) -> bytes:
+        """Answer a request from the archive, or call the provider and record it."""
+        if self.mode == "replay":
+            data = self.get(kind, request)
+            if data is None:
+                raise FixtureMissingError(
+                    f"No recorded {kind} response for this request in {self.path}"
+                )
+            return data
+        data = call()
+        self.put(kind, request, data)
+        return data
+
+    def decision(self, request: dict, decide: Callable[[], Any]) -> Any:
+        """Return decide()'s JSON-able result, recording it or replaying the recorded one."""
+        data = self.fetch(
+            DECISION_KIND, request, lambda: json.dumps(decide(), ensure_ascii=False).encode()
+        )
+        return json.loads(data)
+
+
+_active: FixtureArchive | None = None
+_env_checked = False
+
+
+def active_fixtures() -> FixtureArchive | None:
+    """The archive in use for this process, opening one from OSLO_FIXTURES if set."""
+    global _active, _env_checked
+    if _active is None and not _env_checked:
+        _env_checked = True
+        spec = os.environ.get(FIXTURES_ENV, "")
+        if spec:
+            mode, _, path = spec.partition(":")
+            _active = FixtureArchive(Path(path), mode)
+    return _active
+
+
+@contextlib.contextmanager
+def use_fixtures(path: Path, mode: str):
+    """Record to or replay from the archive at path for the duration of the block."""
+    global _active
+    previous = _active
+    archive = FixtureArchive(path, mode)
+    _active = archive
+    try:
+        yield archive
+    finally:
+        _active = previous
+        archive.close()
+
+
+def provider_bytes(kind: str, request: dict, call: Callable[[], bytes]) -> bytes:
+    """Return call()'s response bytes, going through the active archive if any."""
+    archive = active_fixtures()
+    if archive is None:
+        return call()
+    return archive.fetch(kind, request, call)
+
+
+def provider_file(kind: str, request: dict, output_path: Path, call: Callable[[], None]) -> Path:
+    """Like provider_bytes for calls that write their response to output_path."""
+    archive = active_fixtures()
+    if archive is None:
+        call()
+        return output_path
+
+    def record() -> bytes:
+        call()
+        return output_path.read_bytes()
+
+    data = archive.fetch(kind, request, record)
+    if archive.mode == "replay":
+        output_path.write_bytes(data)
+    return output_path
+
+
+def recorded_decision(request: dict, decide: Callable[[], Any]) -> Any:
+    """decide(), or in a fixture run the decision recorded for request.
+
+    request identifies the decision by its inputs, excluding the local
+    state (library, stats) that decide() reads.
+    """
+    archive = active_fixtures()
+    if archive is None:
+        return decide()
+    return archive.decision(request, decide)
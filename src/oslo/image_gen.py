@@ -1,16 +1,99 @@
 """Image generation client supporting OpenAI and Google Gemini (Nano Banana)."""
 
 import base64
+import dataclasses
 import math
+import queue
+import threading
+import time
+from dataclasses import dataclass
 from io import BytesIO
 from pathlib import Path
+from typing import TYPE_CHECKING
 
 import click
 from PIL import Image
 
-from oslo.config import ImageGenConfig, VideoConfig
+from oslo.config import DEFAULT_IMAGE_MODELS, HedgeConfig, ImageGenConfig, VideoConfig
 from oslo.text_processor import Scene
-from oslo.utils import retry_on_rate_limit
+from oslo.utils import link_or_copy, retry_on_rate_limit
+
+if TYPE_CHECKING:
+    from oslo.router import ImageRouter, RouteDecision
+
+# Latencies kept per provider for the hedge percentile
+LATENCY_WINDOW = 50
+# Gaussian blur radius, as a fraction of the frame width, for fallback
+# backgrounds made from a neighbouring scene
+FALLBACK_BLUR = 0.04
+
+
+@dataclass(frozen=True)
+class ImageFallback:
+    """A locally made background that stands in for a scene's generated image."""
+
+    kind: str  # "library", "blur" or "gradient"
+    detail: str  # library slug, or the 1-based scene the blur was made from
+    reason: str  # why generation was abandoned
+
+    def describe(self) -> str:
+        source = {"library": "library image", "blur": "blurred scene"}.get(self.kind, self.kind)
+        detail = f" {self.detail}" if self.detail else ""
+        return f"{source}{detail} ({self.reason})"
+
+
+@dataclass(frozen=True)
+class HedgeStats:
+    hedged: int
+    won: int
+    max_hedges: int
+
+    def describe(self) -> str:
+        return f"{self.hedged}/{self.max_hedges} hedged request(s), {self.won} won"
+
+
+class HedgePolicy:
+    """Per-run hedge budget and the observed latencies that set the delay."""
+
+    def __init__(self, config: HedgeConfig):
+        self.config = config
+        self._lock = threading.Lock()
+        self._latencies: dict[str, list[float]] = {}
+        self._hedged = 0
+        self._won = 0
+
+    def observe(self, provider: str, latency: float) -> None:
+        with self._lock:
+            samples = self._latencies.setdefault(provider, [])
+            samples.append(latency)
+            del samples[:-LATENCY_WINDOW]
+
+    def delay(self, provider: str) -> float | None:
+        """Seconds to wait before hedging; None when the budget is spent."""
+        with self._lock:
+            if self._hedged >= self.config.max_hedges:
+                return None
+            samples = sorted(self._latencies.get(provider, ()))
+        if len(samples) < self.config.min_samples:
+            return self.config.initial_delay
+        # Nearest-rank percentile
+        return samples[max(0, math.ceil(self.config.percentile * len(samples)) - 1)]
+
+    def reserve(self) -> bool:
+        """Claim one hedge from the run's budget."""
+        with self._lock:
+            if self._hedged >= self.config.max_hedges:
+                return False
+            self._hedged += 1
+            return True
+
+    def record_win(self) -> None:
+        with self._lock:
+            self._won += 1
+
+    def stats(self) -> HedgeStats:
+        with self._lock:
+            return HedgeStats(self._hedged, self._won, self.config.max_hedges)
 
 
 class ImageGenerator:
@@ -27,111 +110,286 @@ class ImageGenerator:
         self._google_api_key = google_api_key
         self._openai_client = None
         self._gemini_client = None
+        self.hedging = HedgePolicy(image_config.hedge)
+        # Abandon token of the deadline-bound scene this thread works for
+        self._local = threading.local()
+        # Provider/model that produced each generated image (routing and
+        # hedging can move a scene off the configured provider)
+        self.sources: dict[Path, ImageGenConfig] = {}
+        self.routes: dict[Path, RouteDecision] = {}
+        self.router: ImageRouter | None = None
+        self.fallbacks: dict[int, ImageFallback] = {}
+        if image_config.routing.enabled:
+            from oslo import router
+            from oslo.fixtures import active_fixtures
+
+            archive = active_fixtures()
+            self.router = router.ImageRouter.for_config(
+                image_config,
+                openai_api_key,
+                google_api_key,
+                # Replayed responses say nothing about provider latency
+                persist=archive is None or archive.mode != "replay",
+            )
 
     def _get_openai_client(self):
         if self._openai_client is None:
-            from openai import OpenAI
+            from oslo.clients import get_openai_client
 
-            self._openai_client = OpenAI(api_key=self._openai_api_key)
+            self._openai_client = get_openai_client(self._openai_api_key)
         return self._openai_client
 
     def _get_gemini_client(self):
         if self._gemini_client is None:
-            from google import genai
+            from oslo.clients import get_gemini_client
 
-            self._gemini_client = genai.Client(api_key=self._google_api_key)
+            self._gemini_client = get_gemini_client(self._google_api_key)
         return self._gemini_client
 
     @retry_on_rate_limit()
     def generate_image(self, prompt: str, output_path: Path) -> Path:
         """Generate a single image from a prompt, resize, and save to disk."""
-        if self.config.provider == "gemini":
-            return self._generate_gemini(prompt, output_path)
-        return self._generate_openai(prompt, output_path)
+        if self.router is not None:
+            return self._generate_routed(prompt, output_path)
+        if self.config.hedge.enabled:
+            image_bytes, self.sources[output_path] = self._fetch_hedged(prompt, self.config)
+            return self._save(image_bytes, output_path)
+
+        from oslo.concurrency import get_limiter
+
+        with get_limiter(f"{self.config.provider}-image").slot(self._abandon()):
+            if self.config.provider == "gemini":
+                return self._generate_gemini(prompt, output_path)
+            return self._generate_openai(prompt, output_path)
 
     def _generate_openai(self, prompt: str, output_path: Path) -> Path:
         """Generate image using OpenAI gpt-image-1."""
-        client = self._get_openai_client()
-        result = client.images.generate(
-            model=self.config.model,
-            prompt=prompt,
-            size=self.config.size,
-            quality=self.config.quality,
-        )
-        image_base64 = result.data[0].b64_json
-        image_bytes = base64.b64decode(image_base64)
-        image = Image.open(BytesIO(image_bytes))
-
-        image = image.resize(
-            (self.video_config.width, self.video_config.height), Image.LANCZOS
-        )
-        image.save(str(output_path), format="PNG")
-        return output_path
+        return self._save(self._fetch_openai(prompt, self.config), output_path)
 
     def _generate_gemini(self, prompt: str, output_path: Path) -> Path:
         """Generate image using Google Gemini (Nano Banana)."""
-        from google.genai import types
-
-        client = self._get_gemini_client()
-        response = client.models.generate_content(
-            model=self.config.model,
-            contents=prompt,
-            config=types.GenerateContentConfig(
-                response_modalities=["IMAGE"],
-                image_config=types.ImageConfig(
-                    aspect_ratio=self.config.aspect_ratio,
-                ),
-            ),
+        return self._save(self._fetch_gemini(prompt, self.config), output_path)
+
+    def _generate_routed(self, prompt: str, output_path: Path) -> Path:
+        """Try providers in the router's order until one returns an image."""
+        ranking = self._ranking(prompt)
+        for fallback, (config, reason) in enumerate(ranking):
+            decision = self.router.decide(config, reason, fallback)
+            try:
+                if self.config.hedge.enabled:
+                    image_bytes, config = self._fetch_hedged(prompt, config)
+                else:
+                    image_bytes = self._fetch(prompt, config)
+            except Exception:
+                if fallback == len(ranking) - 1:
+                    raise
+                continue
+            self.sources[output_path] = config
+            self.routes[output_path] = decision
+            return self._save(image_bytes, output_path)
+        raise RuntimeError("No image provider configured")
+
+    def _ranking(self, prompt: str) -> list[tuple[ImageGenConfig, str]]:
+        """The router's ranking for a prompt; recorded in fixture runs and replayed.
+
+        Persisted stats shape the ranking, so a replay would otherwise
+        try providers in a different order than the recording.
+        """
+        from oslo.fixtures import recorded_decision
+        from oslo.router import route_key
+
+        by_key = {route_key(config): config for config in self.router.candidates}
+        ranked = recorded_decision(
+            {"decision": "image-route", "prompt": prompt, "candidates": sorted(by_key)},
+            lambda: [[route_key(config), reason] for config, reason in self.router.rank()],
         )
+        return [(by_key[key], reason) for key, reason in ranked if key in by_key]
+
+    def _abandon(self):
+        return getattr(self._local, "abandon", None)
 
-        # Extract image from response parts
-        image = None
-        for part in response.candidates[0].content.parts:
-            if part.inline_data is not None:
-                image_bytes = part.inline_data.data
-                image = Image.open(BytesIO(image_bytes))
-                break
+    def _fetch(
+        self,
+        prompt: str,
+        config: ImageGenConfig,
+        acquired: threading.Event | None = None,
+    ) -> bytes:
+        """Fetch raw image bytes from config's provider, inside its limiter slot.
 
-        if image is None:
+        acquired, if given, is set once the slot is held and the request starts.
+        """
+        from oslo.concurrency import get_limiter
+
+        with get_limiter(f"{config.provider}-image").slot(self._abandon()):
+            if acquired is not None:
+                acquired.set()
+            started = time.monotonic()
+            try:
+                if config.provider == "gemini":
+                    image_bytes = self._fetch_gemini(prompt, config)
+                else:
+                    image_bytes = self._fetch_openai(prompt, config)
+            except Exception:
+                if self.router is not None:
+                    self.router.observe(config, time.monotonic() - started, error=True)
+                raise
+        latency = time.monotonic() - started
+        self.hedging.observe(config.provider, latency)
+        if self.router is not None:
+            self.router.observe(config, latency, error=False)
+        return image_bytes
+
+    def _fetch_openai(self, prompt: str, config: ImageGenConfig) -> bytes:
+        from oslo.fixtures import provider_bytes
+
+        request = {
+            "model": config.model,
+            "prompt": prompt,
+            "size": config.size,
+            "quality": config.quality,
+        }
+
+        def call() -> bytes:
+            result = self._get_openai_client().images.generate(**request)
+            return base64.b64decode(result.data[0].b64_json)
+
+        return provider_bytes("image-openai", request, call)
+
+    def _fetch_gemini(self, prompt: str, config: ImageGenConfig) -> bytes:
+        from oslo.fixtures import provider_bytes
+
+        request = {
+            "model": config.model,
+            "prompt": prompt,
+            "aspect_ratio": config.aspect_ratio,
+        }
+
+        def call() -> bytes:
+            from google.genai import types
+
+            response = self._get_gemini_client().models.generate_content(
+                model=config.model,
+                contents=prompt,
+                config=types.GenerateContentConfig(
+                    response_modalities=["IMAGE"],
+                    image_config=types.ImageConfig(
+                        aspect_ratio=config.aspect_ratio,
+                    ),
+                ),
+            )
+            # Extract image from response parts
+            for part in response.candidates[0].content.parts:
+                if part.inline_data is not None:
+                    return part.inline_data.data
             raise RuntimeError("Gemini API returned no image data")
 
+        return provider_bytes("image-gemini", request, call)
+
+    def _save(self, image_bytes: bytes, output_path: Path) -> Path:
+        """Resize provider output to the video frame and save it as PNG."""
+        image = Image.open(BytesIO(image_bytes))
         image = image.resize(
             (self.video_config.width, self.video_config.height), Image.LANCZOS
         )
         image.save(str(output_path), format="PNG")
         return output_path
 
+    def _hedge_config(self, config: ImageGenConfig) -> ImageGenConfig:
+        """Where backup requests go: the same provider, or the other one if it has a key."""
+        if self.config.hedge.target != "other":
+            return config
+        other = "openai" if config.provider == "gemini" else "gemini"
+        if not (self._google_api_key if other == "gemini" else self._openai_api_key):
+            return config
+        return dataclasses.replace(config, provider=other, model=DEFAULT_IMAGE_MODELS[other])
+
+    def _fetch_hedged(
+        self, prompt: str, config: ImageGenConfig
+    ) -> tuple[bytes, ImageGenConfig]:
+        """Race a backup request against one that outlasts the hedge delay.
+
+        The delay counts from when the primary request holds its limiter
+        slot, so time spent queueing behind other scenes does not trigger a
+        hedge. Returns the first successful response and the config that
+        produced it. The loser cannot be cancelled mid-request, so its thread
+        finishes in the background and its result is discarded. An error
+        only propagates once every request in flight has failed.
+        """
+        results: queue.Queue = queue.Queue()
+        acquired = threading.Event()
+        abandon = self._abandon()
+
+        def attempt(config: ImageGenConfig, hedge: bool) -> None:
+            self._local.abandon = abandon
+            try:
+                image_bytes = self._fetch(prompt, config, None if hedge else acquired)
+            except Exception as e:
+                results.put((hedge, config, None, e))
+                return
+            finally:
+                acquired.set()
+            results.put((hedge, config, image_bytes, None))
+
+        def launch(config: ImageGenConfig, hedge: bool) -> None:
+            threading.Thread(target=attempt, args=(config, hedge), daemon=True).start()
+
+        launch(config, False)
+        pending = 1
+        acquired.wait()
+        try:
+            outcome = results.get(timeout=self.hedging.delay(config.provider))
+        except queue.Empty:
+            if self.hedging.reserve():
+                launch(self._hedge_config(config), True)
+                pending += 1
+            outcome = results.get()
+
+        while True:
+            hedge, winner, image_bytes, error = outcome
+            pending -= 1
+            if error is None:
+                if hedge:
+                    self.hedging.record_win()
+                return image_bytes, winner
+            if not pending:
+                raise error
+            outcome = results.get()
+
     def copy_and_resize_library_image(self, slug: str, output_path: Path) -> Path:
-        """Copy a library image, resizing to video dimensions with cover+center crop."""
+        """Place a library image at video dimensions (cover + center crop).
+
+        The resized image is cached next to the library and hardlinked
+        into place, so each slug is only resized once per resolution.
+        """
         from oslo.library import resolve_image_path
+        from oslo.library_derivatives import get_derivative
 
         source = resolve_image_path(slug)
-        image = Image.open(str(source)).convert("RGB")
+        derivative = get_derivative(source, self.video_config.width, self.video_config.height)
+        return link_or_copy(derivative, output_path)
 
-        target_w = self.video_config.width
-        target_h = self.video_config.height
-        img_w, img_h = image.size
+    def generate_all_scenes(
+        self,
+        scenes: list[Scene],
+        temp_dir: Path,
+        verbose: bool = False,
+        scene_deadline: float | None = None,
+        deadline_at: float | None = None,
+    ) -> list[Path]:
+        """Generate images for all scenes. Returns list of image file paths.
 
-        # Cover: scale so smallest dimension fills target (ceil to avoid 1px shortage)
-        scale = max(target_w / img_w, target_h / img_h)
-        new_w = math.ceil(img_w * scale)
-        new_h = math.ceil(img_h * scale)
-        image = image.resize((new_w, new_h), Image.LANCZOS)
+        With a deadline (seconds per scene, or a time.monotonic() by which
+        every image must be ready), a scene whose image is late or fails
+        gets a local fallback background instead; see self.fallbacks.
+        """
+        from concurrent.futures import ThreadPoolExecutor
 
-        # Center crop
-        left = (new_w - target_w) // 2
-        top = (new_h - target_h) // 2
-        image = image.crop((left, top, left + target_w, top + target_h))
+        from oslo.concurrency import get_limiter
 
-        image.save(str(output_path), format="PNG")
-        return output_path
+        with_deadline = scene_deadline is not None or deadline_at is not None
+        failed: dict[int, str] = {}
 
-    def generate_all_scenes(
-        self, scenes: list[Scene], temp_dir: Path, verbose: bool = False
-    ) -> list[Path]:
-        """Generate images for all scenes. Returns list of image file paths."""
-        image_paths = []
-        for scene in scenes:
+        def generate(scene: Scene) -> Path:
             image_path = temp_dir / f"scene_{scene.index:03d}.png"
             if scene.library_image:
                 if verbose:
@@ -139,14 +397,161 @@ class ImageGenerator:
                         f"  Using library image '{scene.library_image}' "
                         f"for scene {scene.index + 1}/{len(scenes)}..."
                     )
-                self.copy_and_resize_library_image(scene.library_image, image_path)
+                return self.copy_and_resize_library_image(scene.library_image, image_path)
+            if verbose:
+                provider = "routed" if self.router is not None else self.config.provider
+                click.echo(
+                    f"  Generating image ({provider}) "
+                    f"for scene {scene.index + 1}/{len(scenes)}..."
+                )
+            if with_deadline:
+                try:
+                    path = self._generate_by(
+                        scene.image_prompt, image_path, scene_deadline, deadline_at
+                    )
+                except TimeoutError:
+                    failed[scene.index] = "deadline"
+                    return image_path
+                except Exception as e:
+                    failed[scene.index] = f"error: {e}"
+                    return image_path
             else:
+                path = self.generate_image(scene.image_prompt, image_path)
+            if verbose and path in self.routes:
+                click.echo(f"  Scene {scene.index + 1}: {self.routes[path].describe()}")
+            return path
+
+        # The provider's adaptive limiter decides how many actually run at once
+        limiter = get_limiter(f"{self.config.provider}-image")
+        try:
+            with ThreadPoolExecutor(max_workers=limiter.ceiling) as pool:
+                paths = list(pool.map(generate, scenes))
+        finally:
+            if self.router is not None:
+                self.router.save()
+
+        # Neighbours are only known once every scene has finished or given up
+        for scene in scenes:
+            if scene.index in failed:
+                fallback = self._make_fallback(scene, scenes, paths, failed)
+                self.fallbacks[scene.index] = fallback
                 if verbose:
-                    provider = self.config.provider
-                    click.echo(
-                        f"  Generating image ({provider}) "
-                        f"for scene {scene.index + 1}/{len(scenes)}..."
-                    )
-                self.generate_image(scene.image_prompt, image_path)
-            image_paths.append(image_path)
-        return image_paths
+                    click.echo(f"  Scene {scene.index + 1}: {fallback.describe()}")
+        return paths
+
+    def _generate_by(
+        self,
+        prompt: str,
+        output_path: Path,
+        scene_deadline: float | None,
+        deadline_at: float | None,
+    ) -> Path:
+        """generate_image, abandoned with TimeoutError once a deadline passes.
+
+        The abandoned request keeps running in a daemon thread (the SDKs
+        cannot cancel it), writing to a side path that is never used. Its
+        limiter slots are freed at the deadline and its retries stop, so a
+        long-lived process does not lose concurrency to it.
+        """
+        from oslo.concurrency import Abandon
+
+        timeouts = []
+        if scene_deadline is not None:
+            timeouts.append(scene_deadline)
+        if deadline_at is not None:
+            timeouts.append(deadline_at - time.monotonic())
+        timeout = min(timeouts)
+        if timeout <= 0:
+            raise TimeoutError("run deadline passed before the scene started")
+
+        pending = output_path.with_name(f"{output_path.stem}.pending.png")
+        results: queue.Queue = queue.Queue()
+
+        abandon = Abandon()
+
+        def run() -> None:
+            self._local.abandon = abandon
+            try:
+                results.put((self.generate_image(prompt, pending), None))
+            except Exception as e:
+                results.put((None, e))
+
+        threading.Thread(target=run, daemon=True).start()
+        try:
+            _, error = results.get(timeout=timeout)
+        except queue.Empty:
+            abandon.abandon()
+            raise TimeoutError(f"no image after {timeout:.0f}s") from None
+        if error is not None:
+            raise error
+        pending.replace(output_path)
+        for mapping in (self.sources, self.routes):
+            if pending in mapping:
+                mapping[output_path] = mapping.pop(pending)
+        return output_path
+
+    def _make_fallback(
+        self, scene: Scene, scenes: list[Scene], paths: list[Path], failed: dict[int, str]
+    ) -> ImageFallback:
+        """Write a local background for a scene: best library match, blurred
+        neighbour, or a plain gradient, in that order of preference."""
+        output_path = paths[scene.index]
+        reason = failed[scene.index]
+        used = {s.library_image for s in scenes if s.library_image}
+        used.update(f.detail for f in self.fallbacks.values() if f.kind == "library")
+        slug = _best_library_match(scene, used)
+        if slug is not None:
+            try:
+                self.copy_and_resize_library_image(slug, output_path)
+            except (OSError, ValueError):
+                pass
+            else:
+                return ImageFallback("library", slug, reason)
+
+        size = (self.video_config.width, self.video_config.height)
+        for neighbour in (scene.index - 1, scene.index + 1):
+            if 0 <= neighbour < len(scenes) and neighbour not in failed:
+                _blurred_background(paths[neighbour], output_path, size)
+                return ImageFallback("blur", str(neighbour + 1), reason)
+        _gradient_background(scene.image_prompt, output_path, size)
+        return ImageFallback("gradient", "", reason)
+
+
+def _best_library_match(scene: Scene, used: set[str]) -> str | None:
+    """The library image closest to the scene's text, ignoring the match threshold."""
+    from oslo.image_matcher import get_image_matcher, scene_match_text
+    from oslo.library import _get_library_dir
+    from oslo.library_index import get_index
+
+    directory = _get_library_dir()
+    if not directory.exists():
+        return None
+    matcher = get_image_matcher(get_index(directory))
+    for match in matcher.match(scene_match_text(scene)):
+        if match.score > 0 and match.slug not in used:
+            return match.slug
+    return None
+
+
+def _blurred_background(source: Path, output_path: Path, size: tuple[int, int]) -> None:
+    from PIL import ImageEnhance, ImageFilter
+
+    with Image.open(source) as img:
+        image = img.convert("RGB").resize(size, Image.LANCZOS)
+    image = image.filter(ImageFilter.GaussianBlur(size[0] * FALLBACK_BLUR))
+    ImageEnhance.Brightness(image).enhance(0.7).save(str(output_path), format="PNG")
+
+
+def _gradient_background(seed: str, output_path: Path, size: tuple[int, int]) -> None:
+    """Vertical two-colour gradient; the colours are derived from seed so
+    each scene gets a different but reproducible background."""
+    import hashlib
+
+    digest = hashlib.sha256(seed.encode("utf-8")).digest()
+    top = tuple(40 + b % 120 for b in digest[:3])
+    bottom = tuple(c // 3 for c in top)
+    column = Image.new("RGB", (1, 256))
+    for y in range(256):
+        t = y / 255
+        column.putpixel((0, y), tuple(round(a + (b - a) * t) for a, b in zip(top, bottom)))
+    column.resize(size, Image.BILINEAR).save(str(output_path), format="PNG")
@@ -0,0 +1,192 @@
+"""Offline scene-to-library-image matching with character n-gram TF-IDF.
+
+Japanese has no spaces, so instead of tokenizing into words each text is
+broken into overlapping character bigrams and trigrams. Library images are
+indexed by their tags (weighted higher) and description; a scene is scored
+by cosine similarity against every image sharing at least one n-gram.
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+import re
+from dataclasses import dataclass
+from pathlib import Path
+
+from oslo.config import LibraryConfig
+from oslo.library_index import LibraryIndex, get_index
+from oslo.library_query import normalize
+from oslo.text_processor import Scene
+
+logger = logging.getLogger(__name__)
+
+NGRAM_SIZES = (2, 3)
+# Tags are curated and short, descriptions are long and generic
+TAG_WEIGHT = 3.0
+DESCRIPTION_WEIGHT = 1.0
+
+_WORD_RUN = re.compile(r"[^\W_]+")
+
+
+def char_ngrams(text: str, sizes: tuple[int, ...] = NGRAM_SIZES) -> dict[str, int]:
+    """Count character n-grams within runs of word characters."""
+    counts: dict[str, int] = {}
+    for run in _WORD_RUN.findall(normalize(text)):
+        if len(run) < min(sizes):
+            counts[run] = counts.get(run, 0) + 1
+            continue
+        for n in sizes:
+            for i in range(len(run) - n + 1):
+                gram = run[i : i + n]
+                counts[gram] = counts.get(gram, 0) + 1
+    return counts
+
+
+def _unit(weights: dict[str, float]) -> dict[str, float]:
+    norm = math.sqrt(sum(w * w for w in weights.values()))
+    return {g: w / norm for g, w in weights.items()} if norm else {}
+
+
+@dataclass(frozen=True)
+class ImageMatch:
+    slug: str
+    score: float
+
+
+class ImageMatcher:
+    """TF-IDF index over library image tags and descriptions."""
+
+    def __init__(self, entries: dict[str, dict]):
+        docs: dict[str, dict[str, float]] = {}
+        for slug, entry in entries.items():
+            tf: dict[str, float] = {}
+            for tag in entry["tags"]:
+                for gram, count in char_ngrams(tag).items():
+                    tf[gram] = tf.get(gram, 0.0) + TAG_WEIGHT * count
+            for gram, count in char_ngrams(entry["description"]).items():
+                tf[gram] = tf.get(gram, 0.0) + DESCRIPTION_WEIGHT * count
+            if tf:
+                docs[slug] = tf
+
+        n_docs = len(docs)
+        df: dict[str, int] = {}
+        for tf in docs.values():
+            for gram in tf:
+                df[gram] = df.get(gram, 0) + 1
+        self.idf = {g: math.log((1 + n_docs) / (1 + d)) + 1.0 for g, d in df.items()}
+
+        # gram -> [(slug, weight)] over unit-length document vectors
+        self._postings: dict[str, list[tuple[str, float]]] = {}
+        for slug, tf in docs.items():
+            vector = _unit({g: (1 + math.log(w)) * self.idf[g] for g, w in tf.items() if w > 0})
+            for gram, weight in vector.items():
+                self._postings.setdefault(gram, []).append((slug, weight))
+
+    def __len__(self) -> int:
+        return len({slug for posting in self._postings.values() for slug, _ in posting})
+
+    def query_vector(self, text: str) -> dict[str, float]:
+        # Grams unknown to the library cannot match but still dilute the
+        # score, so long narrations need proportionally more overlap
+        return _unit(
+            {g: (1 + math.log(c)) * self.idf.get(g, 1.0) for g, c in char_ngrams(text).items()}
+        )
+
+    def match(self, text: str, limit: int = 5) -> list[ImageMatch]:
+        """Return the best-scoring images for text, highest first."""
+        scores: dict[str, float] = {}
+        for gram, weight in self.query_vector(text).items():
+            for slug, doc_weight in self._postings.get(gram, ()):
+                scores[slug] = scores.get(slug, 0.0) + weight * doc_weight
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        return [ImageMatch(slug, score) for slug, score in ranked[:limit]]
+
+
+# Built matchers per library directory, with the index and generation they
+# were built from
+_matchers: dict[Path, tuple[LibraryIndex, int, ImageMatcher]] = {}
+
+
+def get_image_matcher(index: LibraryIndex) -> ImageMatcher:
+    """Return the matcher for a library index, rebuilding it on change."""
+    key = index.directory.resolve()
+    cached = _matchers.get(key)
+    if cached is not None and cached[0] is index and cached[1] == index.generation:
+        return cached[2]
+    matcher = ImageMatcher(index.entries)
+    _matchers[key] = (index, index.generation, matcher)
+    return matcher
+
+
+def scene_match_text(scene: Scene) -> str:
+    """Text a scene is matched on: the visual description, then the narration."""
+    return " ".join(t for t in (scene.visual_text, scene.narration_text) if t)
+
+
+def assign_library_images(
+    scenes: list[Scene],
+    library_dir: Path | None = None,
+    threshold: float = LibraryConfig.match_threshold,
+) -> list[tuple[Scene, ImageMatch]]:
+    """Set library_image on scenes without one whose text matches a library image.
+
+    Each image is used at most once per video (images already named in
+    the conte count as used); the best-scoring pairs are assigned first.
+    Each assignment is logged at INFO; they are returned in scene order.
+    In a fixture run the assignments are recorded, and replayed
+    regardless of the library's current contents.
+    """
+    from oslo.fixtures import recorded_decision
+
+    request = {
+        "decision": "library-match",
+        "threshold": threshold,
+        "scenes": [[scene_match_text(s), s.library_image] for s in scenes],
+    }
+    matches = recorded_decision(
+        request,
+        lambda: [
+            [scene.index, match.slug, match.score]
+            for scene, match in _match_library(scenes, library_dir, threshold)
+        ],
+    )
+    by_index = {scene.index: scene for scene in scenes}
+    assigned = []
+    for index, slug, score in matches:
+        scene = by_index[index]
+        scene.library_image = slug
+        logger.info("Scene %d: auto-matched library image %s (score %.2f)", index + 1, slug, score)
+        assigned.append((scene, ImageMatch(slug, score)))
+    return assigned
+
+
+def _match_library(
+    scenes: list[Scene], library_dir: Path | None, threshold: float
+) -> list[tuple[Scene, ImageMatch]]:
+    from oslo.library import _get_library_dir
+
+    directory = library_dir or _get_library_dir()
+    if not directory.exists():
+        return []
+    matcher = get_image_matcher(get_index(directory))
+    used = {s.library_image for s in scenes if s.library_image}
+    candidates = [
+        (match.score, scene.index, scene, match)
+        for scene in scenes
+        if not scene.library_image
+        for match in matcher.match(scene_match_text(scene))
+        if match.score >= threshold
+    ]
+    candidates.sort(key=lambda c: (-c[0], c[1]))
+
+    assigned: list[tuple[Scene, ImageMatch]] = []
+    taken: set[int] = set()
+    for _, index, scene, match in candidates:
+        if index in taken or match.slug in used:
+            continue
+        taken.add(index)
+        used.add(match.slug)
+        assigned.append((scene, match))
+    assigned.sort(key=lambda pair: pair[0].index)
+    return assigned
@@ -0,0 +1,141 @@
+"""Perceptual image hashing (dHash) and a BK-tree for near-duplicate lookup."""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+from pathlib import Path
+from typing import Generic, TypeVar
+
+T = TypeVar("T")
+
+HASH_SIZE = 8  # 8x8 gradient bits -> 64-bit hash
+# Hashes at most this many bits apart are treated as the same picture
+# (re-encodes, resizes and light crops typically land within 0-6)
+DUPLICATE_THRESHOLD = 6
+
+
+def dhash(path: Path, hash_size: int = HASH_SIZE) -> int:
+    """Return the difference hash of an image file.
+
+    The image is reduced to (hash_size + 1) x hash_size grayscale pixels
+    and each bit records whether a pixel is brighter than its right-hand
+    neighbour. Raises OSError if the file cannot be decoded.
+    """
+    from PIL import Image
+
+    with Image.open(path) as img:
+        # Let JPEG decode at a reduced scale; the result is tiny anyway
+        img.draft("L", (hash_size * 8, hash_size * 8))
+        small = img.convert("L").resize((hash_size + 1, hash_size), Image.Resampling.LANCZOS)
+        pixels = list(small.getdata())
+    value = 0
+    for row in range(hash_size):
+        offset = row * (hash_size + 1)
+        for col in range(hash_size):
+            value = (value << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+    return value
+
+
+def format_hash(value: int) -> str:
+    return f"{value:016x}"
+
+
+def parse_hash(text: str) -> int | None:
+    """Parse a stored hex hash; None for empty or malformed values."""
+    try:
+        return int(text, 16) if text else None
+    except ValueError:
+        return None
+
+
+def image_hash(path: Path) -> str:
+    """Hex dHash of an image, or "" if it cannot be decoded."""
+    try:
+        return format_hash(dhash(path))
+    except (OSError, ValueError):
+        return ""
+
+
+def hamming(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+
+class BKTree(Generic[T]):
+    """Burkhard-Keller tree over Hamming distance.
+
+    Searching for hashes within a small threshold only visits subtrees
+    whose edge distance lies in [d - threshold, d + threshold], so lookups
+    stay far below a linear scan as the library grows.
+    """
+
+    def __init__(self, items: Iterable[tuple[int, T]] = ()):
+        # Node: (hash, [items with this hash], {distance: child node})
+        self._root: tuple[int, list[T], dict[int, tuple]] | None = None
+        self._size = 0
+        for value, item in items:
+            self.add(value, item)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, value: int, item: T) -> None:
+        self._size += 1
+        if self._root is None:
+            self._root = (value, [item], {})
+            return
+        node = self._root
+        while True:
+            distance = hamming(value, node[0])
+            if distance == 0:
+                node[1].append(item)
+                return
+            child = node[2].get(distance)
+            if child is None:
+                node[2][distance] = (value, [item], {})
+                return
+            node = child
+
+    def search(self, value: int, threshold: int) -> list[tuple[int, T]]:
+        """Return (distance, item) pairs within threshold, nearest first."""
+        if self._root is None:
+            return []
+        found: list[tuple[int, T]] = []
+        stack = [self._root]
+        while stack:
+            node_value, items, children = stack.pop()
+            distance = hamming(value, node_value)
+            if distance <= threshold:
+                found.extend((distance, item) for item in items)
+            for edge in range(max(1, distance - threshold), distance + threshold + 1):
+                child = children.get(edge)
+                if child is not None:
+                    stack.append(child)
+        found.sort(key=lambda pair: pair[0])
+        return found
+
+
+def find_clusters(hashes: dict[str, int], threshold: int = DUPLICATE_THRESHOLD) -> list[list[str]]:
+    """Group keys whose hashes are transitively within threshold of each other.
+
+    Returns only clusters with two or more members, each sorted, ordered
+    by their first key.
+    """
+    tree: BKTree[str] = BKTree((value, key) for key, value in hashes.items())
+    parent = {key: key for key in hashes}
+
+    def find(key: str) -> str:
+        while parent[key] != key:
+            parent[key] = parent[parent[key]]
+            key = parent[key]
+        return key
+
+    for key, value in hashes.items():
+        for _, other in tree.search(value, threshold):
+            a, b = find(key), find(other)
+            if a != b:
+                parent[max(a, b)] = min(a, b)
+
+    groups: dict[str, list[str]] = {}
+    for key in hashes:
+        groups.setdefault(find(key), []).append(key)
+    return sorted(sorted(g) for g in groups.values() if len(g) > 1)
@@ -1,20 +1,36 @@
 """Image library: storage, metadata, and retrieval."""
 
 import base64
+import hashlib
+import io
 import json
+import os
 import re
 import shutil
-from dataclasses import dataclass
+from collections.abc import Callable, Iterable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from datetime import date
 from pathlib import Path
 
-import yaml
-from openai import OpenAI
-
-from oslo.utils import retry_on_rate_limit
+from oslo.imagehash import (
+    DUPLICATE_THRESHOLD,
+    BKTree,
+    find_clusters,
+    image_hash,
+    parse_hash,
+)
+from oslo.library_index import SUPPORTED_EXTENSIONS, LibraryIndex, get_index
+from oslo.library_query import get_tag_index, parse_query
+from oslo.utils import atomic_write_bytes, file_lock, retry_on_rate_limit
 
 LIBRARY_DIR_NAME = "images"
-SUPPORTED_EXTENSIONS = (".png", ".jpg", ".jpeg", ".webp")
+LOCK_FILE_NAME = ".lock"
+# Longest side of images sent for vision analysis; larger ones are
+# downscaled and re-encoded as JPEG in memory before upload
+ANALYSIS_MAX_SIZE = 1024
+ANALYSIS_MAX_BYTES = 1_000_000
+DEFAULT_ADD_CONCURRENCY = 8
 _SLUG_PATTERN = re.compile(r"^[a-z0-9]+(?:[_-][a-z0-9]+)*$")
 
 _ANALYSIS_PROMPT = """\
@@ -42,6 +58,16 @@ class ImageMeta:
     description: str = ""
     source: str = ""
     added: str = ""
+    phash: str = ""  # hex dHash, "" if the image could not be decoded
+
+
+class DuplicateImageError(FileExistsError):
+    """Raised when an added image is a near-duplicate of library images."""
+
+    def __init__(self, matches: list[tuple[int, "ImageMeta"]]):
+        self.matches = matches
+        slugs = ", ".join(f"{meta.slug} (distance {d})" for d, meta in matches)
+        super().__init__(f"Near-duplicate of existing image(s): {slugs}")
 
 
 def _get_library_dir() -> Path:
@@ -67,34 +93,46 @@ def resolve_image_path(slug: str, library_dir: Path | None = None) -> Path:
     """Resolve a slug to its image file path."""
     validate_slug(slug)
     directory = library_dir or _get_library_dir()
-    for ext in SUPPORTED_EXTENSIONS:
-        path = directory / f"{slug}{ext}"
-        if path.exists():
-            return path
-    raise FileNotFoundError(
-        f"Image not found for slug '{slug}' in {directory}"
+    path = get_index(directory, quick=True).file_for(slug)
+    if path is None:
+        # The quick lookup may be stale; confirm with a full scan before failing
+        path = get_index(directory).file_for(slug)
+    if path is None:
+        raise FileNotFoundError(
+            f"Image not found for slug '{slug}' in {directory}"
+        )
+    return path
+
+
+def _meta_from_entry(slug: str, entry: dict, directory: Path) -> ImageMeta:
+    return ImageMeta(
+        slug=slug,
+        path=directory / entry["file"],
+        tags=tuple(entry["tags"]),
+        description=entry["description"],
+        source=entry["source"],
+        added=entry["added"],
+        phash=entry.get("phash", ""),
     )
 
 
 def load_image_meta(slug: str, library_dir: Path | None = None) -> ImageMeta:
     """Load metadata for a single image by slug."""
+    validate_slug(slug)
     directory = library_dir or _get_library_dir()
-    image_path = resolve_image_path(slug, directory)
-    yml_path = directory / f"{slug}.yml"
+    entry = get_index(directory).entries.get(slug)
+    if entry is None:
+        raise FileNotFoundError(
+            f"Image not found for slug '{slug}' in {directory}"
+        )
+    return _meta_from_entry(slug, entry, directory)
 
-    if yml_path.exists():
-        data = yaml.safe_load(yml_path.read_text(encoding="utf-8")) or {}
-    else:
-        data = {}
 
-    return ImageMeta(
-        slug=slug,
-        path=image_path,
-        tags=tuple(data.get("tags", [])),
-        description=data.get("description", ""),
-        source=str(data.get("source", "")),
-        added=str(data.get("added", "")),
-    )
+def _list_from_index(index: LibraryIndex, slugs=None) -> list[ImageMeta]:
+    return [
+        _meta_from_entry(slug, index.entries[slug], index.directory)
+        for slug in sorted(index.entries if slugs is None else slugs)
+    ]
 
 
 def list_images(library_dir: Path | None = None) -> list[ImageMeta]:
@@ -102,39 +140,110 @@ def list_images(library_dir: Path | None = None) -> list[ImageMeta]:
     directory = library_dir or _get_library_dir()
     if not directory.exists():
         return []
-
-    slugs: set[str] = set()
-    for ext in SUPPORTED_EXTENSIONS:
-        for path in directory.glob(f"*{ext}"):
-            slugs.add(path.stem)
-
-    results = []
-    for slug in sorted(slugs):
-        results.append(load_image_meta(slug, directory))
-    return results
+    return _list_from_index(get_index(directory))
 
 
 def search_images(
     tags: list[str], library_dir: Path | None = None
 ) -> list[ImageMeta]:
     """Search images by tag (AND matching — all tags must be present)."""
-    all_images = list_images(library_dir)
-    tag_set = {t.lower() for t in tags}
+    directory = library_dir or _get_library_dir()
+    if not directory.exists():
+        return []
+    index = get_index(directory)
+    return _list_from_index(index, get_tag_index(index).match_tags(tags))
+
+
+def query_images(
+    query: str, library_dir: Path | None = None, tags: list[str] | None = None
+) -> list[ImageMeta]:
+    """Search images with a boolean query (see oslo.library_query).
+
+    tags, if given, further restricts the result to images carrying all
+    of them (exact tags, taken literally rather than parsed as a query).
+    Raises QuerySyntaxError (a ValueError) for malformed queries.
+    """
+    expression = parse_query(query)
+    directory = library_dir or _get_library_dir()
+    if not directory.exists():
+        return []
+    index = get_index(directory)
+    tag_index = get_tag_index(index)
+    slugs = expression.evaluate(tag_index)
+    if tags:
+        slugs &= tag_index.match_tags(tags)
+    return _list_from_index(index, slugs)
+
+
+# BK-trees per library directory, with the index and generation they were built from
+_hash_trees: dict[Path, tuple[LibraryIndex, int, BKTree[str]]] = {}
+
+
+def _hash_tree(index: LibraryIndex) -> BKTree[str]:
+    key = index.directory.resolve()
+    cached = _hash_trees.get(key)
+    if cached is not None and cached[0] is index and cached[1] == index.generation:
+        return cached[2]
+    tree: BKTree[str] = BKTree()
+    for slug, entry in index.entries.items():
+        value = parse_hash(entry.get("phash", ""))
+        if value is not None:
+            tree.add(value, slug)
+    _hash_trees[key] = (index, index.generation, tree)
+    return tree
+
+
+def find_duplicates(
+    image_path: Path,
+    library_dir: Path | None = None,
+    threshold: int = DUPLICATE_THRESHOLD,
+) -> list[tuple[int, ImageMeta]]:
+    """Find library images perceptually close to image_path, nearest first.
+
+    Returns an empty list if the image cannot be decoded.
+    """
+    return _duplicates_of(image_hash(image_path), library_dir or _get_library_dir(), threshold)
+
+
+def _duplicates_of(
+    phash: str, directory: Path, threshold: int = DUPLICATE_THRESHOLD
+) -> list[tuple[int, ImageMeta]]:
+    value = parse_hash(phash)
+    if value is None or not directory.exists():
+        return []
+    index = get_index(directory)
     return [
-        img
-        for img in all_images
-        if tag_set <= {t.lower() for t in img.tags}
+        (distance, _meta_from_entry(slug, index.entries[slug], directory))
+        for distance, slug in _hash_tree(index).search(value, threshold)
     ]
 
 
+def find_duplicate_clusters(
+    library_dir: Path | None = None, threshold: int = DUPLICATE_THRESHOLD
+) -> list[list[ImageMeta]]:
+    """Group library images that are near-duplicates of each other."""
+    directory = library_dir or _get_library_dir()
+    if not directory.exists():
+        return []
+    index = get_index(directory)
+    hashes = {}
+    for slug, entry in index.entries.items():
+        value = parse_hash(entry.get("phash", ""))
+        if value is not None:
+            hashes[slug] = value
+    return [_list_from_index(index, cluster) for cluster in find_clusters(hashes, threshold)]
+
+
 def _next_slug_number(library_dir: Path) -> int:
-    """Return the next available 3-digit number for auto-numbering."""
+    """Return the next available 3-digit number for auto-numbering.
+
+    Callers allocating a number must hold the library lock until the
+    image is written.
+    """
     max_num = 0
-    for ext in SUPPORTED_EXTENSIONS:
-        for path in library_dir.glob(f"*{ext}"):
-            stem = path.stem
-            if len(stem) >= 3 and stem[:3].isdigit():
-                max_num = max(max_num, int(stem[:3]))
+    for stem in get_index(library_dir).entries:
+        if len(stem) >= 3 and stem[:3].isdigit():
+            max_num = max(max_num, int(stem[:3]))
     return max_num + 1
 
 
@@ -146,8 +255,17 @@ def add_image(
     description: str = "",
     source: str = "",
     library_dir: Path | None = None,
+    allow_duplicate: bool = False,
+    name: str | None = None,
+    provenance: dict | None = None,
 ) -> ImageMeta:
-    """Copy an image to the library and create its YAML sidecar."""
+    """Copy an image to the library and create its YAML sidecar.
+
+    The auto slug is derived from `name` (default: the file name).
+    `provenance` is stored as-is in the sidecar. Raises DuplicateImageError
+    if the image is a near-duplicate of one already in the library, unless
+    allow_duplicate is set.
+    """
     directory = library_dir or _get_library_dir()
     directory.mkdir(parents=True, exist_ok=True)
 
@@ -158,83 +276,317 @@ def add_image(
             f"Supported: {', '.join(SUPPORTED_EXTENSIONS)}"
         )
 
-    if slug is None:
-        num = _next_slug_number(directory)
-        # Sanitize filename to safe slug characters
-        base = re.sub(r"[^a-z0-9-]", "-", source_path.stem.lower())
-        base = re.sub(r"-+", "-", base).strip("-")
-        if not base:
-            base = "image"
-        slug = f"{num:03d}_{base}"
-    else:
+    phash = image_hash(source_path)
+    if not allow_duplicate:
+        matches = _duplicates_of(phash, directory)
+        if matches:
+            raise DuplicateImageError(matches)
+
+    if slug is not None:
         validate_slug(slug)
 
-    dest_path = directory / f"{slug}{ext}"
-    if dest_path.exists():
-        raise FileExistsError(f"Image already exists: {dest_path}")
+    # Numbering and writing happen under one lock so concurrent adds
+    # (threads or processes) never allocate the same slug
+    with file_lock(directory / LOCK_FILE_NAME):
+        if slug is None:
+            num = _next_slug_number(directory)
+            # Sanitize filename to safe slug characters
+            base = re.sub(r"[^a-z0-9-]", "-", (name or source_path.stem).lower())
+            base = re.sub(r"-+", "-", base).strip("-")
+            if not base:
+                base = "image"
+            slug = f"{num:03d}_{base}"
+
+        dest_path = directory / f"{slug}{ext}"
+        if dest_path.exists():
+            raise FileExistsError(f"Image already exists: {dest_path}")
+
+        meta = ImageMeta(
+            slug=slug,
+            path=dest_path,
+            tags=tags,
+            description=description,
+            source=source,
+            added=date.today().isoformat(),
+            phash=phash,
+        )
+        # Sidecar first, so the image never appears without its metadata
+        _save_meta(meta, directory, provenance)
+        tmp_path = dest_path.with_name(f".{dest_path.name}.{os.getpid()}.tmp")
+        try:
+            shutil.copy2(source_path, tmp_path)
+            os.replace(tmp_path, dest_path)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+    return meta
 
-    shutil.copy2(source_path, dest_path)
 
-    meta = ImageMeta(
-        slug=slug,
-        path=dest_path,
-        tags=tags,
-        description=description,
-        source=source,
-        added=date.today().isoformat(),
-    )
-    _save_meta(meta, directory)
-    return meta
+@dataclass
+class AddResult:
+    """Outcome of adding one file in a bulk import."""
+
+    source_path: Path
+    meta: ImageMeta | None = None
+    duplicates: list[str] = field(default_factory=list)  # slugs or source paths
+    # Why the file was not added, or a warning if it was (analysis failure)
+    error: str = ""
+
+    @property
+    def added(self) -> bool:
+        return self.meta is not None
+
+
+def collect_image_paths(paths: Iterable[Path]) -> list[Path]:
+    """Expand directories into their supported image files (sorted, non-recursive)."""
+    result: list[Path] = []
+    for path in paths:
+        if path.is_dir():
+            result.extend(
+                p for p in sorted(path.iterdir())
+                if p.is_file() and p.suffix.lower() in SUPPORTED_EXTENSIONS
+                and not p.name.startswith(".")
+            )
+        else:
+            result.append(path)
+    return result
+
+
+def add_images(
+    paths: Iterable[Path],
+    *,
+    api_key: str | None = None,
+    source: str = "",
+    slug: str | None = None,
+    library_dir: Path | None = None,
+    concurrency: int = DEFAULT_ADD_CONCURRENCY,
+    allow_duplicate: bool = False,
+    on_result: Callable[[AddResult], None] | None = None,
+) -> list[AddResult]:
+    """Add many images, running vision analysis concurrently.
+
+    Near-duplicates of library images, or of earlier files in the same
+    batch, are skipped before any analysis unless allow_duplicate is set.
+    Without api_key the images are added with empty metadata. Images are
+    added in input order as their analyses complete; on_result is called
+    for each one. `slug` is only valid when importing a single image.
+    """
+    import openai
+
+    directory = library_dir or _get_library_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    files = collect_image_paths(paths)
+    if slug is not None and len(files) != 1:
+        raise ValueError("A custom slug can only be given for a single image")
+
+    results = [AddResult(source_path=p) for p in files]
+    pending: list[AddResult] = []
+    batch: BKTree[str] = BKTree()
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        hashes = list(pool.map(image_hash, files))
+        for result, phash in zip(results, hashes):
+            if result.source_path.suffix.lower() not in SUPPORTED_EXTENSIONS:
+                result.error = f"unsupported image format '{result.source_path.suffix}'"
+            elif not allow_duplicate and (value := parse_hash(phash)) is not None:
+                result.duplicates = [m.slug for _, m in _duplicates_of(phash, directory)]
+                result.duplicates += [str(p) for _, p in batch.search(value, DUPLICATE_THRESHOLD)]
+                if not result.duplicates:
+                    batch.add(value, str(result.source_path))
+            if not result.error and not result.duplicates:
+                pending.append(result)
+            elif on_result:
+                on_result(result)
+
+        def analyze(path: Path) -> dict[str, object] | Exception:
+            if not api_key:
+                return {"tags": [], "description": ""}
+            try:
+                return analyze_image(api_key, path)
+            except (ValueError, openai.APIError) as e:
+                return e
+
+        analyses = pool.map(analyze, [r.source_path for r in pending])
+        for result, analysis in zip(pending, analyses):
+            if isinstance(analysis, Exception):
+                result.error = f"analysis failed: {analysis}"
+                analysis = {"tags": [], "description": ""}
+            try:
+                result.meta = add_image(
+                    result.source_path,
+                    slug=slug,
+                    tags=tuple(analysis.get("tags", [])),
+                    description=str(analysis.get("description", "")),
+                    source=source,
+                    library_dir=directory,
+                    allow_duplicate=True,
+                )
+            except (OSError, ValueError) as e:
+                result.error = str(e)
+            if on_result:
+                on_result(result)
+    return results
 
 
-def _save_meta(meta: ImageMeta, library_dir: Path) -> Path:
+GENERATED_TAG = "AI生成"
+MAX_PROMPT_TAGS = 12
+# Katakana words, kanji compounds and English words worth searching for
+_PROMPT_TAG_PATTERN = re.compile(r"[ァ-ヴー]{2,}|[一-鿿々]{2,}|[A-Za-z][A-Za-z-]{3,}")
+_PROMPT_STOPWORDS = frozenset(
+    "with from that this into over under their there about image images photo "
+    "style scene text words letters include cinematic vertical composition vibrant "
+    "colors color high detail dramatic lighting".split()
+)
+
+
+def prompt_tags(text: str, limit: int = MAX_PROMPT_TAGS) -> tuple[str, ...]:
+    """Derive search tags from an image prompt without a vision call.
+
+    Picks katakana words, kanji compounds and English words (minus
+    style boilerplate), in order of first appearance.
+    """
+    tags: list[str] = []
+    for match in _PROMPT_TAG_PATTERN.findall(text):
+        tag = match.lower() if match.isascii() else match
+        if tag in _PROMPT_STOPWORDS or tag in tags:
+            continue
+        tags.append(tag)
+        if len(tags) >= limit:
+            break
+    return tuple(tags)
+
+
+def promote_generated_image(
+    image_path: Path,
+    *,
+    prompt: str,
+    subject: str,
+    provider: str,
+    model: str,
+    conte: str = "",
+    name: str | None = None,
+    library_dir: Path | None = None,
+) -> ImageMeta | None:
+    """Register an AI-generated scene image in the library for later reuse.
+
+    `subject` is the scene's visual description (or narration) and becomes
+    the description and tag source; the full prompt, provider, model and
+    conte are kept as provenance. Returns None if a near-duplicate is
+    already in the library.
+    """
+    provenance = {
+        "prompt": prompt,
+        "provider": provider,
+        "model": model,
+        "conte": conte,
+        "generated": date.today().isoformat(),
+    }
+    try:
+        return add_image(
+            image_path,
+            tags=(GENERATED_TAG, *prompt_tags(subject)),
+            description=subject,
+            source=f"generated:{provider}/{model}",
+            library_dir=library_dir,
+            name=name or "gen",
+            provenance=provenance,
+        )
+    except DuplicateImageError:
+        return None
+
+
+def _save_meta(meta: ImageMeta, library_dir: Path, provenance: dict | None = None) -> Path:
     """Write metadata to a YAML sidecar file."""
+    import yaml
+
     data = {
         "tags": list(meta.tags),
         "description": meta.description,
         "source": meta.source,
         "added": meta.added,
     }
+    if meta.phash:
+        data["phash"] = meta.phash
+    if provenance:
+        data["provenance"] = provenance
     yml_path = library_dir / f"{meta.slug}.yml"
-    yml_path.write_text(
-        yaml.dump(data, allow_unicode=True, default_flow_style=False, sort_keys=False),
-        encoding="utf-8",
+    atomic_write_bytes(
+        yml_path,
+        yaml.dump(
+            data, allow_unicode=True, default_flow_style=False, sort_keys=False
+        ).encode("utf-8"),
     )
     return yml_path
 
 
-@retry_on_rate_limit()
-def analyze_image(api_key: str, image_path: Path) -> dict[str, object]:
-    """Analyze an image with GPT-4o vision and return tags + description."""
-    image_bytes = image_path.read_bytes()
-    b64 = base64.b64encode(image_bytes).decode()
+def encode_for_analysis(
+    image_path: Path, max_size: int = ANALYSIS_MAX_SIZE
+) -> tuple[bytes, str]:
+    """Return (bytes, media type) of an image sized for vision analysis.
 
+    Images larger than max_size on either side (or ANALYSIS_MAX_BYTES on
+    disk) are downscaled and re-encoded as JPEG in memory; others, and
+    files PIL cannot read, are sent as-is.
+    """
     suffix = image_path.suffix.lower()
     media_types = {
         ".png": "image/png", ".jpg": "image/jpeg",
         ".jpeg": "image/jpeg", ".webp": "image/webp",
     }
     media_type = media_types.get(suffix, "image/png")
+    try:
+        from PIL import Image
+
+        with Image.open(image_path) as img:
+            if max(img.size) > max_size or image_path.stat().st_size > ANALYSIS_MAX_BYTES:
+                # JPEG can decode directly at a reduced scale
+                img.draft("RGB", (max_size, max_size))
+                small = img.convert("RGB")
+                small.thumbnail((max_size, max_size), Image.Resampling.LANCZOS)
+                buffer = io.BytesIO()
+                small.save(buffer, "JPEG", quality=85)
+                return buffer.getvalue(), "image/jpeg"
+    except OSError:
+        pass
+    return image_path.read_bytes(), media_type
 
-    client = OpenAI(api_key=api_key)
-    response = client.chat.completions.create(
-        model="gpt-4o",
-        messages=[
-            {
-                "role": "user",
-                "content": [
-                    {
-                        "type": "image_url",
-                        "image_url": {"url": f"data:{media_type};base64,{b64}"},
-                    },
-                    {"type": "text", "text": _ANALYSIS_PROMPT},
-                ],
-            }
-        ],
-        max_tokens=500,
-    )
 
-    content = response.choices[0].message.content
+@retry_on_rate_limit()
+def analyze_image(api_key: str, image_path: Path) -> dict[str, object]:
+    """Analyze an image with GPT-4o vision and return tags + description."""
+    from oslo.clients import get_openai_client
+    from oslo.concurrency import get_limiter
+    from oslo.fixtures import provider_bytes
+
+    image_bytes, media_type = encode_for_analysis(image_path)
+    b64 = base64.b64encode(image_bytes).decode()
+
+    def call() -> bytes:
+        response = get_openai_client(api_key).chat.completions.create(
+            model="gpt-4o",
+            messages=[
+                {
+                    "role": "user",
+                    "content": [
+                        {
+                            "type": "image_url",
+                            "image_url": {"url": f"data:{media_type};base64,{b64}"},
+                        },
+                        {"type": "text", "text": _ANALYSIS_PROMPT},
+                    ],
+                }
+            ],
+            max_tokens=500,
+        )
+        return (response.choices[0].message.content or "").encode("utf-8")
+
+    request = {
+        "model": "gpt-4o",
+        "image_sha256": hashlib.sha256(image_bytes).hexdigest(),
+        "media_type": media_type,
+        "prompt": _ANALYSIS_PROMPT,
+        "max_tokens": 500,
+    }
+    with get_limiter("openai-vision").slot():
+        content = provider_bytes("vision", request, call).decode("utf-8")
     if not content:
         return {"tags": [], "description": ""}
 
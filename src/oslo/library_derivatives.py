@@ -0,0 +1,77 @@
+"""Cache of library images resized and cropped to video resolution."""
+
+from __future__ import annotations
+
+import hashlib
+import math
+import os
+import re
+from pathlib import Path
+
+from PIL import Image
+
+from oslo.utils import file_lock
+
+DERIVATIVES_DIR_NAME = ".derivatives"
+# Bump when the resize/crop output changes so old derivatives are ignored
+DERIVATIVE_VERSION = 1
+
+
+def cover_size(size: tuple[int, int], target: tuple[int, int]) -> tuple[int, int]:
+    """Size an image must be scaled to so it covers target (ceil avoids 1px gaps)."""
+    img_w, img_h = size
+    target_w, target_h = target
+    scale = max(target_w / img_w, target_h / img_h)
+    return math.ceil(img_w * scale), math.ceil(img_h * scale)
+
+
+def render_cover(source: Path, output_path: Path, width: int, height: int) -> Path:
+    """Resize source to cover width x height, center-crop and save as PNG."""
+    with Image.open(source) as img:
+        # JPEG can decode at 1/2, 1/4 or 1/8 scale directly; draft picks the
+        # smallest scale that still covers the target
+        img.draft("RGB", cover_size(img.size, (width, height)))
+        image = img.convert("RGB")
+
+    new_w, new_h = cover_size(image.size, (width, height))
+    image = image.resize((new_w, new_h), Image.LANCZOS)
+
+    left = (new_w - width) // 2
+    top = (new_h - height) // 2
+    image = image.crop((left, top, left + width, top + height))
+    image.save(str(output_path), format="PNG")
+    return output_path
+
+
+def derivative_path(source: Path, width: int, height: int) -> Path:
+    """Cache path for a source at a size, keyed by the source's mtime and size."""
+    st = source.stat()
+    key = f"{DERIVATIVE_VERSION}:{source.name}:{st.st_mtime_ns}:{st.st_size}"
+    digest = hashlib.blake2b(key.encode("utf-8"), digest_size=6).hexdigest()
+    return source.parent / DERIVATIVES_DIR_NAME / f"{source.stem}-{digest}-{width}x{height}.png"
+
+
+def get_derivative(source: Path, width: int, height: int) -> Path:
+    """Return a cached cover-cropped PNG of source, rendering it on a miss.
+
+    Derivatives live in <library>/.derivatives; stale ones for the same
+    image and size are removed when a new one is rendered.
+    """
+    path = derivative_path(source, width, height)
+    if path.exists():
+        return path
+    path.parent.mkdir(exist_ok=True)
+    with file_lock(path.parent / ".lock"):
+        if path.exists():
+            return path
+        stale_name = re.compile(rf"{re.escape(source.stem)}-[0-9a-f]{{12}}-{width}x{height}\.png")
+        for stale in path.parent.glob(f"{source.stem}-*-{width}x{height}.png"):
+            if stale_name.fullmatch(stale.name):
+                stale.unlink(missing_ok=True)
+        tmp_path = path.with_name(f".{path.stem}.{os.getpid()}.tmp.png")
+        try:
+            render_cover(source, tmp_path, width, height)
+            os.replace(tmp_path, path)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+    return path
@@ -0,0 +1,171 @@
+"""On-disk index of the image library, invalidated by file mtimes."""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+from pathlib import Path
+
+from oslo.imagehash import image_hash, parse_hash
+
+INDEX_FILE_NAME = ".index.json"
+# Bump when the entry layout changes; older indexes are rebuilt
+INDEX_VERSION = 2
+SUPPORTED_EXTENSIONS = (".png", ".jpg", ".jpeg", ".webp")
+
+# Loaded indexes per library directory, reused within the process
+_indexes: dict[Path, LibraryIndex] = {}
+
+
+def _read_sidecar(path: Path) -> dict:
+    import yaml
+
+    try:
+        data = yaml.safe_load(path.read_text(encoding="utf-8")) or {}
+    except (OSError, yaml.YAMLError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+class LibraryIndex:
+    """Slug -> metadata index for one library directory.
+
+    Stored as compact JSON in the library directory. A refresh lists the
+    directory once and only re-reads sidecars whose mtime or size changed.
+    """
+
+    def __init__(self, directory: Path, entries: dict[str, dict] | None = None):
+        self.directory = directory
+        self.entries: dict[str, dict] = entries or {}
+        self.generation = 0  # incremented whenever entries change
+        self._dir_mtime_ns: int | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def path(self) -> Path:
+        return self.directory / INDEX_FILE_NAME
+
+    @classmethod
+    def load(cls, directory: Path) -> LibraryIndex:
+        """Load the index file, or start empty if it is missing or outdated."""
+        index = cls(directory)
+        try:
+            data = json.loads(index.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return index
+        if isinstance(data, dict) and data.get("version") == INDEX_VERSION:
+            index.entries = data.get("entries", {})
+        return index
+
+    def save(self) -> None:
+        """Write the index atomically; failures (e.g. read-only dir) are ignored."""
+        tmp_path = self.path.with_name(f"{INDEX_FILE_NAME}.{os.getpid()}.tmp")
+        data = {"version": INDEX_VERSION, "entries": self.entries}
+        try:
+            tmp_path.write_text(
+                json.dumps(data, ensure_ascii=False, separators=(",", ":")), encoding="utf-8"
+            )
+            os.replace(tmp_path, self.path)
+        except OSError:
+            tmp_path.unlink(missing_ok=True)
+
+    def refresh(self, *, quick: bool = False) -> bool:
+        """Bring entries up to date with the directory. Returns True if changed.
+
+        With quick=True the scan is skipped when the directory's own mtime
+        is unchanged, which covers added/removed files but not sidecars
+        edited in place; use it for existence lookups only.
+        """
+        with self._lock:
+            return self._refresh(quick)
+
+    def _refresh(self, quick: bool) -> bool:
+        try:
+            dir_mtime_ns = self.directory.stat().st_mtime_ns
+        except OSError:
+            changed = bool(self.entries)
+            self.entries = {}
+            self._dir_mtime_ns = None
+            if changed:
+                self.generation += 1
+            return changed
+        if quick and dir_mtime_ns == self._dir_mtime_ns:
+            return False
+
+        images: dict[str, os.DirEntry] = {}
+        sidecars: dict[str, os.DirEntry] = {}
+        ext_rank = {ext: i for i, ext in enumerate(SUPPORTED_EXTENSIONS)}
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                stem, ext = os.path.splitext(entry.name)
+                if ext == ".yml":
+                    sidecars[stem] = entry
+                elif ext in ext_rank and entry.is_file():
+                    # Same precedence as probing the extensions in order
+                    current = images.get(stem)
+                    current_rank = ext_rank[os.path.splitext(current.name)[1]] if current else 99
+                    if ext_rank[ext] < current_rank:
+                        images[stem] = entry
+
+        changed = False
+        entries: dict[str, dict] = {}
+        for slug, image in images.items():
+            image_stat = image.stat()
+            sidecar = sidecars.get(slug)
+            meta_stat = sidecar.stat() if sidecar else None
+            key = [
+                image.name,
+                image_stat.st_mtime_ns,
+                image_stat.st_size,
+                meta_stat.st_mtime_ns if meta_stat else 0,
+                meta_stat.st_size if meta_stat else 0,
+            ]
+            old = self.entries.get(slug)
+            if old is not None and old.get("key") == key:
+                entries[slug] = old
+                continue
+            data = _read_sidecar(Path(sidecar.path)) if sidecar else {}
+            phash = str(data.get("phash", "") or "")
+            if parse_hash(phash) is None:
+                # Images added before hashing existed: hash once, cached here
+                phash = image_hash(Path(image.path))
+            entries[slug] = {
+                "key": key,
+                "file": image.name,
+                "tags": [str(t) for t in data.get("tags", []) or []],
+                "description": str(data.get("description", "") or ""),
+                "source": str(data.get("source", "") or ""),
+                "added": str(data.get("added", "") or ""),
+                "phash": phash,
+            }
+            changed = True
+
+        if set(entries) != set(self.entries):
+            changed = True
+        self.entries = entries
+        self._dir_mtime_ns = dir_mtime_ns
+        if changed:
+            self.generation += 1
+            self.save()
+            # Our own write bumps the directory mtime; don't treat it as a change
+            try:
+                self._dir_mtime_ns = self.directory.stat().st_mtime_ns
+            except OSError:
+                pass
+        return changed
+
+    def file_for(self, slug: str) -> Path | None:
+        entry = self.entries.get(slug)
+        return self.directory / entry["file"] if entry else None
+
+
+def get_index(directory: Path, *, quick: bool = False) -> LibraryIndex:
+    """Return the up-to-date index for a library directory."""
+    key = directory.resolve()
+    index = _indexes.get(key)
+    if index is None:
+        index = LibraryIndex.load(directory)
+        _indexes[key] = index
+    index.refresh(quick=quick)
+    return index
@@ -0,0 +1,302 @@
+"""Inverted index and boolean query language over the image library.
+
+Query syntax (terms are case-insensitive and NFKC-normalized; operators
+are upper-case):
+
+    政治 国会            both terms (implicit AND)
+    政治 OR 経済         either term
+    NOT 夜  /  -夜       exclude a term
+    (政治 OR 経済) 建物  grouping
+    安倍*                prefix match
+    tag:政治 desc:交差点 source:unsplash slug:001_*   field filters
+    "記者 会見"          quoted term containing spaces
+
+A bare term matches an exact tag or a substring of the description.
+"""
+
+from __future__ import annotations
+
+import bisect
+import re
+import unicodedata
+from dataclasses import dataclass
+from pathlib import Path
+
+from oslo.library_index import LibraryIndex
+
+FIELDS = ("tag", "desc", "source", "slug")
+
+_CJK_CHAR = r"぀-ヿ㐀-䶿一-鿿豈-﫿々ー"
+# Word characters other than CJK: a Latin-led run must stop where CJK
+# text begins, or "ai技術" would be indexed as one token
+_DESC_TOKEN = re.compile(rf"[{_CJK_CHAR}]+|[^\W_{_CJK_CHAR}]+")
+_CJK_RUN = re.compile(rf"^[{_CJK_CHAR}]+$")
+_QUERY_TOKEN = re.compile(r'\s*(?:(\()|(\))|(-)(?=\S)|((?:[a-z]+:)?"[^"]*"\*?)|([^\s()"]+))')
+
+
+class QuerySyntaxError(ValueError):
+    """Raised when a library query cannot be parsed."""
+
+
+def normalize(text: str) -> str:
+    """NFKC-normalize and casefold text for matching."""
+    return unicodedata.normalize("NFKC", text).casefold().strip()
+
+
+def description_tokens(text: str) -> list[str]:
+    """Split normalized text into index tokens.
+
+    Latin/digit words are kept whole; CJK runs, which have no word
+    boundaries, become overlapping bigrams (a lone character is kept).
+    """
+    tokens: list[str] = []
+    for run in _DESC_TOKEN.findall(text):
+        if _CJK_RUN.match(run) and len(run) > 1:
+            tokens.extend(run[i : i + 2] for i in range(len(run) - 1))
+        else:
+            tokens.append(run)
+    return tokens
+
+
+class _Postings:
+    """Term -> slug set, with a sorted term list for prefix lookups."""
+
+    def __init__(self) -> None:
+        self.sets: dict[str, set[str]] = {}
+        self._sorted: list[str] | None = None
+
+    def add(self, term: str, slug: str) -> None:
+        self.sets.setdefault(term, set()).add(slug)
+
+    def exact(self, term: str) -> set[str]:
+        return self.sets.get(term, set())
+
+    def prefix(self, term: str) -> set[str]:
+        if self._sorted is None:
+            self._sorted = sorted(self.sets)
+        result: set[str] = set()
+        i = bisect.bisect_left(self._sorted, term)
+        while i < len(self._sorted) and self._sorted[i].startswith(term):
+            result |= self.sets[self._sorted[i]]
+            i += 1
+        return result
+
+
+class TagIndex:
+    """Inverted index over one library's tags, descriptions, sources and slugs."""
+
+    def __init__(self, entries: dict[str, dict]):
+        self.slugs: set[str] = set(entries)
+        self.tags = _Postings()
+        self.desc = _Postings()
+        self.sources = _Postings()
+        self.slug_terms = _Postings()
+        # Normalized descriptions, to confirm bigram candidates are real substrings
+        self.descriptions: dict[str, str] = {}
+        for slug, entry in entries.items():
+            for tag in entry["tags"]:
+                self.tags.add(normalize(tag), slug)
+            description = normalize(entry["description"])
+            self.descriptions[slug] = description
+            for token in set(description_tokens(description)):
+                self.desc.add(token, slug)
+            if entry["source"]:
+                self.sources.add(normalize(entry["source"]), slug)
+            self.slug_terms.add(slug, slug)
+
+    def match_tags(self, tags: list[str]) -> set[str]:
+        """Slugs carrying every one of the given tags."""
+        result = set(self.slugs)
+        for tag in tags:
+            result &= self.tags.exact(normalize(tag))
+            if not result:
+                break
+        return result
+
+    def match_description(self, term: str, prefix: bool = False) -> set[str]:
+        """Slugs whose description contains term."""
+        tokens = description_tokens(term)
+        if not tokens:
+            return set()
+        candidates: set[str] | None = None
+        for i, token in enumerate(tokens):
+            if prefix and i == len(tokens) - 1:
+                found = self.desc.prefix(token)
+            else:
+                found = self.desc.exact(token)
+                if _CJK_RUN.match(token) and len(token) == 1:
+                    # A single CJK character may sit inside any bigram
+                    found = found | self.desc.prefix(token)
+            candidates = found if candidates is None else candidates & found
+            if not candidates:
+                return set()
+        return {s for s in candidates if term in self.descriptions[s]}
+
+    def match(self, field: str | None, term: str, prefix: bool = False) -> set[str]:
+        """Slugs matching a single (optionally field-qualified) term."""
+        if field == "tag":
+            return self.tags.prefix(term) if prefix else set(self.tags.exact(term))
+        if field == "desc":
+            return self.match_description(term, prefix)
+        if field == "source":
+            return self.sources.prefix(term) if prefix else set(self.sources.exact(term))
+        if field == "slug":
+            return self.slug_terms.prefix(term) if prefix else set(self.slug_terms.exact(term))
+        return self.match("tag", term, prefix) | self.match_description(term, prefix)
+
+
+@dataclass(frozen=True)
+class Term:
+    field: str | None
+    value: str
+    prefix: bool = False
+
+    def evaluate(self, index: TagIndex) -> set[str]:
+        return index.match(self.field, self.value, self.prefix)
+
+
+@dataclass(frozen=True)
+class Not:
+    operand: Term | Not | And | Or
+
+    def evaluate(self, index: TagIndex) -> set[str]:
+        return index.slugs - self.operand.evaluate(index)
+
+
+@dataclass(frozen=True)
+class And:
+    operands: tuple[Term | Not | And | Or, ...]
+
+    def evaluate(self, index: TagIndex) -> set[str]:
+        # Evaluate positive operands first so NOT only narrows a small set
+        ordered = sorted(self.operands, key=lambda op: isinstance(op, Not))
+        result = ordered[0].evaluate(index)
+        for op in ordered[1:]:
+            if not result:
+                break
+            if isinstance(op, Not):
+                result = result - op.operand.evaluate(index)
+            else:
+                result = result & op.evaluate(index)
+        return result
+
+
+@dataclass(frozen=True)
+class Or:
+    operands: tuple[Term | Not | And | Or, ...]
+
+    def evaluate(self, index: TagIndex) -> set[str]:
+        result: set[str] = set()
+        for op in self.operands:
+            result |= op.evaluate(index)
+        return result
+
+
+def _tokenize(query: str) -> list[str]:
+    tokens = []
+    pos = 0
+    query = query.strip()
+    while pos < len(query):
+        m = _QUERY_TOKEN.match(query, pos)
+        if not m or m.end() == pos:
+            raise QuerySyntaxError(f"Unexpected character at position {pos}: {query[pos:]!r}")
+        tokens.append(next(g for g in m.groups() if g is not None))
+        pos = m.end()
+        while pos < len(query) and query[pos].isspace():
+            pos += 1
+    return tokens
+
+
+def _parse_term(token: str) -> Term:
+    field = None
+    value = token
+    head, sep, rest = token.partition(":")
+    if sep and head.lower() in FIELDS:
+        field, value = head.lower(), rest
+    prefix = value.endswith("*")
+    if prefix:
+        value = value[:-1]
+    if value.startswith('"') and value.endswith('"') and len(value) >= 2:
+        value = value[1:-1]
+    value = normalize(value)
+    if not value:
+        raise QuerySyntaxError(f"Empty search term: {token!r}")
+    return Term(field, value, prefix)
+
+
+class _Parser:
+    def __init__(self, tokens: list[str]):
+        self.tokens = tokens
+        self.pos = 0
+
+    def peek(self) -> str | None:
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else None
+
+    def take(self) -> str:
+        token = self.tokens[self.pos]
+        self.pos += 1
+        return token
+
+    def parse_or(self):
+        operands = [self.parse_and()]
+        while self.peek() == "OR":
+            self.take()
+            operands.append(self.parse_and())
+        return operands[0] if len(operands) == 1 else Or(tuple(operands))
+
+    def parse_and(self):
+        operands = [self.parse_not()]
+        while self.peek() not in (None, "OR", ")"):
+            if self.peek() == "AND":
+                self.take()
+            operands.append(self.parse_not())
+        return operands[0] if len(operands) == 1 else And(tuple(operands))
+
+    def parse_not(self):
+        if self.peek() in ("NOT", "-"):
+            self.take()
+            return Not(self.parse_not())
+        return self.parse_atom()
+
+    def parse_atom(self):
+        token = self.peek()
+        if token is None:
+            raise QuerySyntaxError("Query ended unexpectedly")
+        if token in ("AND", "OR", ")"):
+            raise QuerySyntaxError(f"Unexpected '{token}'")
+        self.take()
+        if token == "(":
+            node = self.parse_or()
+            if self.peek() != ")":
+                raise QuerySyntaxError("Missing ')'")
+            self.take()
+            return node
+        return _parse_term(token)
+
+
+def parse_query(query: str) -> Term | Not | And | Or:
+    """Parse a query string into an expression tree."""
+    tokens = _tokenize(query)
+    if not tokens:
+        raise QuerySyntaxError("Empty query")
+    parser = _Parser(tokens)
+    node = parser.parse_or()
+    if parser.peek() is not None:
+        raise QuerySyntaxError(f"Unexpected '{parser.peek()}'")
+    return node
+
+
+# Built inverted indexes per library directory, with the index and generation
+# they were built from
+_tag_indexes: dict[Path, tuple[LibraryIndex, int, TagIndex]] = {}
+
+
+def get_tag_index(index: LibraryIndex) -> TagIndex:
+    """Return the inverted index for a library index, rebuilding it on change."""
+    key = index.directory.resolve()
+    cached = _tag_indexes.get(key)
+    if cached is not None and cached[0] is index and cached[1] == index.generation:
+        return cached[2]
+    tag_index = TagIndex(index.entries)
+    _tag_indexes[key] = (index, index.generation, tag_index)
+    return tag_index
@@ -1,19 +1,31 @@
 """Pipeline orchestrator: text -> video."""
 
+import json
 import shutil
 import tempfile
+import time
+from datetime import datetime
 from pathlib import Path
 
 import click
 
-from oslo.composer import compose_video
-from oslo.config import AppConfig
+from oslo.concurrency import configure as configure_concurrency
+from oslo.concurrency import limiter_stats
+from oslo.config import AppConfig, ImageGenConfig
 from oslo.conte import is_conte_format, parse_conte, parse_conte_hook, parse_conte_title
+from oslo.fixtures import active_fixtures
 from oslo.image_gen import ImageGenerator
-from oslo.readings import apply_readings, load_readings
+from oslo.image_matcher import assign_library_images
+from oslo.rate_model import DurationStore, RateModel, make_sample
+from oslo.readings import find_readings_files, load_layered_readings
+from oslo.store import ArtifactStore
 from oslo.subtitles import generate_subtitles, write_srt
-from oslo.text_processor import split_into_scenes
-from oslo.tts import TTSClient
+from oslo.text_processor import Scene, SpeakingRate, estimate_duration, split_into_scenes
+from oslo.tts import TTSClient, measure_durations, tts_request_count
+
+# Run records kept in the artifact store; older ones are dropped so their
+# artifacts become evictable
+RUN_REFS_KEPT = 20
 
 
 def generate_video(
@@ -23,63 +35,103 @@ def generate_video(
     keep_temp: bool = False,
     verbose: bool = False,
     skip_confirm: bool = False,
+    profile_name: str | None = None,
+    draft: bool = False,
 ) -> Path:
-    """Full pipeline: text -> scenes -> audio + images + subtitles -> video."""
+    """Full pipeline: text -> scenes -> audio + images + subtitles -> video.
+
+    With draft=True the run's artifacts are recorded as a draft manifest
+    (see oslo.drafts) for a later finalize_video().
+    """
     text = input_file.read_text(encoding="utf-8").strip()
     if not text:
         raise click.ClickException("Input file is empty")
+    if draft and not config.store.enabled:
+        raise click.ClickException("Drafts are kept in the artifact store; drop --no-store")
 
-    title = None
-    hook_text = None
+    rate_store = DurationStore()
+    rate = RateModel.load(rate_store).rate_for(config.tts)
+    store = ArtifactStore.from_config(config.store) if config.store.enabled else None
+    configure_concurrency(config.concurrency)
+    artifacts: dict = {}
     temp_dir = Path(tempfile.mkdtemp(prefix="oslo_"))
     try:
         # Stage 1: Parse conte or split text into scenes
-        if input_file.suffix.lower() == ".md" or is_conte_format(text):
-            if verbose:
-                click.echo("Parsing conte...")
-            scenes = parse_conte(text, image_style_prefix=config.image_style_prefix)
-            title = parse_conte_title(text)
-            hook_text = parse_conte_hook(text)
-        else:
-            if verbose:
-                click.echo("Splitting text into scenes...")
-            scenes = split_into_scenes(
-                text,
-                max_duration=config.video.max_duration,
-                image_style_prefix=config.image_style_prefix,
+        scenes, title, hook_text = _parse_scenes(
+            text, input_file, config, rate, profile_name, verbose
+        )
+
+        # Reuse library photos for scenes whose text matches their tags
+        auto_matched = []
+        if config.library.auto_match:
+            auto_matched = assign_library_images(
+                scenes, threshold=config.library.match_threshold
             )
-        if verbose:
-            click.echo(f"  Created {len(scenes)} scenes")
-
-        # Apply TTS reading dictionary
-        readings_path = input_file.parent / "readings.yml"
-        if not readings_path.exists():
-            readings_path = Path.cwd() / "readings.yml"
-        readings = load_readings(readings_path)
-        if readings:
             if verbose:
-                click.echo(f"  Applied {len(readings)} reading(s) for TTS")
-            for scene in scenes:
-                scene.tts_text = apply_readings(scene.narration_text, readings)
+                for scene, match in auto_matched:
+                    click.echo(
+                        f"  Scene {scene.index + 1}: library image {match.slug} "
+                        f"(score {match.score:.2f})"
+                    )
+
+        # Predict narration length from the learned speaking rate
+        predicted = sum(estimate_duration(s.tts_text, rate) for s in scenes)
+        if verbose:
+            click.echo(
+                f"  Predicted narration: {predicted:.1f}s "
+                f"({rate.cpm:.0f} chars/min, {rate.wpm:.0f} words/min)"
+            )
 
         # Confirm before API calls
         if not skip_confirm:
             ai_image_count = sum(1 for s in scenes if not s.library_image)
             lib_image_count = sum(1 for s in scenes if s.library_image)
+            tts_count = tts_request_count(scenes, config.tts)
             click.echo(f"\n  Scenes: {len(scenes)}")
             click.echo(
-                f"  API calls: {len(scenes)} TTS + {ai_image_count} image generation"
+                f"  API calls: {tts_count} TTS + {ai_image_count} image generation"
             )
             if lib_image_count:
                 click.echo(f"  Library images: {lib_image_count} (no API cost)")
+            if auto_matched:
+                from oslo.check import image_cost
+
+                saved = len(auto_matched)
+                click.echo(
+                    f"  Auto-matched library images: {saved} "
+                    f"(saves {saved} image generation(s), "
+                    f"~${saved * image_cost(config.image_gen):.2f})"
+                )
+            click.echo(
+                f"  Predicted duration: {predicted:.0f}s (max {config.video.max_duration:.0f}s)"
+            )
+            if predicted > config.video.max_duration:
+                click.echo("  Warning: narration is predicted to exceed max duration")
             if not click.confirm("  Proceed with API calls?", default=True):
                 raise click.Abort()
 
+        # The run deadline counts from the first API call, not the prompt
+        started = time.monotonic()
+        deadline_at = started + config.deadline.run if config.deadline.run else None
+
         # Stage 2: Generate narration audio
         if verbose:
             click.echo("Generating narration audio...")
         tts_client = TTSClient(config.openai_api_key, config.tts)
         audio_paths = tts_client.generate_all_scenes(scenes, temp_dir, verbose=verbose)
+        audio_durations = measure_durations(audio_paths)
+        if store:
+            artifacts["audio"] = store.adopt_all(audio_paths)
+        # Replayed audio was already measured when it was recorded
+        archive = active_fixtures()
+        if archive is None or archive.mode != "replay":
+            rate_store.append(
+                [make_sample(s.tts_text, d, config.tts) for s, d in zip(scenes, audio_durations)]
+            )
+        if verbose:
+            click.echo(
+                f"  Narration: {sum(audio_durations):.1f}s (predicted {predicted:.1f}s)"
+            )
 
         # Stage 3: Generate background images
         if verbose:
@@ -90,17 +142,44 @@ def generate_video(
             video_config=config.video,
             google_api_key=config.google_api_key,
         )
-        image_paths = image_gen.generate_all_scenes(scenes, temp_dir, verbose=verbose)
+        image_paths = image_gen.generate_all_scenes(
+            scenes,
+            temp_dir,
+            verbose=verbose,
+            scene_deadline=config.deadline.scene,
+            deadline_at=deadline_at,
+        )
+        if verbose and config.image_gen.hedge.enabled:
+            click.echo(f"  Hedging: {image_gen.hedging.stats().describe()}")
+        if config.library.promote_generated:
+            promoted = _promote_generated_images(
+                scenes,
+                image_paths,
+                config,
+                input_file,
+                sources=image_gen.sources,
+                skip=set(image_gen.fallbacks),
+            )
+            if verbose:
+                click.echo(f"  Promoted {promoted} generated image(s) to the library")
+        if store:
+            artifacts["images"] = store.adopt_all(image_paths)
 
         # Stage 4: Generate subtitles
         if verbose:
             click.echo("Generating subtitles...")
-        subtitle_entries = generate_subtitles(scenes, audio_paths)
+        subtitle_entries = generate_subtitles(
+            scenes, audio_paths, audio_durations=audio_durations
+        )
         srt_path = write_srt(subtitle_entries, temp_dir / "subtitles.srt")
+        if store:
+            artifacts["subtitles"] = store.adopt(srt_path)
 
         # Stage 5: Compose final video
         if verbose:
             click.echo("Composing video...")
+        from oslo.composer import compose_video
+
         stat_overlays = [s.stat_overlay for s in scenes]
         compose_video(
             image_paths=image_paths,
@@ -113,6 +192,32 @@ def generate_video(
             stat_overlays=stat_overlays,
         )
 
+        # Only deadline runs can fall back; other runs get no report
+        if config.deadline.run is not None or config.deadline.scene is not None:
+            report_path = _write_report(
+                output_file, input_file, scenes, image_paths, image_gen, config, started
+            )
+            if image_gen.fallbacks:
+                click.echo(
+                    f"{len(image_gen.fallbacks)} scene(s) used fallback backgrounds "
+                    f"(see {report_path})"
+                )
+
+        if store:
+            if draft:
+                _save_draft(
+                    store, input_file, output_file, scenes, image_paths, image_gen, artifacts,
+                    config,
+                )
+            _record_run(store, input_file, output_file, artifacts, verbose)
+
+        if verbose:
+            from oslo.clients import connection_stats
+
+            click.echo(f"HTTP: {connection_stats().describe()}")
+            for stats in limiter_stats():
+                click.echo(f"  {stats.describe()}")
+
         return output_file
 
     finally:
@@ -120,3 +225,311 @@ def generate_video(
             click.echo(f"Temporary files kept at: {temp_dir}")
         else:
             shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+def finalize_video(
+    input_file: Path,
+    output_file: Path,
+    config: AppConfig,
+    approve: str | None = None,
+    keep_temp: bool = False,
+    verbose: bool = False,
+    skip_confirm: bool = False,
+    profile_name: str | None = None,
+) -> Path:
+    """Render the final video from a draft, upgrading only approved scenes.
+
+    approve ("all" or 1-based numbers such as "1,3-5") is added to the
+    scenes already approved in the draft manifest. Narration audio,
+    subtitles and unapproved images are reused from the draft as-is.
+    """
+    from oslo.drafts import (
+        FINAL,
+        check_scenes,
+        load_manifest,
+        parse_scene_numbers,
+        save_manifest,
+        scenes_to_upgrade,
+    )
+
+    text = input_file.read_text(encoding="utf-8").strip()
+    if not text:
+        raise click.ClickException("Input file is empty")
+    if not config.store.enabled:
+        raise click.ClickException("Drafts are kept in the artifact store; drop --no-store")
+    store = ArtifactStore.from_config(config.store)
+    manifest = load_manifest(store, input_file)
+    if manifest is None:
+        raise click.ClickException(f"No draft for {input_file}; render one with --draft first")
+
+    rate = RateModel.load().rate_for(config.tts)
+    scenes, title, hook_text = _parse_scenes(text, input_file, config, rate, profile_name, False)
+    try:
+        check_scenes(manifest, scenes)
+        approved = parse_scene_numbers(approve, len(scenes)) if approve else set()
+    except ValueError as e:
+        raise click.ClickException(f"{e}; render a new --draft") from e
+    for index in approved:
+        manifest["scenes"][index]["approved"] = True
+    for scene, entry in zip(scenes, manifest["scenes"]):
+        scene.library_image = entry["library_image"]
+    upgrade = scenes_to_upgrade(manifest)
+    if upgrade and not skip_confirm:
+        from oslo.check import image_cost
+
+        click.echo(
+            f"\n  Approved scenes to upgrade: {', '.join(str(i + 1) for i in upgrade)} "
+            f"(~${len(upgrade) * image_cost(config.image_gen):.2f})"
+        )
+        if not click.confirm("  Proceed with API calls?", default=True):
+            raise click.Abort()
+
+    configure_concurrency(config.concurrency)
+    artifacts = manifest["artifacts"]
+    temp_dir = Path(tempfile.mkdtemp(prefix="oslo_"))
+    try:
+        try:
+            audio_paths = [
+                store.checkout(digest, temp_dir / f"scene_{i:03d}.{config.tts.output_format}")
+                for i, digest in enumerate(artifacts["audio"])
+            ]
+            srt_path = store.checkout(artifacts["subtitles"], temp_dir / "subtitles.srt")
+            image_paths = [
+                store.checkout(digest, temp_dir / f"draft_{i:03d}.png")
+                for i, digest in enumerate(artifacts["images"])
+            ]
+        except KeyError as e:
+            raise click.ClickException(f"{e}; render a new --draft") from e
+
+        if upgrade:
+            if verbose:
+                click.echo(f"Upgrading {len(upgrade)} approved scene(s) to final quality...")
+            image_gen = ImageGenerator(
+                openai_api_key=config.openai_api_key,
+                image_config=config.image_gen,
+                video_config=config.video,
+                google_api_key=config.google_api_key,
+            )
+            to_generate = [scenes[i] for i in upgrade]
+            for scene in to_generate:
+                scene.library_image = None
+            new_paths = image_gen.generate_all_scenes(to_generate, temp_dir, verbose=verbose)
+            for scene, path in zip(to_generate, new_paths):
+                if scene.index in image_gen.fallbacks:
+                    continue
+                image_paths[scene.index] = path
+                artifacts["images"][scene.index] = store.adopt(path)
+                entry = manifest["scenes"][scene.index]
+                entry["tier"] = FINAL
+                entry["model"] = image_gen.sources.get(path, config.image_gen).model
+        reused = len(scenes) - len(upgrade)
+        click.echo(
+            f"Final render: {len(upgrade)} scene(s) upgraded, {reused} draft image(s), "
+            "narration and subtitles reused"
+        )
+
+        if verbose:
+            click.echo("Composing video...")
+        from oslo.composer import compose_video
+
+        compose_video(
+            image_paths=image_paths,
+            audio_paths=audio_paths,
+            srt_path=srt_path,
+            output_path=output_file,
+            config=config.video,
+            title=title,
+            hook_text=hook_text,
+            stat_overlays=[s.stat_overlay for s in scenes],
+        )
+
+        manifest["final"] = {
+            "output": str(output_file),
+            "created": datetime.now().isoformat(timespec="seconds"),
+        }
+        save_manifest(store, input_file, manifest)
+        run_artifacts = {k: artifacts[k] for k in ("audio", "images", "subtitles")}
+        _record_run(store, input_file, output_file, run_artifacts, verbose)
+        return output_file
+
+    finally:
+        if keep_temp:
+            click.echo(f"Temporary files kept at: {temp_dir}")
+        else:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+def _record_run(
+    store: ArtifactStore, input_file: Path, output_file: Path, artifacts: dict, verbose: bool
+) -> None:
+    """Reference the run's artifacts and evict old ones.
+
+    The rendered video itself stays out of the store: it is already at
+    output_file, and nothing (not even --final) reuses it.
+    """
+    run_id = f"{datetime.now():%Y%m%d-%H%M%S}-{input_file.stem}"
+    store.set_ref(
+        f"runs/{run_id}",
+        {
+            "input": str(input_file),
+            "output": str(output_file),
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "artifacts": artifacts,
+        },
+    )
+    store.prune_refs("runs", keep=RUN_REFS_KEPT)
+    freed = store.evict()
+    if verbose:
+        click.echo(f"Artifacts stored as run {run_id} in {store.root}")
+        if freed:
+            click.echo(f"  Evicted {freed / 1e6:.1f} MB of old artifacts")
+
+
+def _save_draft(
+    store: ArtifactStore,
+    input_file: Path,
+    output_file: Path,
+    scenes: list[Scene],
+    image_paths: list[Path],
+    image_gen: ImageGenerator,
+    artifacts: dict,
+    config: AppConfig,
+) -> None:
+    from oslo.drafts import DRAFT, FALLBACK, LIBRARY, build_manifest, save_manifest
+
+    tiers = []
+    models = []
+    for scene, path in zip(scenes, image_paths):
+        if scene.index in image_gen.fallbacks:
+            tiers.append(FALLBACK)
+            models.append(None)
+        elif scene.library_image:
+            tiers.append(LIBRARY)
+            models.append(None)
+        else:
+            tiers.append(DRAFT)
+            models.append(image_gen.sources.get(path, config.image_gen).model)
+    manifest = build_manifest(input_file, output_file, scenes, artifacts, tiers, models)
+    save_manifest(store, input_file, manifest)
+
+
+def _parse_scenes(
+    text: str,
+    input_file: Path,
+    config: AppConfig,
+    rate: SpeakingRate,
+    profile_name: str | None,
+    verbose: bool,
+) -> tuple[list[Scene], str | None, str | None]:
+    """Split the input into scenes and apply TTS readings; returns (scenes, title, hook)."""
+    title = None
+    hook_text = None
+    if input_file.suffix.lower() == ".md" or is_conte_format(text):
+        if verbose:
+            click.echo("Parsing conte...")
+        scenes = parse_conte(text, image_style_prefix=config.image_style_prefix)
+        title = parse_conte_title(text)
+        hook_text = parse_conte_hook(text)
+    else:
+        if verbose:
+            click.echo("Splitting text into scenes...")
+        scenes = split_into_scenes(
+            text,
+            max_duration=config.video.max_duration,
+            image_style_prefix=config.image_style_prefix,
+            rate=rate,
+        )
+    if verbose:
+        click.echo(f"  Created {len(scenes)} scenes")
+
+    # Apply TTS reading dictionary (repo-wide, then per-profile overrides)
+    readings = load_layered_readings(find_readings_files(input_file, profile_name))
+    if readings:
+        if verbose:
+            click.echo(f"  Applied {len(readings)} reading(s) for TTS")
+        for scene in scenes:
+            scene.tts_text = readings.apply(scene.narration_text)
+    return scenes, title, hook_text
+
+
+def _promote_generated_images(
+    scenes: list[Scene],
+    image_paths: list[Path],
+    config: AppConfig,
+    input_file: Path,
+    sources: dict[Path, ImageGenConfig] | None = None,
+    skip: set[int] = frozenset(),
+) -> int:
+    """Add the scenes' AI-generated images to the library; return how many.
+
+    sources maps an image to the provider config that produced it, when
+    routing or hedging moved it off the configured provider. Scenes whose
+    index is in skip (fallback backgrounds) are not promoted.
+    """
+    from oslo.library import promote_generated_image
+
+    promoted = 0
+    for scene, path in zip(scenes, image_paths):
+        if scene.library_image or scene.index in skip:
+            continue
+        source = (sources or {}).get(path, config.image_gen)
+        meta = promote_generated_image(
+            path,
+            prompt=scene.image_prompt,
+            subject=scene.visual_text or scene.narration_text,
+            provider=source.provider,
+            model=source.model,
+            conte=input_file.name,
+            name=f"gen-{input_file.stem}-s{scene.index + 1}",
+        )
+        if meta is not None:
+            promoted += 1
+    return promoted
+
+
+def _write_report(
+    output_file: Path,
+    input_file: Path,
+    scenes: list[Scene],
+    image_paths: list[Path],
+    image_gen: ImageGenerator,
+    config: AppConfig,
+    started: float,
+) -> Path:
+    """Write <output>.report.json: where each scene's image came from.
+
+    Scenes listed under "fallback_scenes" got a local stand-in background
+    because their image missed the deadline or failed; re-render them later.
+    """
+    entries = []
+    for scene, path in zip(scenes, image_paths):
+        entry: dict = {"scene": scene.index + 1}
+        fallback = image_gen.fallbacks.get(scene.index)
+        if fallback is not None:
+            entry.update(
+                image="fallback",
+                fallback=fallback.kind,
+                detail=fallback.detail,
+                reason=fallback.reason,
+            )
+        elif scene.library_image:
+            entry.update(image="library", slug=scene.library_image)
+        else:
+            source = image_gen.sources.get(path, config.image_gen)
+            entry.update(image="generated", provider=source.provider, model=source.model)
+        entries.append(entry)
+
+    report = {
+        "input": str(input_file),
+        "output": str(output_file),
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "elapsed": round(time.monotonic() - started, 1),
+        "deadline": {"run": config.deadline.run, "scene": config.deadline.scene},
+        "fallback_scenes": sorted(i + 1 for i in image_gen.fallbacks),
+        "scenes": entries,
+    }
+    report_path = output_file.with_suffix(".report.json")
+    report_path.write_text(
+        json.dumps(report, ensure_ascii=False, indent=2) + "\n", encoding="utf-8"
+    )
+    return report_path
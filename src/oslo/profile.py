@@ -6,9 +6,6 @@ from dataclasses import dataclass, field
 from enum import Enum
 from pathlib import Path
 
-import yaml
-from dotenv import load_dotenv
-
 
 class Platform(str, Enum):
     """Supported SNS platforms."""
@@ -54,6 +51,9 @@ class GenerationDefaults:
     image_style_prefix: str | None = None
     image_provider: str | None = None
     max_duration: float | None = None
+    tts_single_request: bool | None = None
+    auto_library: bool | None = None
+    promote_images: bool | None = None
 
 
 @dataclass(frozen=True)
@@ -100,6 +100,13 @@ def _get_profiles_dir() -> Path:
     raise FileNotFoundError("Could not find project root (no pyproject.toml found)")
 
 
+def get_profile_readings_path(name: str, profiles_dir: Path | None = None) -> Path:
+    """Return the per-profile TTS readings file path (profiles/<name>.readings.yml)."""
+    validate_profile_name(name)
+    directory = profiles_dir or _get_profiles_dir()
+    return directory / f"{name}.readings.yml"
+
+
 def validate_profile_name(name: str) -> None:
     """Validate profile name is a valid slug (lowercase alphanumeric with hyphens)."""
     if not PROFILE_NAME_PATTERN.match(name):
@@ -135,6 +142,8 @@ def load_profile(name: str, profiles_dir: Path | None = None) -> Profile:
     if not path.exists():
         raise FileNotFoundError(f"Profile not found: {path}")
 
+    import yaml
+
     data = yaml.safe_load(path.read_text(encoding="utf-8"))
 
     if data.get("name") != name:
@@ -164,6 +173,9 @@ def load_profile(name: str, profiles_dir: Path | None = None) -> Profile:
         image_style_prefix=gen_data.get("image_style_prefix"),
         image_provider=gen_data.get("image_provider"),
         max_duration=gen_data.get("max_duration"),
+        tts_single_request=gen_data.get("tts_single_request"),
+        auto_library=gen_data.get("auto_library"),
+        promote_images=gen_data.get("promote_images"),
     )
 
     content_data = data.get("content", {})
@@ -188,6 +200,8 @@ def load_profile(name: str, profiles_dir: Path | None = None) -> Profile:
 
 def save_profile(profile: Profile, profiles_dir: Path | None = None) -> Path:
     """Save a profile to a YAML file."""
+    import yaml
+
     validate_profile_name(profile.name)
     directory = profiles_dir or _get_profiles_dir()
     directory.mkdir(parents=True, exist_ok=True)
@@ -217,7 +231,8 @@ def save_profile(profile: Profile, profiles_dir: Path | None = None) -> Path:
     gen_dict = {}
     for fld in (
         "voice", "speed", "image_quality", "image_style_prefix", "image_provider",
-        "max_duration",
+        "max_duration", "tts_single_request", "auto_library",
+        "promote_images",
     ):
         val = getattr(profile.generation, fld)
         if val is not None:
@@ -254,11 +269,15 @@ def list_profiles(profiles_dir: Path | None = None) -> list[str]:
     directory = profiles_dir or _get_profiles_dir()
     if not directory.exists():
         return []
-    return sorted(p.stem for p in directory.glob("*.yml"))
+    return sorted(
+        p.stem for p in directory.glob("*.yml") if not p.name.endswith(".readings.yml")
+    )
 
 
 def validate_credentials(profile: Profile) -> dict[str, bool]:
     """Check which required env vars are set for the profile."""
+    from dotenv import load_dotenv
+
     load_dotenv()
     result = {}
     for var_suffix in profile.credentials.required_vars:
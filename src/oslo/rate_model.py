@@ -0,0 +1,139 @@
+"""Speaking-rate model learned from the durations of past TTS outputs."""
+
+from __future__ import annotations
+
+import json
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from pathlib import Path
+
+from oslo.config import TTSConfig
+from oslo.text_processor import DEFAULT_CPM, DEFAULT_WPM, SpeakingRate, analyze_text
+from oslo.utils import atomic_write_bytes, file_lock, get_cache_dir
+
+STORE_FILE_NAME = "speech_durations.jsonl"
+# Samples needed before a fitted rate replaces the default for a voice
+MIN_SAMPLES = 3
+# Only the most recent samples per voice (and language) are used, so the
+# model follows changes in the TTS service; older ones are dropped on write
+MAX_SAMPLES = 200
+# Scenes shorter than this are dominated by lead-in/out silence; skip them
+MIN_SAMPLE_SECONDS = 1.0
+
+
+@dataclass(frozen=True)
+class DurationSample:
+    """One measured TTS output."""
+
+    model: str
+    voice: str
+    speed: float
+    cjk: bool
+    units: int  # characters (CJK) or words (English)
+    chars: int
+    duration: float  # seconds
+    recorded: str = ""
+
+
+def make_sample(text: str, duration: float, config: TTSConfig) -> DurationSample:
+    """Build a DurationSample for text that took `duration` seconds to speak."""
+    stats = analyze_text(text)
+    return DurationSample(
+        model=config.model,
+        voice=config.voice,
+        speed=config.speed,
+        cjk=stats.is_cjk,
+        units=stats.nonspace_chars if stats.is_cjk else stats.words,
+        chars=stats.chars,
+        duration=duration,
+        recorded=datetime.now().isoformat(timespec="seconds"),
+    )
+
+
+def _newest_per_voice(samples: list[DurationSample]) -> list[DurationSample]:
+    """The last MAX_SAMPLES samples of each model/voice/language, in order."""
+    counts: dict[tuple[str, str, bool], int] = {}
+    kept = []
+    for sample in reversed(samples):
+        key = (sample.model, sample.voice, sample.cjk)
+        counts[key] = counts.get(key, 0) + 1
+        if counts[key] <= MAX_SAMPLES:
+            kept.append(sample)
+    kept.reverse()
+    return kept
+
+
+class DurationStore:
+    """JSON Lines store of measured TTS durations, compacted on every write."""
+
+    def __init__(self, path: Path | None = None):
+        self.path = path or get_cache_dir("stats") / STORE_FILE_NAME
+
+    def append(self, samples: list[DurationSample]) -> None:
+        """Add samples, keeping only the newest MAX_SAMPLES per voice and language."""
+        if not samples:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with file_lock(self.path.with_name(f".{self.path.name}.lock")):
+            kept = _newest_per_voice(self.load() + samples)
+            data = "".join(json.dumps(asdict(s), ensure_ascii=False) + "\n" for s in kept)
+            atomic_write_bytes(self.path, data.encode("utf-8"))
+
+    def load(self) -> list[DurationSample]:
+        """Read all samples, skipping lines that cannot be parsed."""
+        if not self.path.exists():
+            return []
+        samples = []
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    samples.append(DurationSample(**json.loads(line)))
+                except (json.JSONDecodeError, TypeError):
+                    continue
+        return samples
+
+
+def fit_units_per_minute(samples: list[DurationSample]) -> float | None:
+    """Fit speed-normalized units per minute from samples (None if too few).
+
+    Durations are scaled by the TTS speed so outputs at different speeds
+    share one fit; the result is the rate at speed 1.0.
+    """
+    usable = [s for s in samples if s.duration >= MIN_SAMPLE_SECONDS and s.units > 0]
+    usable = usable[-MAX_SAMPLES:]
+    if len(usable) < MIN_SAMPLES:
+        return None
+    total_units = sum(s.units for s in usable)
+    total_minutes = sum(s.duration * s.speed for s in usable) / 60.0
+    if total_minutes <= 0:
+        return None
+    return total_units / total_minutes
+
+
+class RateModel:
+    """Per-voice speaking rates fitted from a DurationStore."""
+
+    def __init__(self, samples: list[DurationSample]):
+        self._samples = samples
+
+    @classmethod
+    def load(cls, store: DurationStore | None = None) -> RateModel:
+        return cls((store or DurationStore()).load())
+
+    def rate_for(self, config: TTSConfig) -> SpeakingRate:
+        """Return the predicted speaking rate for a TTS voice, model and speed.
+
+        Falls back to the default rates (scaled by speed) for languages
+        without enough recorded samples.
+        """
+        matching = [
+            s for s in self._samples if s.voice == config.voice and s.model == config.model
+        ]
+        cpm = fit_units_per_minute([s for s in matching if s.cjk]) or DEFAULT_CPM
+        wpm = fit_units_per_minute([s for s in matching if not s.cjk]) or DEFAULT_WPM
+        return SpeakingRate(wpm=wpm * config.speed, cpm=cpm * config.speed)
+
+    def sample_count(self, config: TTSConfig) -> int:
+        return sum(
+            1 for s in self._samples if s.voice == config.voice and s.model == config.model
+        )
@@ -1,8 +1,15 @@
 """TTS reading dictionary: replace kanji with readings for correct pronunciation."""
 
+import hashlib
+import pickle
 from pathlib import Path
 
-import yaml
+from oslo.utils import get_cache_dir
+
+# Bump when the pickled ReadingsMatcher layout changes
+_CACHE_VERSION = 1
+# Trie key holding the reading at a terminal node (never a real character)
+_END = ""
 
 
 def load_readings(path: Path) -> dict[str, str]:
@@ -14,6 +21,8 @@ def load_readings(path: Path) -> dict[str, str]:
     """
     if not path.exists():
         return {}
+    import yaml
+
     with open(path, encoding="utf-8") as f:
         data = yaml.safe_load(f)
     if not data or not isinstance(data, dict):
@@ -26,8 +35,135 @@ def load_readings(path: Path) -> dict[str, str]:
     return readings
 
 
-def apply_readings(text: str, readings: dict[str, str]) -> str:
-    """Replace dictionary entries in text with their readings."""
-    for kanji, reading in readings.items():
-        text = text.replace(kanji, reading)
-    return text
+class ReadingsMatcher:
+    """Compiled reading dictionary with leftmost-longest matching.
+
+    Entries are stored in a character trie. Scanning the text visits each
+    position once and follows the trie only as far as the longest key, so
+    the cost is independent of the dictionary size and a longer key
+    (安野貴博) always wins over its prefix (安野).
+    """
+
+    def __init__(self, readings: dict[str, str]):
+        self._root: dict = {}
+        for kanji, reading in readings.items():
+            if not kanji:
+                continue
+            node = self._root
+            for ch in kanji:
+                node = node.setdefault(ch, {})
+            node[_END] = reading
+        self.size = sum(1 for k in readings if k)
+
+    def __len__(self) -> int:
+        return self.size
+
+    def apply(self, text: str) -> str:
+        """Replace every leftmost-longest dictionary match in text."""
+        root = self._root
+        if not root:
+            return text
+        out: list[str] = []
+        n = len(text)
+        last = 0
+        i = 0
+        while i < n:
+            node = root.get(text[i])
+            if node is None:
+                i += 1
+                continue
+            match_end = -1
+            reading = None
+            j = i
+            while node is not None:
+                j += 1
+                if _END in node:
+                    match_end = j
+                    reading = node[_END]
+                if j >= n:
+                    break
+                node = node.get(text[j])
+            if match_end < 0:
+                i += 1
+                continue
+            out.append(text[last:i])
+            out.append(reading)
+            i = last = match_end
+        if not out:
+            return text
+        out.append(text[last:])
+        return "".join(out)
+
+
+def compile_readings(readings: dict[str, str]) -> ReadingsMatcher:
+    """Compile a flat reading dictionary into a ReadingsMatcher."""
+    return ReadingsMatcher(readings)
+
+
+def load_layered_readings(paths: list[Path], use_cache: bool = True) -> ReadingsMatcher:
+    """Load and compile several readings files, later files overriding earlier ones.
+
+    The compiled matcher is cached on disk, keyed by each file's path,
+    mtime and size, so large dictionaries are only parsed when they change.
+    """
+    existing = [p.resolve() for p in paths if p.exists()]
+    if not existing:
+        return ReadingsMatcher({})
+
+    cache_path = None
+    if use_cache:
+        key = repr(
+            (_CACHE_VERSION, [(str(p), p.stat().st_mtime_ns, p.stat().st_size) for p in existing])
+        )
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()[:32]
+        cache_path = get_cache_dir("readings") / f"{digest}.pickle"
+        try:
+            with open(cache_path, "rb") as f:
+                matcher = pickle.load(f)
+            if isinstance(matcher, ReadingsMatcher):
+                return matcher
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+            pass
+
+    merged: dict[str, str] = {}
+    for path in existing:
+        merged.update(load_readings(path))
+    matcher = ReadingsMatcher(merged)
+
+    if cache_path is not None:
+        tmp_path = cache_path.with_suffix(".tmp")
+        try:
+            with open(tmp_path, "wb") as f:
+                pickle.dump(matcher, f, protocol=pickle.HIGHEST_PROTOCOL)
+            tmp_path.replace(cache_path)
+        except OSError:
+            tmp_path.unlink(missing_ok=True)
+    return matcher
+
+
+def find_readings_files(input_file: Path, profile_name: str | None = None) -> list[Path]:
+    """Return readings files to layer for an input, lowest priority first.
+
+    The repo-wide readings.yml (next to the input, else in the working
+    directory) comes first, followed by profiles/<name>.readings.yml.
+    """
+    repo_path = input_file.parent / "readings.yml"
+    if not repo_path.exists():
+        repo_path = Path.cwd() / "readings.yml"
+    paths = [repo_path]
+    if profile_name:
+        from oslo.profile import get_profile_readings_path
+
+        paths.append(get_profile_readings_path(profile_name))
+    return paths
+
+
+def apply_readings(text: str, readings: dict[str, str] | ReadingsMatcher) -> str:
+    """Replace dictionary entries in text with their readings.
+
+    Longer entries take precedence over their prefixes. Pass a compiled
+    ReadingsMatcher when applying the same dictionary to many texts.
+    """
+    if not isinstance(readings, ReadingsMatcher):
+        readings = ReadingsMatcher(readings)
+    return readings.apply(text)
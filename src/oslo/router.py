@@ -0,0 +1,243 @@
+"""Per-scene image provider routing from rolling latency, error and cost stats.
+
+Every image call updates an exponentially weighted moving average of
+its provider/model's latency and error rate. The stats persist in the
+cache directory, so a run starts from what earlier runs saw. For each
+scene the router ranks the configured providers for the objective:
+
+- fastest: lowest expected latency
+- cheapest: lowest price per image (from check.py's price table)
+- deadline: cheapest whose expected latency fits the deadline, else fastest
+
+A provider whose error rate reaches the degraded threshold drops to the
+back of the ranking, so it is only tried once the healthy ones fail.
+The error rate decays towards zero while a provider goes unused; after
+a while a degraded provider gets tried again.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import json
+import threading
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from pathlib import Path
+
+from oslo.check import IMAGE_SECONDS_PER_CALL, image_cost
+from oslo.config import DEFAULT_IMAGE_MODELS, ImageGenConfig, RouterConfig
+from oslo.utils import atomic_write_bytes, file_lock, get_cache_dir
+
+STATS_FILE_NAME = "image_providers.json"
+DECISIONS_FILE_NAME = "image_routes.jsonl"
+# Weight of the newest observation in the moving averages
+EWMA_ALPHA = 0.3
+# An unused provider's error rate halves every this many seconds
+ERROR_HALF_LIFE = 600.0
+
+
+@dataclass(frozen=True)
+class ProviderStats:
+    """Rolling stats for one provider/model."""
+
+    latency: float  # EWMA seconds of successful calls
+    error_rate: float  # EWMA of failures (1) and successes (0)
+    calls: int = 0
+    updated: float = 0.0  # time.time() of the last observation
+
+    def current_error_rate(self, now: float) -> float:
+        if not self.updated:
+            return self.error_rate
+        return self.error_rate * 0.5 ** (max(0.0, now - self.updated) / ERROR_HALF_LIFE)
+
+
+def route_key(config: ImageGenConfig) -> str:
+    return f"{config.provider}/{config.model}"
+
+
+def prior_stats(config: ImageGenConfig) -> ProviderStats:
+    """Stats assumed for a provider that has never been called."""
+    return ProviderStats(latency=IMAGE_SECONDS_PER_CALL.get(config.provider, 30.0), error_rate=0.0)
+
+
+@dataclass(frozen=True)
+class RouteDecision:
+    """Which provider a scene was sent to, and what the router knew at the time."""
+
+    key: str
+    objective: str
+    reason: str
+    latency: float
+    error_rate: float
+    cost: float
+    fallback: int = 0  # 0 for the first choice, n for the n-th fallback
+    recorded: str = ""
+
+    def describe(self) -> str:
+        text = (
+            f"{self.key} ({self.reason}: {self.latency:.1f}s avg, "
+            f"{self.error_rate:.0%} errors, ${self.cost:.3f})"
+        )
+        return f"{text} [fallback {self.fallback}]" if self.fallback else text
+
+
+class RouteStatsStore:
+    """JSON file of ProviderStats keyed by "provider/model", shared across runs."""
+
+    def __init__(self, path: Path | None = None):
+        self.path = path or get_cache_dir("stats") / STATS_FILE_NAME
+
+    def load(self) -> dict[str, ProviderStats]:
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            return {}
+        stats = {}
+        for key, value in data.items():
+            try:
+                stats[key] = ProviderStats(**value)
+            except TypeError:
+                continue
+        return stats
+
+    def update(self, stats: dict[str, ProviderStats]) -> None:
+        """Merge stats into the file; concurrent runs overwrite per key, newest wins."""
+        if not stats:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with file_lock(self.path.with_name(f".{self.path.name}.lock")):
+            merged = self.load()
+            for key, value in stats.items():
+                if key not in merged or merged[key].updated <= value.updated:
+                    merged[key] = value
+            data = {key: asdict(value) for key, value in sorted(merged.items())}
+            atomic_write_bytes(self.path, json.dumps(data, indent=2).encode())
+
+    def append_decisions(self, decisions: list[RouteDecision]) -> None:
+        if not decisions:
+            return
+        path = self.path.with_name(DECISIONS_FILE_NAME)
+        with open(path, "a", encoding="utf-8") as f:
+            for decision in decisions:
+                f.write(json.dumps(asdict(decision)) + "\n")
+
+
+class ImageRouter:
+    """Ranks the configured image providers per scene and learns from each call."""
+
+    def __init__(
+        self,
+        config: RouterConfig,
+        candidates: list[ImageGenConfig],
+        store: RouteStatsStore | None = None,
+        persist: bool = True,
+    ):
+        self.config = config
+        self.candidates = candidates
+        self.store = store or RouteStatsStore()
+        self.persist = persist
+        self._lock = threading.Lock()
+        self._stats = self.store.load()
+        self._dirty: set[str] = set()
+        self._logged = 0
+        self.decisions: list[RouteDecision] = []
+
+    @classmethod
+    def for_config(
+        cls,
+        image_config: ImageGenConfig,
+        openai_api_key: str,
+        google_api_key: str,
+        **kwargs,
+    ) -> ImageRouter:
+        """Route between the configured provider and the other one, if it has a key."""
+        keys = {"openai": openai_api_key, "gemini": google_api_key}
+        candidates = [image_config]
+        for provider in ("gemini", "openai"):
+            if provider != image_config.provider and keys[provider]:
+                candidates.append(
+                    dataclasses.replace(
+                        image_config, provider=provider, model=DEFAULT_IMAGE_MODELS[provider]
+                    )
+                )
+        return cls(image_config.routing, candidates, **kwargs)
+
+    def stats_for(self, config: ImageGenConfig) -> ProviderStats:
+        with self._lock:
+            return self._stats.get(route_key(config)) or prior_stats(config)
+
+    def rank(self) -> list[tuple[ImageGenConfig, str]]:
+        """Candidates best-first for the objective, with the reason for each position."""
+        now = time.time()
+        healthy, degraded = [], []
+        for config in self.candidates:
+            stats = self.stats_for(config)
+            if stats.current_error_rate(now) >= self.config.degraded_error_rate:
+                degraded.append(config)
+            else:
+                healthy.append(config)
+
+        def latency(config: ImageGenConfig) -> float:
+            return self.stats_for(config).latency
+
+        objective = self.config.objective
+        if objective == "cheapest":
+            healthy.sort(key=image_cost)
+            ranked = [(c, "cheapest") for c in healthy]
+        elif objective == "deadline":
+            deadline = self.config.deadline
+            fits = sorted((c for c in healthy if latency(c) <= deadline), key=image_cost)
+            late = sorted((c for c in healthy if latency(c) > deadline), key=latency)
+            ranked = [(c, "within deadline") for c in fits] + [(c, "fastest") for c in late]
+        else:
+            healthy.sort(key=latency)
+            ranked = [(c, "fastest") for c in healthy]
+        degraded.sort(key=lambda c: self.stats_for(c).current_error_rate(now))
+        return ranked + [(c, "degraded") for c in degraded]
+
+    def decide(self, config: ImageGenConfig, reason: str, fallback: int = 0) -> RouteDecision:
+        """Record that a scene is being sent to config."""
+        stats = self.stats_for(config)
+        decision = RouteDecision(
+            key=route_key(config),
+            objective=self.config.objective,
+            reason=reason,
+            latency=stats.latency,
+            error_rate=stats.current_error_rate(time.time()),
+            cost=image_cost(config),
+            fallback=fallback,
+            recorded=datetime.now().isoformat(timespec="seconds"),
+        )
+        with self._lock:
+            self.decisions.append(decision)
+        return decision
+
+    def observe(self, config: ImageGenConfig, latency: float, error: bool) -> None:
+        """Fold one call's outcome into the provider's moving averages."""
+        key = route_key(config)
+        now = time.time()
+        with self._lock:
+            stats = self._stats.get(key) or prior_stats(config)
+            error_rate = stats.current_error_rate(now)
+            self._stats[key] = ProviderStats(
+                latency=stats.latency
+                if error
+                else (1 - EWMA_ALPHA) * stats.latency + EWMA_ALPHA * latency,
+                error_rate=(1 - EWMA_ALPHA) * error_rate + EWMA_ALPHA * float(error),
+                calls=stats.calls + 1,
+                updated=now,
+            )
+            self._dirty.add(key)
+
+    def save(self) -> None:
+        """Persist this run's stats and append its decisions to the route log."""
+        if not self.persist:
+            return
+        with self._lock:
+            updated = {key: self._stats[key] for key in self._dirty}
+            decisions = self.decisions[self._logged :]
+            self._logged = len(self.decisions)
+            self._dirty.clear()
+        self.store.update(updated)
+        self.store.append_decisions(decisions)
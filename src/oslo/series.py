@@ -0,0 +1,125 @@
+"""Series mode: stream a long document into consecutive video-sized parts."""
+
+from __future__ import annotations
+
+import re
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+
+from oslo.conte import render_conte
+from oslo.text_processor import (
+    DEFAULT_RATE,
+    SpeakingRate,
+    _split_into_sentences,
+    analyze_text,
+    estimate_duration,
+    split_into_scenes,
+)
+
+# A "paragraph" without blank lines is flushed after this many characters so
+# a file with no paragraph breaks still streams in bounded memory
+MAX_PARAGRAPH_CHARS = 20_000
+
+_WHITESPACE_RUN = re.compile(r"\s*\n\s*")
+
+
+def iter_paragraphs(lines: Iterable[str]) -> Iterator[str]:
+    """Yield paragraphs (separated by blank lines) from an iterable of lines."""
+    buffer: list[str] = []
+    size = 0
+    for line in lines:
+        stripped = line.strip()
+        if not stripped:
+            if buffer:
+                yield "\n".join(buffer)
+                buffer, size = [], 0
+            continue
+        buffer.append(stripped)
+        size += len(stripped)
+        if size >= MAX_PARAGRAPH_CHARS:
+            yield "\n".join(buffer)
+            buffer, size = [], 0
+    if buffer:
+        yield "\n".join(buffer)
+
+
+def _hard_split(sentence: str, max_duration: float, rate: SpeakingRate) -> Iterator[str]:
+    """Split a single over-long sentence into pieces that fit max_duration."""
+    if analyze_text(sentence).is_cjk:
+        step = max(1, int((max_duration / 60.0) * rate.cpm))
+        for i in range(0, len(sentence), step):
+            yield sentence[i : i + step]
+    else:
+        step = max(1, int((max_duration / 60.0) * rate.wpm))
+        words = sentence.split()
+        for i in range(0, len(words), step):
+            yield " ".join(words[i : i + step])
+
+
+def _pieces(paragraph: str, max_duration: float, rate: SpeakingRate) -> Iterator[str]:
+    """Yield the paragraph whole, or sentence by sentence if it is too long."""
+    if estimate_duration(paragraph, rate) <= max_duration:
+        yield paragraph
+        return
+    for sentence in _split_into_sentences(paragraph):
+        if estimate_duration(sentence, rate) <= max_duration:
+            yield sentence
+        else:
+            yield from _hard_split(sentence, max_duration, rate)
+
+
+def iter_parts(
+    paragraphs: Iterable[str], max_duration: float, rate: SpeakingRate = DEFAULT_RATE
+) -> Iterator[str]:
+    """Group paragraphs into consecutive parts of at most max_duration each.
+
+    Parts are cut at paragraph boundaries where possible, then at sentence
+    boundaries. Only the part being built is held in memory.
+    """
+    current: list[str] = []
+    current_duration = 0.0
+    for paragraph in paragraphs:
+        for piece in _pieces(paragraph, max_duration, rate):
+            duration = estimate_duration(piece, rate)
+            if current and current_duration + duration > max_duration:
+                yield "\n\n".join(current)
+                current, current_duration = [], 0.0
+            current.append(piece)
+            current_duration += duration
+    if current:
+        yield "\n\n".join(current)
+
+
+def write_series(
+    input_file: Path,
+    output_dir: Path,
+    *,
+    max_duration: float,
+    rate: SpeakingRate = DEFAULT_RATE,
+    title: str | None = None,
+    image_style_prefix: str | None = None,
+) -> Iterator[Path]:
+    """Stream input_file into part_01.md, part_02.md, ... contes in output_dir.
+
+    Yields each conte path as soon as it is written.
+    """
+    output_dir.mkdir(parents=True, exist_ok=True)
+    base_title = title or input_file.stem
+    with open(input_file, encoding="utf-8") as f:
+        parts = iter_parts(iter_paragraphs(f), max_duration, rate)
+        for number, part in enumerate(parts, start=1):
+            scenes = split_into_scenes(
+                part,
+                max_duration=max_duration,
+                image_style_prefix=image_style_prefix,
+                rate=rate,
+            )
+            for scene in scenes:
+                # Keep each narration on one line so it cannot end the conte field
+                joiner = "" if scene.stats.is_cjk else " "
+                scene.narration_text = _WHITESPACE_RUN.sub(joiner, scene.narration_text)
+            path = output_dir / f"part_{number:02d}.md"
+            path.write_text(
+                render_conte(scenes, title=f"{base_title} ({number})"), encoding="utf-8"
+            )
+            yield path
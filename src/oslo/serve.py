@@ -0,0 +1,451 @@
+"""Long-lived render daemon: a local HTTP job API over warm worker processes.
+
+`oslo generate` pays interpreter startup, the moviepy/numpy/PIL/openai
+imports and client setup on every run. The daemon pays them once: its
+worker processes import everything, locate the CJK font and open the
+pooled API clients at startup, then render jobs back to back. Jobs wait
+in a priority queue (higher priority first, then submission order).
+
+API (JSON unless noted):
+
+    POST   /jobs              {"text", "filename"?, "profile"?, "priority"?, "options"?}
+                              or {"input": <path under --input-root>, ...}  -> 201 job
+    GET    /jobs              all jobs
+    GET    /jobs/<id>         one job
+    GET    /jobs/<id>/video   the MP4 (409 until the job is done)
+    DELETE /jobs/<id>         cancel a queued job
+    GET    /health            worker and queue counts
+
+Jobs live in memory. A finished video is kept under the state directory
+for `retention` seconds, then the job and its directory are dropped; failed
+and cancelled jobs lose their directory straight away. `input` paths are
+refused unless the daemon was given an input root to read them from.
+"""
+
+from __future__ import annotations
+
+import heapq
+import itertools
+import json
+import multiprocessing
+import os
+import re
+import shutil
+import socketserver
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from oslo.utils import get_cache_dir
+
+DEFAULT_PORT = 8765
+DEFAULT_RETENTION = 24 * 3600.0
+# load_config overrides a job may set
+JOB_OPTIONS = (
+    "voice",
+    "speed",
+    "max_duration",
+    "image_quality",
+    "image_provider",
+    "tts_single_request",
+    "auto_library",
+    "promote_images",
+)
+_JOB_PATH = re.compile(r"^/jobs/([0-9a-f]{12})(/video)?$")
+
+
+# Worker process side --------------------------------------------------------
+
+
+def _warm_worker() -> None:
+    """Process initializer: pay import, font and client setup once per worker."""
+    import oslo.pipeline  # noqa: F401
+    from oslo import composer
+    from oslo.clients import get_gemini_client, get_http_client, get_openai_client
+    from oslo.config import load_config
+
+    composer._find_cjk_font()
+    get_http_client()
+    config = load_config(require_api_keys=False)
+    if config.openai_api_key:
+        get_openai_client(config.openai_api_key)
+    if config.google_api_key:
+        get_gemini_client(config.google_api_key)
+
+
+def _ping(seconds: float) -> int:
+    time.sleep(seconds)
+    return os.getpid()
+
+
+def _render(input_path: str, output_path: str, profile: str | None, options: dict) -> int:
+    """Run the full pipeline for one job in a worker; returns the worker pid."""
+    from oslo.config import load_config
+    from oslo.pipeline import generate_video
+
+    profile_defaults = None
+    if profile:
+        from oslo.profile import load_profile
+
+        profile_defaults = load_profile(profile).generation
+    config = load_config(profile_defaults=profile_defaults, **options)
+    generate_video(
+        input_file=Path(input_path),
+        output_file=Path(output_path),
+        config=config,
+        skip_confirm=True,
+        profile_name=profile,
+    )
+    return os.getpid()
+
+
+# Daemon side ----------------------------------------------------------------
+
+
+@dataclass
+class Job:
+    id: str
+    input_path: Path
+    output_path: Path
+    profile: str | None = None
+    options: dict = field(default_factory=dict)
+    priority: int = 0
+    status: str = "queued"  # queued | running | done | failed | cancelled
+    error: str = ""
+    worker: int | None = None
+    submitted: float = field(default_factory=time.time)
+    started: float | None = None
+    finished: float | None = None
+
+    def to_dict(self) -> dict:
+        data = {
+            "id": self.id,
+            "status": self.status,
+            "priority": self.priority,
+            "profile": self.profile,
+            "input": str(self.input_path),
+            "submitted": self.submitted,
+        }
+        if self.started is not None:
+            data["queued_seconds"] = round(self.started - self.submitted, 3)
+        if self.finished is not None and self.started is not None:
+            data["render_seconds"] = round(self.finished - self.started, 3)
+        if self.worker is not None:
+            data["worker"] = self.worker
+        if self.error:
+            data["error"] = self.error
+        return data
+
+
+class RenderDaemon:
+    """Priority job queue feeding a pool of pre-warmed worker processes."""
+
+    def __init__(
+        self,
+        state_dir: Path | None = None,
+        workers: int = 2,
+        render=_render,
+        input_root: Path | None = None,
+        retention: float = DEFAULT_RETENTION,
+    ):
+        self.state_dir = state_dir or get_cache_dir("serve")
+        self.workers = workers
+        self.input_root = input_root.expanduser().resolve() if input_root else None
+        self.retention = retention
+        self._render = render
+        self._jobs: dict[str, Job] = {}
+        self._queue: list[tuple[int, int, str]] = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        # One single-process pool per dispatcher: a worker that dies only
+        # breaks its own pool, not the jobs running next to it
+        self._executors: list[ProcessPoolExecutor] = []
+        self._dispatchers: list[threading.Thread] = []
+        self._stopping = False
+
+    def _new_executor(self) -> ProcessPoolExecutor:
+        # spawn, not fork: the daemon is multi-threaded by the time workers start
+        return ProcessPoolExecutor(
+            max_workers=1,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_warm_worker,
+        )
+
+    def start(self) -> None:
+        """Start and warm all workers, then begin dispatching jobs."""
+        self._executors = [self._new_executor() for _ in range(self.workers)]
+        # A ping makes each pool start its worker now, not on the first job
+        pings = [executor.submit(_ping, 0.0) for executor in self._executors]
+        for ping in pings:
+            ping.result()
+        for n in range(self.workers):
+            thread = threading.Thread(
+                target=self._dispatch, args=(n,), name=f"dispatch-{n}", daemon=True
+            )
+            thread.start()
+            self._dispatchers.append(thread)
+
+    def shutdown(self) -> None:
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        for thread in self._dispatchers:
+            thread.join()
+        for executor in self._executors:
+            executor.shutdown(cancel_futures=True)
+
+    def submit(self, spec: dict) -> Job:
+        """Queue a job from an API request body. Raises ValueError if invalid."""
+        options = spec.get("options") or {}
+        if not isinstance(options, dict):
+            raise ValueError("options must be an object")
+        unknown = set(options) - set(JOB_OPTIONS)
+        if unknown:
+            raise ValueError(f"Unknown option(s): {', '.join(sorted(unknown))}")
+        try:
+            priority = int(spec.get("priority", 0))
+        except (TypeError, ValueError) as e:
+            raise ValueError("priority must be an integer") from e
+
+        self._purge()
+        job_id = uuid.uuid4().hex[:12]
+        job_dir = self.state_dir / "jobs" / job_id
+        if "text" in spec:
+            name = Path(str(spec.get("filename") or "input.txt")).name
+            if name in ("", ".", ".."):
+                raise ValueError(f"Invalid filename: {spec['filename']!r}")
+            job_dir.mkdir(parents=True)
+            input_path = job_dir / name
+            input_path.write_text(str(spec["text"]), encoding="utf-8")
+        elif "input" in spec:
+            input_path = self._input_path(str(spec["input"]))
+            if not input_path.is_file():
+                raise ValueError(f"Input file not found: {input_path}")
+            job_dir.mkdir(parents=True)
+        else:
+            raise ValueError('Request needs "text" or "input"')
+
+        job = Job(
+            id=job_id,
+            input_path=input_path,
+            output_path=job_dir / f"{input_path.stem}.mp4",
+            profile=spec.get("profile") or None,
+            options=options,
+            priority=priority,
+        )
+        with self._cond:
+            self._jobs[job_id] = job
+            heapq.heappush(self._queue, (-priority, next(self._seq), job_id))
+            self._cond.notify()
+        return job
+
+    def _input_path(self, value: str) -> Path:
+        if self.input_root is None:
+            raise ValueError('"input" paths are disabled on this daemon; send the conte as "text"')
+        path = (self.input_root / Path(value).expanduser()).resolve()
+        if not path.is_relative_to(self.input_root):
+            raise ValueError(f"Input must be under {self.input_root}: {value}")
+        return path
+
+    def _purge(self) -> None:
+        """Drop finished jobs older than the retention period, with their files."""
+        cutoff = time.time() - self.retention
+        with self._cond:
+            expired = [
+                job
+                for job in self._jobs.values()
+                if job.finished is not None and job.finished < cutoff
+            ]
+            for job in expired:
+                del self._jobs[job.id]
+        for job in expired:
+            shutil.rmtree(job.output_path.parent, ignore_errors=True)
+
+    def get(self, job_id: str) -> Job | None:
+        with self._cond:
+            return self._jobs.get(job_id)
+
+    def jobs(self) -> list[Job]:
+        with self._cond:
+            return sorted(self._jobs.values(), key=lambda j: j.submitted)
+
+    def cancel(self, job_id: str) -> bool:
+        """Cancel a queued job; running and finished jobs are left alone."""
+        with self._cond:
+            job = self._jobs.get(job_id)
+            if job is None or job.status != "queued":
+                return False
+            job.status = "cancelled"
+            job.finished = time.time()
+        shutil.rmtree(job.output_path.parent, ignore_errors=True)
+        return True
+
+    def health(self) -> dict:
+        with self._cond:
+            counts: dict[str, int] = {}
+            for job in self._jobs.values():
+                counts[job.status] = counts.get(job.status, 0) + 1
+            return {"workers": self.workers, "jobs": counts}
+
+    def _take(self) -> Job | None:
+        with self._cond:
+            while True:
+                if self._stopping:
+                    return None
+                while self._queue:
+                    _, _, job_id = heapq.heappop(self._queue)
+                    job = self._jobs.get(job_id)
+                    if job is not None and job.status == "queued":
+                        job.status = "running"
+                        job.started = time.time()
+                        return job
+                self._cond.wait()
+
+    def _dispatch(self, n: int) -> None:
+        while (job := self._take()) is not None:
+            try:
+                future = self._executors[n].submit(
+                    self._render,
+                    str(job.input_path),
+                    str(job.output_path),
+                    job.profile,
+                    job.options,
+                )
+                worker = future.result()
+            except BrokenProcessPool:
+                self._finish(job, error="worker process died")
+                self._executors[n].shutdown(wait=False, cancel_futures=True)
+                self._executors[n] = self._new_executor()
+            except Exception as e:  # noqa: BLE001 - reported to the client
+                self._finish(job, error=f"{type(e).__name__}: {e}")
+            else:
+                self._finish(job, worker=worker)
+
+    def _finish(self, job: Job, error: str = "", worker: int | None = None) -> None:
+        with self._cond:
+            job.finished = time.time()
+            job.worker = worker
+            job.error = error
+            job.status = "failed" if error else "done"
+        if error:
+            # Nothing to download; keep only the job record for the client
+            shutil.rmtree(job.output_path.parent, ignore_errors=True)
+
+
+# HTTP ----------------------------------------------------------------------
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    server: _DaemonServer
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status: int, payload) -> None:
+        data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _job(self) -> tuple[Job | None, bool]:
+        m = _JOB_PATH.match(self.path.split("?", 1)[0])
+        if not m:
+            return None, False
+        return self.server.daemon.get(m.group(1)), bool(m.group(2))
+
+    def do_GET(self):
+        daemon = self.server.daemon
+        path = self.path.split("?", 1)[0].rstrip("/")
+        if path == "/health":
+            self._send_json(200, daemon.health())
+            return
+        if path == "/jobs":
+            self._send_json(200, [job.to_dict() for job in daemon.jobs()])
+            return
+        job, video = self._job()
+        if job is None:
+            self._send_json(404, {"error": "No such job"})
+        elif not video:
+            self._send_json(200, job.to_dict())
+        elif job.status != "done":
+            self._send_json(409, {"error": f"Job is {job.status}"})
+        else:
+            size = job.output_path.stat().st_size
+            self.send_response(200)
+            self.send_header("Content-Type", "video/mp4")
+            self.send_header("Content-Length", str(size))
+            self.end_headers()
+            with open(job.output_path, "rb") as f:
+                shutil.copyfileobj(f, self.wfile)
+
+    def do_POST(self):
+        if self.path.rstrip("/") != "/jobs":
+            self._send_json(404, {"error": "Not found"})
+            return
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            spec = json.loads(self.rfile.read(length) or b"{}")
+            if not isinstance(spec, dict):
+                raise ValueError("Request body must be a JSON object")
+            job = self.server.daemon.submit(spec)
+        except ValueError as e:
+            self._send_json(400, {"error": str(e)})
+            return
+        self._send_json(201, job.to_dict())
+
+    def do_DELETE(self):
+        job, video = self._job()
+        if job is None or video:
+            self._send_json(404, {"error": "No such job"})
+        elif self.server.daemon.cancel(job.id):
+            self._send_json(200, job.to_dict())
+        else:
+            self._send_json(409, {"error": f"Job is {job.status}"})
+
+
+class _DaemonServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, daemon: RenderDaemon):
+        super().__init__(address, _Handler)
+        self.daemon = daemon
+
+
+class _UnixHandler(_Handler):
+    # TCP_NODELAY does not apply to Unix sockets
+    disable_nagle_algorithm = False
+
+
+class _UnixDaemonServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, path: str, daemon: RenderDaemon):
+        super().__init__(path, _UnixHandler)
+        self.daemon = daemon
+
+    def get_request(self):
+        # BaseHTTPRequestHandler expects a (host, port) client address
+        request, _ = super().get_request()
+        return request, ("unix", 0)
+
+
+def make_server(
+    daemon: RenderDaemon,
+    host: str = "127.0.0.1",
+    port: int = DEFAULT_PORT,
+    socket_path: Path | None = None,
+):
+    """Bind the job API to a TCP port or, if socket_path is given, a Unix socket."""
+    if socket_path is not None:
+        socket_path.unlink(missing_ok=True)
+        return _UnixDaemonServer(str(socket_path), daemon)
+    return _DaemonServer((host, port), daemon)
@@ -0,0 +1,141 @@
+"""Silence detection for splitting a single narration track into scenes."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import numpy as np
+
+# Analysis frame length for RMS loudness
+FRAME_MS = 10
+# Frames quieter than this (dBFS) count as silence
+SILENCE_THRESHOLD_DB = -45.0
+# Ignore pauses shorter than this; normal sentence gaps are usually ~300ms
+MIN_SILENCE_MS = 400
+# Silence kept at each side of a cut so scenes don't start/end abruptly
+EDGE_PADDING_MS = 150
+# How far a cut may sit from its predicted position, as a fraction of the
+# shorter of the two scenes it separates
+CUT_TOLERANCE = 0.4
+
+
+@dataclass(frozen=True)
+class Silence:
+    """A run of silent audio, in milliseconds."""
+
+    start_ms: int
+    end_ms: int
+
+    @property
+    def duration_ms(self) -> int:
+        return self.end_ms - self.start_ms
+
+
+def to_mono_float(samples: np.ndarray, channels: int, sample_width: int) -> np.ndarray:
+    """Convert interleaved integer PCM samples to mono float32 in [-1.0, 1.0]."""
+    data = np.asarray(samples, dtype=np.float32)
+    if channels > 1:
+        usable = len(data) - len(data) % channels
+        data = data[:usable].reshape(-1, channels).mean(axis=1)
+    return data / float(1 << (8 * sample_width - 1))
+
+
+def detect_silences(
+    samples: np.ndarray,
+    sample_rate: int,
+    *,
+    threshold_db: float = SILENCE_THRESHOLD_DB,
+    min_silence_ms: int = MIN_SILENCE_MS,
+    frame_ms: int = FRAME_MS,
+) -> list[Silence]:
+    """Find silent runs in mono float samples using frame-wise RMS loudness.
+
+    Leading and trailing silence is not reported: only pauses between
+    speech can be scene boundaries.
+    """
+    frame_len = max(1, sample_rate * frame_ms // 1000)
+    n_frames = len(samples) // frame_len
+    if n_frames == 0:
+        return []
+
+    frames = samples[: n_frames * frame_len].reshape(n_frames, frame_len)
+    rms = np.sqrt(np.mean(np.square(frames, dtype=np.float64), axis=1))
+    db = 20.0 * np.log10(np.maximum(rms, 1e-10))
+    silent = db < threshold_db
+
+    # Run boundaries: +1 where silence starts, -1 where it ends
+    edges = np.diff(np.concatenate(([0], silent.astype(np.int8), [0])))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+
+    min_frames = max(1, min_silence_ms // frame_ms)
+    silences = []
+    for start, end in zip(starts, ends):
+        if start == 0 or end == n_frames:
+            continue
+        if end - start >= min_frames:
+            silences.append(Silence(int(start) * frame_ms, int(end) * frame_ms))
+    return silences
+
+
+def find_scene_cuts(
+    silences: list[Silence],
+    n_scenes: int,
+    padding_ms: int = EDGE_PADDING_MS,
+    *,
+    weights: list[float] | None = None,
+    total_ms: int | None = None,
+    tolerance: float = CUT_TOLERANCE,
+) -> list[tuple[int, int]]:
+    """Pick the N-1 longest pauses as scene boundaries.
+
+    With weights (e.g. each scene's character count) and the track's
+    total_ms, every cut is checked against where the weights say that
+    scene should end, so one long dramatic pause inside a scene is not
+    mistaken for a boundary.
+
+    Returns (end_of_previous, start_of_next) millisecond pairs in order.
+    Raises ValueError if there are not enough pauses to split on, or if
+    a cut is further than tolerance from its predicted position.
+    """
+    needed = n_scenes - 1
+    if needed <= 0:
+        return []
+    if len(silences) < needed:
+        raise ValueError(
+            f"Found {len(silences)} pause(s) in narration, need {needed} to split scenes"
+        )
+
+    longest = sorted(silences, key=lambda s: s.duration_ms, reverse=True)[:needed]
+    chosen = sorted(longest, key=lambda s: s.start_ms)
+    if weights is not None and total_ms is not None:
+        _check_cuts(chosen, weights, total_ms, tolerance)
+    cuts = []
+    for silence in chosen:
+        pad = min(padding_ms, silence.duration_ms // 2)
+        cuts.append((silence.start_ms + pad, silence.end_ms - pad))
+    return cuts
+
+
+def _check_cuts(
+    chosen: list[Silence], weights: list[float], total_ms: int, tolerance: float
+) -> None:
+    """Raise ValueError if a cut is far from the weight-predicted scene end.
+
+    Positions are compared on the speech-only timeline (the chosen pauses
+    removed), where scene lengths are proportional to their weights.
+    """
+    speech_ms = total_ms - sum(s.duration_ms for s in chosen)
+    total_weight = sum(weights) or 1.0
+    shares = [speech_ms * w / total_weight for w in weights]
+    predicted = 0.0
+    paused = 0
+    for i, silence in enumerate(chosen):
+        predicted += shares[i]
+        spoken = silence.start_ms - paused
+        if abs(spoken - predicted) > tolerance * min(shares[i], shares[i + 1]):
+            raise ValueError(
+                f"Pause at {silence.start_ms / 1000:.1f}s does not match the predicted "
+                f"end of scene {i + 1} ({(predicted + paused) / 1000:.1f}s)"
+            )
+        paused += silence.duration_ms
@@ -0,0 +1,252 @@
+"""Content-addressed artifact store shared by all oslo processes.
+
+Blobs are named by the sha256 of their content and sharded by the first
+two hex digits (objects/ab/abcdef...). Work directories get artifacts by
+hardlink, so checking out or adopting a file never copies it when the
+store is on the same filesystem. Refs are small JSON documents naming
+the blobs a run needs; referenced blobs are never evicted.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import stat
+import time
+from collections.abc import Iterable
+from dataclasses import dataclass
+from pathlib import Path
+
+from oslo.config import StoreConfig
+from oslo.utils import file_lock, get_cache_dir, link_or_copy
+
+_CHUNK_SIZE = 1 << 20
+# Blobs used this recently are never evicted, so a run in progress keeps
+# the artifacts it has adopted but not yet referenced
+EVICTION_GRACE_SECONDS = 3600.0
+
+
+def file_digest(path: Path) -> str:
+    """Return the hex sha256 of a file's content."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(_CHUNK_SIZE):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+@dataclass(frozen=True)
+class StoreStats:
+    blobs: int
+    bytes: int
+    refs: int
+
+
+class ArtifactStore:
+    """A sha256-addressed blob store with refs, a size quota and LRU eviction."""
+
+    def __init__(self, root: Path, quota_bytes: int | None = None):
+        self.root = root
+        self.quota_bytes = quota_bytes
+        self.objects_dir = root / "objects"
+        self.refs_dir = root / "refs"
+        self.tmp_dir = root / "tmp"
+        for directory in (self.objects_dir, self.refs_dir, self.tmp_dir):
+            directory.mkdir(parents=True, exist_ok=True)
+
+    @classmethod
+    def from_config(cls, config: StoreConfig) -> ArtifactStore:
+        root = Path(config.directory) if config.directory else get_cache_dir("store")
+        return cls(root, config.quota_bytes)
+
+    def _lock(self):
+        return file_lock(self.root / ".lock")
+
+    def blob_path(self, digest: str) -> Path:
+        return self.objects_dir / digest[:2] / digest
+
+    def has(self, digest: str) -> bool:
+        return self.blob_path(digest).exists()
+
+    def _touch(self, path: Path) -> None:
+        # mtime doubles as last-use time for LRU eviction
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    def _insert(self, source: Path, digest: str, *, link: bool) -> Path:
+        blob = self.blob_path(digest)
+        if blob.exists():
+            self._touch(blob)
+            return blob
+        blob.parent.mkdir(exist_ok=True)
+        tmp_path = self.tmp_dir / f"{digest}.{os.getpid()}.{time.monotonic_ns()}"
+        try:
+            # A file that is already hardlinked elsewhere (a library
+            # derivative, say) is copied: the blob is made read-only below,
+            # which would change the other names' inode too
+            if link and os.stat(source).st_nlink == 1:
+                try:
+                    os.link(source, tmp_path)
+                except OSError:
+                    shutil.copyfile(source, tmp_path)
+            else:
+                shutil.copyfile(source, tmp_path)
+            # Blobs are shared by hardlink; make accidental in-place edits fail
+            os.chmod(tmp_path, stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH)
+            os.replace(tmp_path, blob)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+        self._touch(blob)
+        return blob
+
+    def put(self, path: Path) -> str:
+        """Copy a file into the store and return its digest."""
+        digest = file_digest(path)
+        self._insert(path, digest, link=False)
+        return digest
+
+    def adopt(self, path: Path) -> str:
+        """Add a finished work file to the store by hardlinking it.
+
+        The work file and the blob become the same inode (made read-only),
+        so the file must not be modified afterwards. Falls back to a copy
+        across filesystems, or if the file already has other hardlinks.
+        """
+        digest = file_digest(path)
+        self._insert(path, digest, link=True)
+        return digest
+
+    def adopt_all(self, paths: Iterable[Path]) -> list[str]:
+        return [self.adopt(p) for p in paths]
+
+    def checkout(self, digest: str, dest: Path) -> Path:
+        """Place a blob at dest (hardlink, else copy). Raises KeyError if missing."""
+        blob = self.blob_path(digest)
+        try:
+            self._touch(blob)
+            return link_or_copy(blob, dest)
+        except FileNotFoundError as e:
+            raise KeyError(f"Artifact not in store: {digest}") from e
+
+    def open(self, digest: str):
+        """Open a blob for reading. Raises KeyError if missing."""
+        try:
+            return open(self.blob_path(digest), "rb")
+        except FileNotFoundError as e:
+            raise KeyError(f"Artifact not in store: {digest}") from e
+
+    # Refs -----------------------------------------------------------------
+
+    def _ref_path(self, name: str) -> Path:
+        parts = name.split("/")
+        if not name or any(p in ("", ".", "..") for p in parts):
+            raise ValueError(f"Invalid ref name: {name!r}")
+        return self.refs_dir.joinpath(*parts).with_suffix(".json")
+
+    def set_ref(self, name: str, data: dict) -> Path:
+        """Write a ref: a JSON document whose "artifacts" map names to digests."""
+        path = self._ref_path(name)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        try:
+            tmp_path.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
+            os.replace(tmp_path, path)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+        return path
+
+    def get_ref(self, name: str) -> dict | None:
+        try:
+            return json.loads(self._ref_path(name).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+
+    def delete_ref(self, name: str) -> None:
+        self._ref_path(name).unlink(missing_ok=True)
+
+    def list_refs(self, prefix: str = "") -> list[str]:
+        """Names of refs under prefix, oldest first."""
+        base = self.refs_dir / prefix if prefix else self.refs_dir
+        paths = sorted(base.rglob("*.json"), key=lambda p: (p.stat().st_mtime_ns, p.name))
+        return [p.relative_to(self.refs_dir).with_suffix("").as_posix() for p in paths]
+
+    def prune_refs(self, prefix: str, keep: int) -> list[str]:
+        """Delete all but the newest `keep` refs under prefix; return the deleted names."""
+        names = self.list_refs(prefix)
+        stale = names[: max(0, len(names) - keep)]
+        for name in stale:
+            self.delete_ref(name)
+        return stale
+
+    def _referenced(self) -> set[str]:
+        digests: set[str] = set()
+        for path in self.refs_dir.rglob("*.json"):
+            try:
+                data = json.loads(path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                continue
+            digests.update(_collect_digests(data.get("artifacts", {})))
+        return digests
+
+    # Quota ----------------------------------------------------------------
+
+    def _blobs(self) -> list[tuple[float, int, Path]]:
+        blobs = []
+        for shard in self.objects_dir.iterdir():
+            if not shard.is_dir():
+                continue
+            with os.scandir(shard) as it:
+                for entry in it:
+                    st = entry.stat()
+                    blobs.append((st.st_mtime, st.st_size, Path(entry.path)))
+        return blobs
+
+    def stats(self) -> StoreStats:
+        blobs = self._blobs()
+        return StoreStats(
+            blobs=len(blobs),
+            bytes=sum(size for _, size, _ in blobs),
+            refs=sum(1 for _ in self.refs_dir.rglob("*.json")),
+        )
+
+    def evict(self, quota_bytes: int | None = None) -> int:
+        """Delete least recently used, unreferenced blobs until under quota.
+
+        Blobs used within EVICTION_GRACE_SECONDS are kept. Returns the
+        number of bytes freed.
+        """
+        quota = self.quota_bytes if quota_bytes is None else quota_bytes
+        if quota is None:
+            return 0
+        with self._lock():
+            blobs = self._blobs()
+            total = sum(size for _, size, _ in blobs)
+            if total <= quota:
+                return 0
+            referenced = self._referenced()
+            cutoff = time.time() - EVICTION_GRACE_SECONDS
+            freed = 0
+            for mtime, size, path in sorted(blobs):
+                if total - freed <= quota:
+                    break
+                if mtime > cutoff or path.name in referenced:
+                    continue
+                path.unlink(missing_ok=True)
+                freed += size
+            return freed
+
+
+def _collect_digests(value) -> Iterable[str]:
+    """Yield every digest string inside a ref's (possibly nested) artifacts."""
+    if isinstance(value, str):
+        yield value
+    elif isinstance(value, dict):
+        for item in value.values():
+            yield from _collect_digests(item)
+    elif isinstance(value, list):
+        for item in value:
+            yield from _collect_digests(item)
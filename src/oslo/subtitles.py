@@ -3,9 +3,7 @@
 from dataclasses import dataclass
 from pathlib import Path
 
-from pydub import AudioSegment
-
-from oslo.text_processor import Scene, _is_cjk_dominant
+from oslo.text_processor import Scene
 
 
 @dataclass
@@ -20,20 +18,27 @@ def generate_subtitles(
     scenes: list[Scene],
     audio_paths: list[Path],
     words_per_subtitle: int = 6,
+    audio_durations: list[float] | None = None,
 ) -> list[SubtitleEntry]:
     """Generate subtitle entries with timing based on actual audio durations.
 
     For CJK text, scene.words are already properly-sized chunks (≤18 chars)
     and should not be further grouped. For English, words are grouped by
     words_per_subtitle. Timing is weighted by character count.
+    Pass precomputed audio durations to avoid decoding the files again.
     """
     entries = []
     subtitle_index = 1
     cumulative_time = 0.0
 
-    for scene, audio_path in zip(scenes, audio_paths):
-        audio = AudioSegment.from_mp3(str(audio_path))
-        scene_duration = audio.duration_seconds
+    if audio_durations is None:
+        from pydub import AudioSegment
+
+        audio_durations = [
+            AudioSegment.from_mp3(str(p)).duration_seconds for p in audio_paths
+        ]
+
+    for scene, scene_duration in zip(scenes, audio_durations):
 
         words = scene.words
         if not words:
@@ -42,7 +47,7 @@ def generate_subtitles(
 
         # CJK: words are already subtitle-sized chunks, use directly
         # English: group words into subtitle chunks
-        is_cjk = _is_cjk_dominant(scene.narration_text)
+        is_cjk = scene.stats.is_cjk
         if is_cjk:
             chunks = words
         else:
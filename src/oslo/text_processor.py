@@ -1,5 +1,7 @@
 """Text parsing, scene splitting, and image prompt generation."""
 
+import bisect
+import functools
 import re
 from dataclasses import dataclass, field
 
@@ -12,6 +14,9 @@ _CJK_RANGES = (
     "\uf900-\ufaff"  # CJK Compatibility Ideographs
 )
 _CJK_PATTERN = re.compile(f"[{_CJK_RANGES}]")
+_WHITESPACE_PATTERN = re.compile(r"\s")
+_WORD_PATTERN = re.compile(r"\S+")
+_SENTENCE_END_PATTERN = re.compile(r"[。.！？]")
 
 # Speaking rates
 DEFAULT_WPM = 150.0  # English words per minute
@@ -30,29 +35,98 @@ MIN_SEGMENT_WORDS = 10
 JP_CHARS_PER_SUBTITLE = 12
 
 
+@dataclass(frozen=True)
+class TextStats:
+    """Language and length metrics for a piece of text, computed once."""
+
+    chars: int = 0  # len(text)
+    stripped_chars: int = 0  # len(text.strip())
+    cjk_chars: int = 0
+    space_chars: int = 0
+    words: int = 0  # len(text.split())
+    sentence_ends: tuple[int, ...] = ()  # offsets of 。.！？
+
+    @property
+    def is_cjk(self) -> bool:
+        """True when the text is primarily CJK (Japanese/Chinese/Korean)."""
+        return self.cjk_chars > self.chars * 0.2
+
+    @property
+    def nonspace_chars(self) -> int:
+        return self.chars - self.space_chars
+
+    @property
+    def segment_length(self) -> int:
+        """Language-aware length: characters for CJK, words otherwise."""
+        return self.stripped_chars if self.is_cjk else self.words
+
+    @property
+    def min_segment_size(self) -> int:
+        """Minimum length for a segment to stand alone in this language."""
+        return MIN_SEGMENT_CHARS if self.is_cjk else MIN_SEGMENT_WORDS
+
+    def joined(self, other: "TextStats", sep: str = "\n") -> "TextStats":
+        """Stats for ``a + sep + b`` where both texts are already stripped.
+
+        Sentence offsets are not carried over; re-analyze the joined text
+        if they are needed.
+        """
+        sep_spaces = len(_WHITESPACE_PATTERN.findall(sep))
+        return TextStats(
+            chars=self.chars + len(sep) + other.chars,
+            stripped_chars=self.stripped_chars + len(sep) + other.stripped_chars,
+            cjk_chars=self.cjk_chars + len(_CJK_PATTERN.findall(sep)) + other.cjk_chars,
+            space_chars=self.space_chars + sep_spaces + other.space_chars,
+            words=self.words + other.words,
+        )
+
+
+@dataclass(frozen=True)
+class SpeakingRate:
+    """Speaking rate used to turn text length into seconds of narration."""
+
+    wpm: float = DEFAULT_WPM  # English words per minute
+    cpm: float = DEFAULT_CPM  # Japanese characters per minute
+
+
+DEFAULT_RATE = SpeakingRate()
+
+
+@functools.lru_cache(maxsize=1024)
+def analyze_text(text: str) -> TextStats:
+    """Compute TextStats for text.
+
+    Each metric is a single linear scan done in C by the regex engine, and
+    results are memoized so repeated calls on the same string are free.
+    """
+    return TextStats(
+        chars=len(text),
+        stripped_chars=len(text.strip()),
+        cjk_chars=_CJK_PATTERN.subn("", text)[1],
+        space_chars=_WHITESPACE_PATTERN.subn("", text)[1],
+        words=sum(1 for _ in _WORD_PATTERN.finditer(text)),
+        sentence_ends=tuple(m.start() for m in _SENTENCE_END_PATTERN.finditer(text)),
+    )
+
+
 def _is_cjk_dominant(text: str) -> bool:
     """Check if text is primarily CJK (Japanese/Chinese/Korean)."""
-    cjk_count = len(_CJK_PATTERN.findall(text))
-    return cjk_count > len(text) * 0.2
+    return analyze_text(text).is_cjk
 
 
 def _segment_length(text: str) -> int:
     """Return a language-aware length metric for a text segment."""
-    if _is_cjk_dominant(text):
-        return len(text.strip())
-    return len(text.split())
+    return analyze_text(text).segment_length
 
 
 def _min_segment_size(text: str) -> int:
     """Return the minimum segment size threshold based on language."""
-    if _is_cjk_dominant(text):
-        return MIN_SEGMENT_CHARS
-    return MIN_SEGMENT_WORDS
+    return analyze_text(text).min_segment_size
 
 
 def _split_for_subtitles(text: str) -> list[str]:
     """Split text into subtitle-sized chunks, handling both CJK and English."""
-    if _is_cjk_dominant(text):
+    if analyze_text(text).is_cjk:
         clean = re.sub(r"\s+", "", text)
         # Split on punctuation boundaries first (keeps punctuation with preceding text)
         parts = re.split(r"(?<=[。、！？，])", clean)
@@ -124,6 +198,12 @@ class Scene:
     words: list[str] = field(default_factory=list)
     stat_overlay: str | None = None
     library_image: str | None = None
+    visual_text: str | None = None  # conte **映像** description, if any
+
+    @property
+    def stats(self) -> TextStats:
+        """Text metrics for the narration (memoized by analyze_text)."""
+        return analyze_text(self.narration_text)
 
     def __post_init__(self):
         if not self.tts_text:
@@ -132,36 +212,44 @@ class Scene:
             self.words = _split_for_subtitles(self.narration_text)
 
 
-def estimate_duration(text: str) -> float:
+def estimate_duration(text: str, rate: SpeakingRate = DEFAULT_RATE) -> float:
     """Estimate speaking duration in seconds based on text content."""
-    if _is_cjk_dominant(text):
-        char_count = len(re.sub(r"\s+", "", text))
-        return (char_count / DEFAULT_CPM) * 60.0
-    word_count = len(text.split())
-    return (word_count / DEFAULT_WPM) * 60.0
+    return _estimate_from_stats(analyze_text(text), rate)
+
 
+def _estimate_from_stats(stats: TextStats, rate: SpeakingRate) -> float:
+    if stats.is_cjk:
+        return (stats.nonspace_chars / rate.cpm) * 60.0
+    return (stats.words / rate.wpm) * 60.0
 
-def truncate_to_duration(text: str, max_duration: float) -> str:
+
+def truncate_to_duration(
+    text: str, max_duration: float, rate: SpeakingRate = DEFAULT_RATE
+) -> str:
     """Truncate text to fit within max_duration.
 
     Truncates at sentence boundary nearest to the limit.
     """
-    if estimate_duration(text) <= max_duration:
+    stats = analyze_text(text)
+    if _estimate_from_stats(stats, rate) <= max_duration:
         return text
 
-    if _is_cjk_dominant(text):
-        max_chars = int((max_duration / 60.0) * DEFAULT_CPM)
+    if stats.is_cjk:
+        max_chars = int((max_duration / 60.0) * rate.cpm)
         truncated = text[:max_chars]
+        # Last sentence end inside the cut, from the precomputed offsets
+        pos = bisect.bisect_left(stats.sentence_ends, len(truncated)) - 1
+        last_period = stats.sentence_ends[pos] if pos >= 0 else -1
     else:
-        max_words = int((max_duration / 60.0) * DEFAULT_WPM)
-        words = text.split()
-        truncated = " ".join(words[:max_words])
-
-    # Find the last sentence-ending punctuation
-    last_period = max(
-        truncated.rfind("。"), truncated.rfind("."),
-        truncated.rfind("！"), truncated.rfind("？"),
-    )
+        max_words = int((max_duration / 60.0) * rate.wpm)
+        words = text.split(None, max_words)[:max_words]
+        truncated = " ".join(words)
+        # Find the last sentence-ending punctuation
+        last_period = max(
+            truncated.rfind("。"), truncated.rfind("."),
+            truncated.rfind("！"), truncated.rfind("？"),
+        )
+
     if last_period > len(truncated) // 2:
         return truncated[: last_period + 1]
     return truncated
@@ -180,27 +268,38 @@ def _split_into_sentences(text: str) -> list[str]:
 
 
 def _merge_short_segments(segments: list[str]) -> list[str]:
-    """Merge segments that are too short into neighboring ones."""
+    """Merge segments that are too short into neighboring ones.
+
+    Groups are collected as lists with running stats and joined once at the
+    end, so merging is linear in the total text length.
+    """
     if not segments:
         return segments
 
-    # Determine threshold from first segment's language
-    full_text = "".join(segments)
-    min_size = _min_segment_size(full_text)
+    stats = [analyze_text(seg) for seg in segments]
+
+    # Determine threshold from the language of the whole text
+    total = stats[0]
+    for st in stats[1:]:
+        total = total.joined(st, sep="")
+    min_size = total.min_segment_size
 
-    merged = [segments[0]]
-    for seg in segments[1:]:
-        if _segment_length(merged[-1]) < min_size:
-            merged[-1] = merged[-1] + "\n" + seg
+    groups = [[segments[0]]]
+    group_stats = [stats[0]]
+    for seg, st in zip(segments[1:], stats[1:]):
+        if group_stats[-1].segment_length < min_size:
+            groups[-1].append(seg)
+            group_stats[-1] = group_stats[-1].joined(st)
         else:
-            merged.append(seg)
+            groups.append([seg])
+            group_stats.append(st)
 
     # If the last segment is too short, merge with previous
-    if len(merged) > 1 and _segment_length(merged[-1]) < min_size:
-        merged[-2] = merged[-2] + "\n" + merged[-1]
-        merged.pop()
+    if len(groups) > 1 and group_stats[-1].segment_length < min_size:
+        groups[-2].extend(groups.pop())
+        group_stats.pop()
 
-    return merged
+    return ["\n".join(group) for group in groups]
 
 
 def generate_image_prompt(
@@ -220,7 +319,10 @@ def generate_image_prompt(
 
 
 def split_into_scenes(
-    text: str, max_duration: float = 90.0, image_style_prefix: str | None = None
+    text: str,
+    max_duration: float = 90.0,
+    image_style_prefix: str | None = None,
+    rate: SpeakingRate = DEFAULT_RATE,
 ) -> list[Scene]:
     """Split input text into scenes suitable for video generation.
 
@@ -236,7 +338,7 @@ def split_into_scenes(
         raise ValueError("Input text is empty")
 
     # Truncate to fit duration
-    text = truncate_to_duration(text, max_duration)
+    text = truncate_to_duration(text, max_duration, rate)
 
     # Try paragraph-based splitting first
     segments = _split_into_paragraphs(text)
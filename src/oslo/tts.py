@@ -3,40 +3,150 @@
 from pathlib import Path
 
 import click
-from openai import OpenAI
 
 from oslo.config import TTSConfig
 from oslo.text_processor import Scene
 from oslo.utils import retry_on_rate_limit
 
+# Inserted between scenes in single-request mode; the ellipsis line makes the
+# voice pause long enough to be found again by silence detection.
+SCENE_PAUSE_MARKER = "\n\n……\n\n"
+SCENE_PAUSE_INSTRUCTIONS = (
+    "Read each paragraph naturally. Where a line contains only '……', "
+    "stay completely silent for about one and a half seconds."
+)
+# Longest input the speech endpoint accepts in one request
+MAX_INPUT_CHARS = 4096
+
+
+def measure_durations(audio_paths: list[Path]) -> list[float]:
+    """Return the duration in seconds of each audio file."""
+    from pydub import AudioSegment
+
+    return [AudioSegment.from_file(str(p)).duration_seconds for p in audio_paths]
+
+
+def combined_text(scenes: list[Scene]) -> str:
+    """Narration of all scenes as sent in single-request mode."""
+    return SCENE_PAUSE_MARKER.join(s.tts_text.strip() for s in scenes)
+
+
+def tts_request_count(scenes: list[Scene], config: TTSConfig) -> int:
+    """TTS requests a run will make, counting the single-request fallback."""
+    if (
+        config.single_request
+        and len(scenes) > 1
+        and len(combined_text(scenes)) <= MAX_INPUT_CHARS
+    ):
+        return 1
+    return len(scenes)
+
 
 class TTSClient:
     def __init__(self, api_key: str, config: TTSConfig):
-        self.client = OpenAI(api_key=api_key)
+        from oslo.clients import get_openai_client
+
+        self.client = get_openai_client(api_key)
         self.config = config
 
     @retry_on_rate_limit()
-    def generate_speech(self, text: str, output_path: Path) -> Path:
+    def generate_speech(
+        self, text: str, output_path: Path, instructions: str | None = None
+    ) -> Path:
         """Generate speech audio for the given text using streaming response."""
-        with self.client.audio.speech.with_streaming_response.create(
-            model=self.config.model,
-            voice=self.config.voice,
-            input=text,
-            speed=self.config.speed,
-            response_format=self.config.output_format,
-        ) as response:
-            response.stream_to_file(str(output_path))
-        return output_path
+        from oslo.concurrency import get_limiter
+        from oslo.fixtures import provider_file
+
+        request = {
+            "model": self.config.model,
+            "voice": self.config.voice,
+            "input": text,
+            "speed": self.config.speed,
+            "response_format": self.config.output_format,
+        }
+        if instructions:
+            request["instructions"] = instructions
+
+        def call() -> None:
+            with self.client.audio.speech.with_streaming_response.create(
+                **request
+            ) as response:
+                response.stream_to_file(str(output_path))
+
+        with get_limiter("openai-tts").slot():
+            return provider_file("tts", request, output_path, call)
 
     def generate_all_scenes(
         self, scenes: list[Scene], temp_dir: Path, verbose: bool = False
     ) -> list[Path]:
         """Generate audio for all scenes. Returns list of audio file paths."""
-        audio_paths = []
-        for scene in scenes:
+        if self.config.single_request and len(scenes) > 1:
+            try:
+                return self.generate_combined(scenes, temp_dir, verbose=verbose)
+            except ValueError as e:
+                click.echo(f"  Single-request TTS not used ({e}).")
+                click.echo("  Falling back to one request per scene.")
+
+        from concurrent.futures import ThreadPoolExecutor
+
+        from oslo.concurrency import get_limiter
+
+        def generate(scene: Scene) -> Path:
             if verbose:
                 click.echo(f"  Generating audio for scene {scene.index + 1}/{len(scenes)}...")
             audio_path = temp_dir / f"scene_{scene.index:03d}.mp3"
-            self.generate_speech(scene.tts_text, audio_path)
+            return self.generate_speech(scene.tts_text, audio_path)
+
+        # The provider's adaptive limiter decides how many actually run at once
+        with ThreadPoolExecutor(max_workers=get_limiter("openai-tts").ceiling) as pool:
+            return list(pool.map(generate, scenes))
+
+    def generate_combined(
+        self, scenes: list[Scene], temp_dir: Path, verbose: bool = False
+    ) -> list[Path]:
+        """Synthesize all scenes in one request and split the result at pauses.
+
+        Writes the same scene_XXX.mp3 files as per-scene generation.
+        Raises ValueError if the narration is too long for one request or
+        cannot be split into len(scenes) parts where the scenes' lengths
+        predict.
+        """
+        from pydub import AudioSegment
+
+        from oslo.silence import detect_silences, find_scene_cuts, to_mono_float
+
+        full_text = combined_text(scenes)
+        if len(full_text) > MAX_INPUT_CHARS:
+            raise ValueError(
+                f"narration is {len(full_text)} characters, "
+                f"over the {MAX_INPUT_CHARS}-character request limit"
+            )
+        if verbose:
+            click.echo(f"  Generating audio for {len(scenes)} scenes in one request...")
+        full_path = temp_dir / f"narration_full.{self.config.output_format}"
+        self.generate_speech(full_text, full_path, instructions=SCENE_PAUSE_INSTRUCTIONS)
+
+        audio = AudioSegment.from_file(str(full_path), format=self.config.output_format)
+        samples = to_mono_float(
+            audio.get_array_of_samples(), audio.channels, audio.sample_width
+        )
+        silences = detect_silences(samples, audio.frame_rate)
+        cuts = find_scene_cuts(
+            silences,
+            len(scenes),
+            weights=[len(s.tts_text.strip()) for s in scenes],
+            total_ms=len(audio),
+        )
+
+        bounds = [0] + [ms for cut in cuts for ms in cut] + [len(audio)]
+        audio_paths = []
+        for scene, start_ms, end_ms in zip(scenes, bounds[::2], bounds[1::2]):
+            audio_path = temp_dir / f"scene_{scene.index:03d}.mp3"
+            audio[start_ms:end_ms].export(str(audio_path), format="mp3")
             audio_paths.append(audio_path)
+        if verbose:
+            durations = ", ".join(
+                f"{(end - start) / 1000:.1f}s" for start, end in zip(bounds[::2], bounds[1::2])
+            )
+            click.echo(f"  Split narration into {len(audio_paths)} scenes ({durations})")
         return audio_paths
@@ -1,7 +1,13 @@
 """Shared utilities: retry logic, helpers."""
 
+import contextlib
 import functools
+import os
+import shutil
+import sys
+import threading
 import time
+from pathlib import Path
 
 import click
 
@@ -33,29 +39,113 @@ def retry_on_rate_limit(max_retries: int = 3, base_delay: float = 5.0):
     return decorator
 
 
-def _is_retryable(exc: Exception) -> bool:
-    """Check if an exception is retryable (rate limit or server error)."""
-    # OpenAI errors
-    try:
-        from openai import APIError, RateLimitError
+# Error kinds worth retrying; they also shrink the adaptive concurrency window
+RETRYABLE_ERRORS = ("rate_limit", "server", "timeout")
 
-        if isinstance(exc, RateLimitError):
-            return True
-        if isinstance(exc, APIError) and exc.status_code and exc.status_code >= 500:
-            return True
-    except ImportError:
-        pass
 
-    # Google Gemini errors
-    try:
+def classify_error(exc: BaseException) -> str:
+    """Classify an API exception for retry and concurrency decisions.
+
+    Returns "rate_limit" (429), "quota" (429 insufficient_quota, which
+    waiting will not fix), "server" (5xx), "timeout" (timeouts and
+    connection failures) or "fatal" (anything else).
+    """
+    # An SDK that was never imported cannot have raised the exception
+    openai = sys.modules.get("openai")
+    if openai is not None:
+        if isinstance(exc, openai.RateLimitError):
+            return "quota" if exc.code == "insufficient_quota" else "rate_limit"
+        if isinstance(exc, openai.APIConnectionError):  # includes APITimeoutError
+            return "timeout"
+        if isinstance(exc, openai.APIStatusError) and exc.status_code >= 500:
+            return "server"
+
+    if "google.genai" in sys.modules:
         from google.genai.errors import APIError as GeminiAPIError
         from google.genai.errors import ServerError
 
         if isinstance(exc, ServerError):
-            return True
-        if isinstance(exc, GeminiAPIError) and hasattr(exc, "code") and exc.code == 429:
-            return True
-    except ImportError:
-        pass
+            return "server"
+        if isinstance(exc, GeminiAPIError) and getattr(exc, "code", None) == 429:
+            return "rate_limit"
+
+    httpx = sys.modules.get("httpx")
+    if httpx is not None and isinstance(exc, httpx.TransportError):
+        return "timeout"
+    return "fatal"
+
+
+def _is_retryable(exc: Exception) -> bool:
+    """Check if an exception is retryable (rate limit, server error or timeout)."""
+    return classify_error(exc) in RETRYABLE_ERRORS
+
+
+def get_cache_dir(*parts: str) -> Path:
+    """Return (and create) a subdirectory of oslo's per-user cache directory.
+
+    OSLO_CACHE_DIR overrides the location; otherwise $XDG_CACHE_HOME/oslo
+    or ~/.cache/oslo is used.
+    """
+    root = os.environ.get("OSLO_CACHE_DIR")
+    if root:
+        base = Path(root)
+    else:
+        xdg = os.environ.get("XDG_CACHE_HOME")
+        base = (Path(xdg) if xdg else Path.home() / ".cache") / "oslo"
+    path = base.joinpath(*parts)
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
 
-    return False
+@contextlib.contextmanager
+def file_lock(path: Path):
+    """Hold an exclusive advisory lock on `path` (created if missing).
+
+    Serializes critical sections across threads and processes. On
+    platforms without fcntl the section runs unlocked.
+    """
+    try:
+        import fcntl
+    except ImportError:  # pragma: no cover - Windows
+        yield
+        return
+    with open(path, "a") as f:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def atomic_write_bytes(path: Path, data: bytes) -> None:
+    """Write data to path via a temporary file and rename."""
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+
+def link_or_copy(source: Path, dest: Path) -> Path:
+    """Hardlink source to dest, copying instead across filesystems."""
+    dest.unlink(missing_ok=True)
+    try:
+        os.link(source, dest)
+    except OSError:
+        shutil.copy2(source, dest)
+    return dest
+
+
+_SIZE_UNITS = {"": 1, "K": 1 << 10, "M": 1 << 20, "G": 1 << 30, "T": 1 << 40}
+
+
+def parse_size(text: str) -> int:
+    """Parse a byte size such as "500M", "5G" or "1048576"."""
+    value = text.strip().upper().removesuffix("B").removesuffix("I")
+    unit = value[-1:] if value[-1:] in _SIZE_UNITS else ""
+    number = value[: len(value) - len(unit)].strip()
+    try:
+        return int(float(number) * _SIZE_UNITS[unit])
+    except ValueError:
+        raise ValueError(f"Invalid size: {text!r}") from None
@@ -0,0 +1,140 @@
+"""Tests for check module."""
+
+import pytest
+
+from oslo.check import (
+    CheckSettings,
+    check_conte,
+    check_contes,
+    collect_conte_paths,
+    image_cost,
+)
+from oslo.config import ImageGenConfig, TTSConfig, VideoConfig
+
+GOOD_CONTE = """# テスト
+
+## シーン 1
+**画像**: 001_kokkai
+**ナレーション**: 国会で新しい法案が審議されています。
+**数字**: 100
+
+## シーン 2
+**映像**: 渋谷の交差点
+**ナレーション**: 街の人々の声を聞きました。
+**数字**: 200
+"""
+
+
+@pytest.fixture()
+def settings(tmp_path, monkeypatch):
+    monkeypatch.setenv("OSLO_CACHE_DIR", str(tmp_path / "cache"))
+    lib = tmp_path / "images"
+    lib.mkdir()
+    (lib / "001_kokkai.png").write_bytes(b"\x89PNG\r\n\x1a\n")
+    return CheckSettings(
+        video=VideoConfig(min_duration=1.0, max_duration=90.0),
+        image_gen=ImageGenConfig(provider="openai", model="gpt-image-1", quality="low"),
+        library_dir=lib,
+    )
+
+
+def _write(tmp_path, name, text):
+    path = tmp_path / name
+    path.write_text(text, encoding="utf-8")
+    return path
+
+
+def test_good_conte(tmp_path, settings):
+    report = check_conte(_write(tmp_path, "a.md", GOOD_CONTE), settings)
+    assert report.ok
+    assert report.title == "テスト"
+    assert report.scenes == 2
+    assert report.tts_calls == 2
+    assert report.image_calls == 1
+    assert report.library_images == 1
+    assert report.predicted_duration > 0
+    assert report.cost == pytest.approx(0.016 + 0.015 * report.predicted_duration / 60)
+
+
+def test_missing_library_image(tmp_path, settings):
+    text = GOOD_CONTE.replace("001_kokkai", "009_missing")
+    report = check_conte(_write(tmp_path, "a.md", text), settings)
+    assert not report.ok
+    assert "scene 1 (line 3)" in report.errors[0]
+    assert "009_missing" in report.errors[0]
+
+
+def test_empty_narration_reports_every_scene(tmp_path, settings):
+    text = "## シーン 1\n**ナレーション**:\n\n## シーン 2\n**映像**: x\n"
+    report = check_conte(_write(tmp_path, "a.md", text), settings)
+    assert len(report.errors) == 2
+    assert "line 1" in report.errors[0]
+    assert "line 4" in report.errors[1]
+
+
+def test_over_long_conte(tmp_path, settings):
+    text = GOOD_CONTE.replace("街の人々の声を聞きました。", "長い文章です。" * 200)
+    report = check_conte(_write(tmp_path, "a.md", text), settings)
+    assert any("exceeds max 90s" in e for e in report.errors)
+
+
+def test_single_request_tts_counts_one_call(tmp_path, settings):
+    from dataclasses import replace
+
+    settings = replace(settings, tts=TTSConfig(single_request=True))
+    report = check_conte(_write(tmp_path, "a.md", GOOD_CONTE), settings)
+    assert report.tts_calls == 1
+
+    # Too long for one request: generation falls back to a request per scene
+    text = GOOD_CONTE.replace("街の人々の声を聞きました。", "長い文章です。" * 700)
+    report = check_conte(_write(tmp_path, "b.md", text), settings)
+    assert report.tts_calls == report.scenes
+
+
+def test_not_a_conte(tmp_path, settings):
+    report = check_conte(_write(tmp_path, "notes.md", "# メモ\n本文\n"), settings)
+    assert not report.is_conte
+
+
+def test_readings_counted(tmp_path, settings):
+    _write(tmp_path, "readings.yml", "用語:\n  法案: ほうあん\n")
+    report = check_conte(_write(tmp_path, "a.md", GOOD_CONTE), settings)
+    assert report.readings_applied == 1
+
+
+def test_collect_skips_research_notes(tmp_path):
+    _write(tmp_path, "001_a.md", GOOD_CONTE)
+    _write(tmp_path, "001_a.research.md", "# notes")
+    _write(tmp_path, "readme.txt", "x")
+    assert [p.name for p in collect_conte_paths([tmp_path])] == ["001_a.md"]
+
+
+def test_check_contes_parallel_preserves_order(tmp_path, settings):
+    paths = [_write(tmp_path, f"{i:03d}.md", GOOD_CONTE) for i in range(4)]
+    reports = check_contes(paths, settings, jobs=2)
+    assert [r.path for r in reports] == paths
+    assert all(r.ok for r in reports)
+
+
+def test_image_cost_by_provider():
+    assert image_cost(ImageGenConfig(provider="openai", quality="high")) == 0.25
+    assert image_cost(ImageGenConfig()) == 0.134
+
+
+def test_auto_matched_library_images(tmp_path, settings):
+    from dataclasses import replace
+
+    from oslo.config import LibraryConfig
+
+    (settings.library_dir / "002_shibuya.png").write_bytes(b"\x89PNG\r\n\x1a\n")
+    (settings.library_dir / "002_shibuya.yml").write_text(
+        "tags:\n  - 渋谷\n  - 交差点\ndescription: 渋谷の交差点\n", encoding="utf-8"
+    )
+    path = _write(tmp_path, "a.md", GOOD_CONTE)
+
+    # Off by default: auto-matching changes the rendered video
+    assert check_conte(path, settings).image_calls == 1
+
+    on = replace(settings, library=LibraryConfig(auto_match=True))
+    report = check_conte(path, on)
+    assert (report.auto_matched, report.image_calls, report.library_images) == (1, 0, 2)
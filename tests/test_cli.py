@@ -0,0 +1,56 @@
+import json
+import subprocess
+import sys
+
+import pytest
+
+HEAVY_MODULES = ("openai", "moviepy", "pydub", "PIL", "numpy", "google", "httpx")
+
+# Run the CLI in a fresh interpreter and report which heavy packages it imported
+_PROBE = """
+import json, sys
+from oslo.cli import main
+sys.argv = ["oslo", *sys.argv[1:]]
+try:
+    main()
+except SystemExit:
+    pass
+heavy = [m for m in %r if m in sys.modules]
+print("\\n" + json.dumps(heavy))
+"""
+
+
+def _imported_heavy_modules(args: list[str], tmp_path) -> list[str]:
+    proc = subprocess.run(
+        [sys.executable, "-c", _PROBE % (HEAVY_MODULES,), *args],
+        capture_output=True,
+        text=True,
+        cwd=tmp_path,
+        env={"OSLO_CACHE_DIR": str(tmp_path / "cache"), "PATH": ""},
+    )
+    assert proc.returncode == 0, proc.stderr
+    return json.loads(proc.stdout.splitlines()[-1])
+
+
+@pytest.mark.parametrize(
+    "args",
+    [
+        ["--version"],
+        ["--help"],
+        ["generate", "--help"],
+        ["profile", "list"],
+        ["library", "list"],
+        ["store", "info"],
+    ],
+)
+def test_cheap_commands_skip_heavy_imports(args, tmp_path):
+    assert _imported_heavy_modules(args, tmp_path) == []
+
+
+def test_check_skips_heavy_imports(tmp_path):
+    conte = tmp_path / "conte.md"
+    conte.write_text(
+        "# タイトル\n\n## シーン 1\n**映像**: 夜の街\n**ナレーション**: こんにちは。\n",
+        encoding="utf-8",
+    )
+    assert _imported_heavy_modules(["check", str(conte)], tmp_path) == []
@@ -0,0 +1,88 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from oslo import clients
+
+
+class _OkHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"ok")
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _OkHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_port}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture(autouse=True)
+def fresh_clients():
+    clients.close_clients()
+    yield
+    clients.close_clients()
+
+
+def test_keepalive_reuses_connection(server):
+    http = clients.get_http_client()
+    for _ in range(3):
+        assert http.get(server).text == "ok"
+    stats = clients.connection_stats()
+    assert stats.requests == 3
+    assert stats.connections == 1
+    assert stats.reused == 2
+    assert "2 reused" in stats.describe()
+
+
+def test_http_client_is_shared():
+    assert clients.get_http_client() is clients.get_http_client()
+
+
+def test_openai_clients_cached_per_key():
+    a = clients.get_openai_client("key-a")
+    assert clients.get_openai_client("key-a") is a
+    assert clients.get_openai_client("key-b") is not a
+    assert a._client is clients.get_http_client()
+
+
+def test_openai_client_uses_pool_timeout():
+    client = clients.get_openai_client("key-a")
+    assert client.timeout == clients.get_http_client().timeout
+    assert client.timeout.read == clients.READ_TIMEOUT
+    assert client.timeout.connect == clients.CONNECT_TIMEOUT
+
+    from openai._models import FinalRequestOptions
+
+    options = FinalRequestOptions.construct(method="post", url="/audio/speech", json_data={})
+    timeout = client._build_request(options).extensions["timeout"]
+    assert (timeout["connect"], timeout["read"]) == (clients.CONNECT_TIMEOUT, clients.READ_TIMEOUT)
+
+
+def test_gemini_client_uses_pool_timeout():
+    api = clients.get_gemini_client("key-g")._api_client
+    request = api._build_request("post", "models/x:generateContent", {})
+    assert request.timeout == clients.READ_TIMEOUT
+
+
+def test_gemini_client_cached():
+    client = clients.get_gemini_client("key-g")
+    assert clients.get_gemini_client("key-g") is client
+
+
+def test_close_resets_stats(server):
+    clients.get_http_client().get(server)
+    clients.close_clients()
+    assert clients.connection_stats() == clients.ConnectionStats(0, 0)
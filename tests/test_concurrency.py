@@ -0,0 +1,189 @@
+import threading
+import time
+
+import httpx
+import openai
+import pytest
+
+from oslo import clients, concurrency
+from oslo.concurrency import AdaptiveLimiter
+from oslo.config import ConcurrencyConfig, TTSConfig
+from oslo.fakeapi import FakeAPIConfig, FakeAPIServer, Latency
+from oslo.text_processor import Scene
+from oslo.tts import TTSClient
+from oslo.utils import _is_retryable, classify_error
+
+
+def _status_error(cls, status, body=None):
+    response = httpx.Response(status, request=httpx.Request("POST", "http://api.test"))
+    return cls("error", response=response, body=body)
+
+
+def _finish(limiter, error=None, latency=0.0):
+    started = limiter.acquire()
+    limiter.release(started - latency, error)
+
+
+class TestClassifyError:
+    def test_openai(self):
+        assert classify_error(_status_error(openai.RateLimitError, 429)) == "rate_limit"
+        quota = _status_error(openai.RateLimitError, 429, {"code": "insufficient_quota"})
+        assert classify_error(quota) == "quota"
+        assert classify_error(_status_error(openai.InternalServerError, 503)) == "server"
+        assert classify_error(_status_error(openai.BadRequestError, 400)) == "fatal"
+        timeout = openai.APITimeoutError(httpx.Request("POST", "http://api.test"))
+        assert classify_error(timeout) == "timeout"
+
+    def test_other(self):
+        assert classify_error(httpx.ConnectError("refused")) == "timeout"
+        assert classify_error(ValueError("bad")) == "fatal"
+
+    def test_quota_is_not_retryable(self):
+        quota = _status_error(openai.RateLimitError, 429, {"code": "insufficient_quota"})
+        assert not _is_retryable(quota)
+        assert _is_retryable(_status_error(openai.RateLimitError, 429))
+
+
+RATE_LIMITED = _status_error(openai.RateLimitError, 429)
+
+
+class TestAdaptiveLimiter:
+    def make(self, **kwargs):
+        return AdaptiveLimiter("test", ConcurrencyConfig(**{"initial": 2, "ceiling": 8, **kwargs}))
+
+    def test_slow_start_then_additive(self):
+        limiter = self.make()
+        for _ in range(3):
+            _finish(limiter)
+        assert limiter.window == 5
+        _finish(limiter, RATE_LIMITED)
+        assert limiter.window == 2.5
+        _finish(limiter)
+        assert limiter.window == pytest.approx(2.9)
+
+    def test_one_cut_per_round_trip(self):
+        limiter = self.make(initial=8)
+        starts = [limiter.acquire() for _ in range(4)]
+        for started in starts:
+            limiter.release(started, RATE_LIMITED)
+        assert limiter.window == 4
+        assert limiter.stats().throttled == 4
+
+    def test_bounds(self):
+        limiter = self.make(floor=2)
+        for _ in range(3):
+            _finish(limiter, RATE_LIMITED)
+            time.sleep(0.001)
+        assert limiter.window == 2
+        for _ in range(60):
+            _finish(limiter)
+        assert limiter.window == 8
+
+    def test_fatal_errors_keep_window(self):
+        limiter = self.make()
+        _finish(limiter, ValueError("bad request"))
+        assert limiter.window == 2
+        assert limiter.stats().failures == 1
+
+    def test_slow_success_holds_window(self):
+        limiter = self.make()
+        _finish(limiter, latency=1.0)
+        assert limiter.window == 3
+        _finish(limiter, latency=5.0)
+        assert limiter.window == 3
+
+    def test_fixed_mode_uses_ceiling(self):
+        limiter = self.make(adaptive=False, ceiling=3)
+        _finish(limiter, RATE_LIMITED)
+        assert limiter.window == 3
+
+    def test_reconfigure_keeps_learned_window(self):
+        limiter = self.make()
+        for _ in range(3):
+            _finish(limiter)
+        limiter.configure(ConcurrencyConfig(initial=2, ceiling=4))
+        assert limiter.window == 4
+
+    def test_blocks_at_limit(self):
+        limiter = self.make(adaptive=False, ceiling=2)
+        active = []
+        peak = []
+        lock = threading.Lock()
+
+        def work():
+            with limiter.slot():
+                with lock:
+                    active.append(1)
+                    peak.append(len(active))
+                time.sleep(0.02)
+                with lock:
+                    active.pop()
+
+        threads = [threading.Thread(target=work) for _ in range(6)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert max(peak) == 2
+        assert limiter.stats().peak_in_flight == 2
+        assert limiter.stats().successes == 6
+
+
+def test_scenes_run_concurrently(tmp_path, monkeypatch):
+    concurrency.reset_limiters()
+    clients.close_clients()
+    concurrency.configure(ConcurrencyConfig(initial=6, ceiling=6))
+    config = FakeAPIConfig(latency={"speech": Latency("fixed", 0.3)})
+    with FakeAPIServer(config) as server:
+        monkeypatch.setenv("OPENAI_BASE_URL", server.openai_base_url)
+        scenes = [Scene(index=i, narration_text="テスト", image_prompt="") for i in range(6)]
+        start = time.monotonic()
+        paths = TTSClient("key", TTSConfig()).generate_all_scenes(scenes, tmp_path)
+        elapsed = time.monotonic() - start
+    clients.close_clients()
+    stats = concurrency.get_limiter("openai-tts").stats()
+    concurrency.reset_limiters()
+
+    assert [p.name for p in paths] == [f"scene_{i:03d}.mp3" for i in range(6)]
+    assert stats.successes == 6
+    assert stats.peak_in_flight == 6
+    assert elapsed < 6 * 0.3
+
+
+class TestConcurrencyBounds:
+    def test_floor_and_ceiling(self, monkeypatch):
+        from oslo.config import load_config
+
+        monkeypatch.delenv("OSLO_MAX_CONCURRENCY", raising=False)
+        monkeypatch.setenv("OSLO_MIN_CONCURRENCY", "3")
+        config = load_config(require_api_keys=False).concurrency
+        assert (config.floor, config.initial, config.ceiling) == (3, 3, 8)
+        config = load_config(min_concurrency=2, max_concurrency=4, require_api_keys=False)
+        assert config.concurrency == ConcurrencyConfig(floor=2, initial=2, ceiling=4)
+
+    @pytest.mark.parametrize("bounds", [(5, 4), (9, None), (0, None)])
+    def test_invalid_bounds(self, monkeypatch, bounds):
+        from oslo.config import load_config
+
+        monkeypatch.delenv("OSLO_MAX_CONCURRENCY", raising=False)
+        monkeypatch.delenv("OSLO_MIN_CONCURRENCY", raising=False)
+        floor, ceiling = bounds
+        with pytest.raises(ValueError, match="concurrency"):
+            load_config(min_concurrency=floor, max_concurrency=ceiling, require_api_keys=False)
+
+
+class TestAbandon:
+    def test_abandon_frees_slot_and_blocks_new_ones(self):
+        from oslo.concurrency import Abandon, RequestAbandoned
+
+        limiter = AdaptiveLimiter("t", ConcurrencyConfig(adaptive=False, ceiling=1))
+        abandon = Abandon()
+        with limiter.slot(abandon):
+            abandon.abandon()
+            # The abandoned block is still running, but its slot is free
+            with limiter.slot():
+                pass
+        assert limiter.stats().successes == 1
+        with pytest.raises(RequestAbandoned):
+            with limiter.slot(abandon):
+                pass
@@ -4,7 +4,13 @@ import warnings
 
 import pytest
 
-from oslo.conte import is_conte_format, parse_conte, parse_conte_hook
+from oslo.conte import (
+    is_conte_format,
+    parse_conte,
+    parse_conte_document,
+    parse_conte_hook,
+    parse_conte_title,
+)
 from oslo.text_processor import IMAGE_STYLE_PREFIX, Scene, generate_image_prompt
 
 TEST_CONTE_MARKDOWN = """# テストタイトル
@@ -60,6 +66,7 @@ def test_parse_conte_visual_has_style_prefix():
 """
     scene = parse_conte(text)[0]
     assert IMAGE_STYLE_PREFIX in scene.image_prompt
+    assert scene.visual_text == "海辺の夕焼け"
 
 
 def test_parse_conte_visual_has_no_text_suffix():
@@ -77,6 +84,7 @@ def test_parse_conte_no_visual_fallback():
 """
     scene = parse_conte(text)[0]
     assert scene.image_prompt == generate_image_prompt("映像指定がない場合のテストです。")
+    assert scene.visual_text is None
 
 
 def test_parse_conte_missing_narration():
@@ -244,3 +252,85 @@ class TestParseConteHook:
 
     def test_hook_plain_text_returns_none(self):
         assert parse_conte_hook("これは通常のテキストです。") is None
+
+
+class TestParseConteDocument:
+    """Tests for the single-pass conte tokenizer."""
+
+    def test_line_numbers(self):
+        doc = parse_conte_document(TEST_CONTE_MARKDOWN)
+        assert doc.title.value == "テストタイトル"
+        assert doc.title.line == 1
+        assert [s.line for s in doc.scenes] == [3, 8]
+        narration = doc.scenes[1].field("ナレーション")
+        assert narration.line == 10
+        assert narration.value == "二つ目のシーンのテキストです。"
+
+    def test_multiline_field_value(self):
+        text = """## シーン 1
+**ナレーション**: 一行目です。
+二行目です。
+**数字**: 1
+"""
+        scene = parse_conte(text)[0]
+        assert scene.narration_text == "一行目です。\n二行目です。"
+
+    def test_value_on_next_line(self):
+        text = "## シーン 1\n**ナレーション**:\n次の行の本文。\n**数字**: 1\n"
+        assert parse_conte(text)[0].narration_text == "次の行の本文。"
+
+    def test_fields_in_list_items(self):
+        text = "## シーン 1\n- **映像**: 街\n- **ナレーション**: 本文です。\n  1. **数字**: 3\n"
+        scene = parse_conte(text)[0]
+        assert (scene.visual_text, scene.narration_text, scene.stat_overlay) == (
+            "街",
+            "本文です。",
+            "3",
+        )
+
+    def test_fields_on_one_line(self):
+        text = "## シーン 1\n**映像**: 青い空 **ナレーション**: こんにちは。 **数字**: 1\n"
+        scene = parse_conte(text)[0]
+        assert (scene.visual_text, scene.narration_text, scene.stat_overlay) == (
+            "青い空",
+            "こんにちは。",
+            "1",
+        )
+
+    def test_inline_hook(self):
+        text = "# T\n\n前置き **フック**: 見て\n\n## シーン 1\n**ナレーション**: テスト\n"
+        assert parse_conte_hook(text) == "見て"
+
+    def test_first_duplicate_field_wins(self):
+        text = "## Scene 1\n**ナレーション**: 最初\n**ナレーション**: 二番目\n**数字**: 1\n"
+        assert parse_conte(text)[0].narration_text == "最初"
+
+    def test_missing_narration_reports_line(self):
+        text = "# T\n\n## シーン 1\n**映像**: 街\n"
+        with pytest.raises(ValueError, match=r"scene 1 \(line 3\)"):
+            parse_conte(text)
+
+    def test_title_after_scenes(self):
+        text = "## シーン 1\n**ナレーション**: テスト\n\n# 後ろのタイトル\n"
+        assert parse_conte_title(text) == "後ろのタイトル"
+
+    def test_cached_by_content(self):
+        first = parse_conte_document(TEST_CONTE_MARKDOWN)
+        second = parse_conte_document(str(TEST_CONTE_MARKDOWN))
+        assert first is second
+
+    def test_cached_document_gives_fresh_scenes(self):
+        a = parse_conte(TEST_CONTE_MARKDOWN)
+        a[0].tts_text = "changed"
+        b = parse_conte(TEST_CONTE_MARKDOWN)
+        assert b[0].tts_text == "テスト用のナレーションです。"
+
+    def test_many_scenes(self):
+        blocks = [
+            f"## シーン {i}\n**ナレーション**: シーン{i}の本文。\n**数字**: {i}\n"
+            for i in range(1, 3001)
+        ]
+        scenes = parse_conte("# 大量\n\n" + "\n".join(blocks) + "\n## 説明\n説明文\n")
+        assert len(scenes) == 3000
+        assert scenes[-1].narration_text == "シーン3000の本文。"
+        assert scenes[-1].stat_overlay == "3000"
@@ -0,0 +1,197 @@
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+from PIL import Image
+
+from oslo.config import AppConfig, StoreConfig, load_config
+from oslo.drafts import (
+    DRAFT,
+    FINAL,
+    LIBRARY,
+    build_manifest,
+    check_scenes,
+    load_manifest,
+    parse_scene_numbers,
+    save_manifest,
+    scenes_to_upgrade,
+)
+from oslo.image_gen import ImageGenerator
+from oslo.pipeline import finalize_video
+from oslo.store import ArtifactStore, file_digest
+from oslo.text_processor import Scene
+
+CONTE = """# テスト
+
+## シーン 1
+**映像**: 青い空
+**ナレーション**: こんにちは。
+
+## シーン 2
+**映像**: 赤い夕日
+**ナレーション**: さようなら。
+"""
+
+
+class TestSceneNumbers:
+    def test_ranges(self):
+        assert parse_scene_numbers("1,3-4", 5) == {0, 2, 3}
+        assert parse_scene_numbers("all", 3) == {0, 1, 2}
+
+    @pytest.mark.parametrize("spec", ["0", "6", "2-1", "x", "1-y"])
+    def test_invalid(self, spec):
+        with pytest.raises(ValueError):
+            parse_scene_numbers(spec, 5)
+
+
+class TestManifest:
+    def manifest(self, tiers):
+        scenes = [Scene(index=i, narration_text=f"n{i}", image_prompt=f"p{i}") for i in range(3)]
+        artifacts = {"audio": ["a"] * 3, "images": ["i"] * 3, "subtitles": "s"}
+        manifest = build_manifest(
+            Path("c.md"), Path("c.mp4"), scenes, artifacts, tiers, [None] * 3
+        )
+        return scenes, manifest
+
+    def test_upgrades_only_approved_drafts(self):
+        _, manifest = self.manifest([DRAFT, LIBRARY, DRAFT])
+        for entry in manifest["scenes"][:2]:
+            entry["approved"] = True
+        assert scenes_to_upgrade(manifest) == [0]
+        manifest["scenes"][0]["tier"] = FINAL
+        assert scenes_to_upgrade(manifest) == []
+
+    def test_changed_scene_rejected(self):
+        scenes, manifest = self.manifest([DRAFT] * 3)
+        check_scenes(manifest, scenes)
+        scenes[1].narration_text = "edited"
+        with pytest.raises(ValueError, match="Scene 2 changed"):
+            check_scenes(manifest, scenes)
+        with pytest.raises(ValueError, match="3 scenes"):
+            check_scenes(manifest, scenes[:2])
+
+
+class TestImageTier:
+    def test_draft_and_final(self, monkeypatch):
+        monkeypatch.setenv("OPENAI_API_KEY", "k")
+        monkeypatch.setenv("GOOGLE_API_KEY", "g")
+        draft = load_config(image_tier="draft").image_gen
+        assert (draft.model, draft.quality) == ("gemini-2.5-flash-image", "low")
+        final = load_config(image_tier="final").image_gen
+        assert (final.model, final.quality) == ("gemini-3-pro-image-preview", "high")
+        assert load_config(image_tier="draft", image_quality="medium").image_gen.quality == (
+            "medium"
+        )
+
+    def test_tier_beats_profile_quality(self, monkeypatch):
+        from oslo.profile import GenerationDefaults
+
+        monkeypatch.setenv("OPENAI_API_KEY", "k")
+        monkeypatch.setenv("GOOGLE_API_KEY", "g")
+        profile = GenerationDefaults(image_quality="medium")
+        for tier, quality in (("draft", "low"), ("final", "high")):
+            config = load_config(image_tier=tier, profile_defaults=profile)
+            assert config.image_gen.quality == quality
+        assert load_config(profile_defaults=profile).image_gen.quality == "medium"
+        config = load_config(image_tier="draft", image_quality="high", profile_defaults=profile)
+        assert config.image_gen.quality == "high"
+
+
+@pytest.fixture
+def draft(tmp_path, monkeypatch):
+    """A conte with a two-scene draft recorded in a fresh store."""
+    monkeypatch.setenv("OSLO_CACHE_DIR", str(tmp_path / "cache"))
+    input_file = tmp_path / "c.md"
+    input_file.write_text(CONTE, encoding="utf-8")
+    store = ArtifactStore(tmp_path / "store")
+    work = tmp_path / "work"
+    work.mkdir()
+    files = {"srt": work / "subs.srt"}
+    files["srt"].write_text("1\n00:00:00,000 --> 00:00:01,000\nこんにちは。\n")
+    artifacts = {"audio": [], "images": [], "subtitles": store.put(files["srt"])}
+    for i, color in enumerate(["blue", "red"]):
+        audio = work / f"a{i}.mp3"
+        audio.write_bytes(f"audio{i}".encode())
+        image = work / f"i{i}.png"
+        Image.new("RGB", (108, 192), color).save(image)
+        artifacts["audio"].append(store.put(audio))
+        artifacts["images"].append(store.put(image))
+
+    from oslo.pipeline import _parse_scenes
+
+    config = AppConfig(openai_api_key="k", store=StoreConfig(directory=str(tmp_path / "store")))
+    scenes, _, _ = _parse_scenes(CONTE, input_file, config, None, None, False)
+    manifest = build_manifest(
+        input_file, tmp_path / "c.draft.mp4", scenes, artifacts, [DRAFT, DRAFT], ["m", "m"]
+    )
+    save_manifest(store, input_file, manifest)
+    return input_file, store, config
+
+
+def _finalize(input_file, config, approve=None):
+    generated = []
+    composed = {}
+
+    def fake_generate(prompt, output_path):
+        generated.append(prompt)
+        Image.new("RGB", (108, 192), "green").save(output_path)
+        return output_path
+
+    def fake_compose(**kwargs):
+        # Digest the inputs now; the work directory is gone after the render
+        composed["images"] = [file_digest(p) for p in kwargs["image_paths"]]
+        composed["audio"] = [file_digest(p) for p in kwargs["audio_paths"]]
+        composed["subtitles"] = file_digest(kwargs["srt_path"])
+        kwargs["output_path"].write_bytes(b"mp4")
+
+    output = input_file.with_suffix(".mp4")
+    with (
+        patch.object(ImageGenerator, "generate_image", side_effect=fake_generate),
+        patch("oslo.composer.compose_video", side_effect=fake_compose),
+    ):
+        finalize_video(input_file, output, config, approve=approve, skip_confirm=True)
+    return generated, composed
+
+
+def test_final_upgrades_approved_scene_only(draft):
+    input_file, store, config = draft
+    before = load_manifest(store, input_file)
+
+    generated, composed = _finalize(input_file, config, approve="2")
+
+    assert len(generated) == 1 and "赤い夕日" in generated[0]
+    images = composed["images"]
+    assert images[0] == before["artifacts"]["images"][0]
+    assert images[1] != before["artifacts"]["images"][1]
+    assert composed["audio"] == before["artifacts"]["audio"]
+    assert composed["subtitles"] == before["artifacts"]["subtitles"]
+
+    after = load_manifest(store, input_file)
+    assert [(s["approved"], s["tier"]) for s in after["scenes"]] == [
+        (False, DRAFT),
+        (True, FINAL),
+    ]
+    assert after["artifacts"]["images"][1] == images[1]
+
+    # Already upgraded scenes are not generated again
+    generated, _ = _finalize(input_file, config)
+    assert generated == []
+
+
+def test_final_requires_draft(tmp_path):
+    import click
+
+    input_file = tmp_path / "other.md"
+    input_file.write_text(CONTE, encoding="utf-8")
+    config = AppConfig(openai_api_key="k", store=StoreConfig(directory=str(tmp_path / "s")))
+    with pytest.raises(click.ClickException, match="--draft first"):
+        finalize_video(input_file, tmp_path / "o.mp4", config)
+
+
+def test_edited_conte_needs_new_draft(draft):
+    import click
+
+    input_file, _, config = draft
+    input_file.write_text(CONTE.replace("さようなら", "またね"), encoding="utf-8")
+    with pytest.raises(click.ClickException, match="Scene 2 changed"):
+        _finalize(input_file, config, approve="all")
@@ -0,0 +1,125 @@
+import base64
+import io
+import random
+import wave
+
+import httpx
+import pytest
+from PIL import Image
+
+from oslo.fakeapi import FakeAPIConfig, FakeAPIServer, Latency, silent_mp3, solid_png
+from oslo.utils import _is_retryable
+
+
+class TestLatency:
+    def test_parse(self):
+        assert Latency.parse("0.5") == Latency("fixed", 0.5)
+        assert Latency.parse("uniform:0.2,1.5") == Latency("uniform", 0.2, 1.5)
+        assert Latency.parse("lognormal:0.8,0.5") == Latency("lognormal", 0.8, 0.5)
+
+    @pytest.mark.parametrize("text", ["abc", "uniform:1", "gamma:1,2", "fixed:-1"])
+    def test_parse_invalid(self, text):
+        with pytest.raises(ValueError):
+            Latency.parse(text)
+
+    def test_sample_ranges(self):
+        rng = random.Random(0)
+        samples = [Latency("uniform", 0.2, 0.4).sample(rng) for _ in range(100)]
+        assert all(0.2 <= s <= 0.4 for s in samples)
+        median = sorted(Latency("lognormal", 1.0, 0.3).sample(rng) for _ in range(501))[250]
+        assert 0.8 < median < 1.25
+
+
+def test_payloads():
+    assert len(silent_mp3(1.0)) % 417 == 0
+    with Image.open(io.BytesIO(solid_png(30, 20, "x"))) as img:
+        assert img.size == (30, 20)
+        assert len(set(img.getdata())) == 1
+
+
+@pytest.fixture
+def serve():
+    servers = []
+
+    def start(**kwargs):
+        server = FakeAPIServer(FakeAPIConfig(**kwargs)).__enter__()
+        servers.append(server)
+        return server, httpx.Client(base_url=server.url)
+
+    yield start
+    for server in servers:
+        server.__exit__(None, None, None)
+
+
+class TestEndpoints:
+    def test_speech_streams_audio(self, serve):
+        _, client = serve()
+        request = {"input": "あいうえお", "response_format": "mp3"}
+        mp3 = client.post("/v1/audio/speech", json=request)
+        assert mp3.status_code == 200
+        assert mp3.headers["content-type"] == "audio/mpeg"
+        assert mp3.content.startswith(b"\xff\xfb")
+        wav = client.post("/v1/audio/speech", json={**request, "response_format": "wav"})
+        with wave.open(io.BytesIO(wav.content)) as w:
+            assert w.getnframes() / w.getframerate() == pytest.approx(0.6, abs=0.01)
+
+    def test_images(self, serve):
+        _, client = serve()
+        resp = client.post("/v1/images/generations", json={"prompt": "cat", "size": "64x96"})
+        png = base64.b64decode(resp.json()["data"][0]["b64_json"])
+        with Image.open(io.BytesIO(png)) as img:
+            assert img.size == (64, 96)
+
+    def test_gemini(self, serve):
+        _, client = serve()
+        resp = client.post(
+            "/v1beta/models/gemini-image:generateContent",
+            json={
+                "contents": [{"parts": [{"text": "cat"}]}],
+                "generationConfig": {"imageConfig": {"aspectRatio": "9:16"}},
+            },
+        )
+        part = resp.json()["candidates"][0]["content"]["parts"][0]
+        with Image.open(io.BytesIO(base64.b64decode(part["inlineData"]["data"]))) as img:
+            assert img.size == (576, 1024)
+
+    def test_stats(self, serve):
+        server, client = serve()
+        client.post("/v1/chat/completions", json={})
+        assert client.get("/stats").json() == {"chat": {"200": 1}}
+        assert client.post("/v1/unknown", json={}).status_code == 404
+
+
+class TestFaults:
+    def test_quota(self, serve):
+        _, client = serve(quota=2)
+        codes = [client.post("/v1/chat/completions", json={}).status_code for _ in range(3)]
+        assert codes == [200, 200, 429]
+
+    def test_rpm_sets_retry_after(self, serve):
+        _, client = serve(rpm=1)
+        assert client.post("/v1/chat/completions", json={}).status_code == 200
+        limited = client.post("/v1/chat/completions", json={})
+        assert limited.status_code == 429
+        assert int(limited.headers["retry-after"]) >= 59
+
+    def test_error_injection_rate(self, serve):
+        server, client = serve(errors={500: 0.3}, seed=1)
+        for _ in range(100):
+            client.post("/v1/chat/completions", json={})
+        assert 15 < server.stats()["chat"]["500"] < 45
+
+    def test_sdk_errors_are_retryable(self, serve):
+        from google import genai
+        from openai import OpenAI, RateLimitError
+
+        server, _ = serve(errors={429: 1.0})
+        openai_client = OpenAI(api_key="k", base_url=server.openai_base_url, max_retries=0)
+        with pytest.raises(RateLimitError) as exc_info:
+            openai_client.chat.completions.create(model="gpt-4o", messages=[])
+        assert _is_retryable(exc_info.value)
+
+        gemini = genai.Client(api_key="k", http_options={"base_url": server.url})
+        with pytest.raises(Exception) as exc_info:
+            gemini.models.generate_content(model="gemini-image", contents="cat")
+        assert _is_retryable(exc_info.value)
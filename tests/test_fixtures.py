@@ -0,0 +1,156 @@
+import zipfile
+
+import pytest
+from PIL import Image
+
+from oslo import clients
+from oslo.config import ImageGenConfig, TTSConfig, VideoConfig
+from oslo.fakeapi import FakeAPIServer
+from oslo.fixtures import (
+    FixtureArchive,
+    FixtureMissingError,
+    fingerprint,
+    provider_bytes,
+    use_fixtures,
+)
+from oslo.image_gen import ImageGenerator
+from oslo.library import analyze_image
+from oslo.tts import TTSClient
+
+
+class TestFingerprint:
+    def test_stable_and_order_independent(self):
+        assert fingerprint("tts", {"a": 1, "b": "x"}) == fingerprint("tts", {"b": "x", "a": 1})
+
+    def test_kind_and_values_matter(self):
+        base = fingerprint("tts", {"input": "こんにちは"})
+        assert fingerprint("vision", {"input": "こんにちは"}) != base
+        assert fingerprint("tts", {"input": "こんばんは"}) != base
+
+
+class TestArchive:
+    def test_record_then_replay(self, tmp_path):
+        path = tmp_path / "fx.zip"
+        calls = []
+        with use_fixtures(path, "record") as archive:
+            assert provider_bytes("k", {"q": 1}, lambda: calls.append(1) or b"one") == b"one"
+            assert archive.recorded == 1
+        with use_fixtures(path, "replay") as archive:
+            assert provider_bytes("k", {"q": 1}, lambda: calls.append(2) or b"two") == b"one"
+            assert archive.hits == 1
+        assert calls == [1]
+
+    def test_replay_missing_raises(self, tmp_path):
+        path = tmp_path / "fx.zip"
+        with use_fixtures(path, "record"):
+            pass
+        with use_fixtures(path, "replay"), pytest.raises(FixtureMissingError):
+            provider_bytes("k", {"q": 2}, lambda: b"")
+
+    def test_record_appends_without_duplicates(self, tmp_path):
+        path = tmp_path / "fx.zip"
+        for _ in range(2):
+            with FixtureArchive(path, "record") as archive:
+                archive.fetch("k", {"q": 1}, lambda: b"data")
+        with zipfile.ZipFile(path) as zf:
+            assert len(zf.namelist()) == 2  # response + request JSON
+
+    def test_no_archive_calls_provider(self):
+        assert provider_bytes("k", {}, lambda: b"live") == b"live"
+
+    def test_invalid_mode(self, tmp_path):
+        with pytest.raises(ValueError):
+            FixtureArchive(tmp_path / "fx.zip", "rewind")
+
+
+def test_providers_replay_offline(tmp_path, monkeypatch):
+    """Record TTS, both image providers and vision against the fake API, then replay."""
+    video = VideoConfig(width=108, height=192)
+    archive_path = tmp_path / "fx.zip"
+
+    def run(out):
+        out.mkdir()
+        tts = TTSClient("key", TTSConfig())
+        tts.generate_speech("こんにちは", out / "a.mp3")
+        ImageGenerator("key", ImageGenConfig(provider="openai"), video).generate_image(
+            "cat", out / "o.png"
+        )
+        ImageGenerator("key", ImageGenConfig(), video, google_api_key="g").generate_image(
+            "dog", out / "g.png"
+        )
+        return analyze_image("key", out / "g.png")
+
+    clients.close_clients()
+    with FakeAPIServer() as server:
+        monkeypatch.setenv("OPENAI_BASE_URL", server.openai_base_url)
+        monkeypatch.setenv("GOOGLE_GEMINI_BASE_URL", server.url)
+        with use_fixtures(archive_path, "record") as archive:
+            recorded = run(tmp_path / "rec")
+        assert archive.recorded == 4
+    clients.close_clients()
+
+    # The server is gone: every call must come from the archive
+    with use_fixtures(archive_path, "replay") as archive:
+        replayed = run(tmp_path / "rep")
+    clients.close_clients()
+    assert archive.hits == 4
+    assert replayed == recorded
+    for name in ("a.mp3", "o.png", "g.png"):
+        assert (tmp_path / "rep" / name).read_bytes() == (tmp_path / "rec" / name).read_bytes()
+    with Image.open(tmp_path / "rep" / "o.png") as img:
+        assert img.size == (108, 192)
+
+
+def _library_image(lib, slug, tags):
+    (lib / f"{slug}.png").write_bytes(b"\x89PNG\r\n\x1a\n")
+    lines = "".join(f"  - {t}\n" for t in tags)
+    (lib / f"{slug}.yml").write_text(f"tags:\n{lines}description: ''\n", encoding="utf-8")
+
+
+def test_library_change_does_not_affect_replay(tmp_path):
+    from oslo.image_matcher import assign_library_images
+    from oslo.text_processor import Scene
+
+    lib = tmp_path / "images"
+    lib.mkdir()
+    _library_image(lib, "001_kokkai", ["国会議事堂", "政治"])
+    archive_path = tmp_path / "fx.zip"
+
+    def match():
+        scenes = [
+            Scene(index=0, narration_text="国会議事堂で政治の議論", image_prompt=""),
+            Scene(index=1, narration_text="渋谷のスクランブル交差点の夜", image_prompt=""),
+        ]
+        return [(s.index, m.slug) for s, m in assign_library_images(scenes, lib)]
+
+    with use_fixtures(archive_path, "record"):
+        recorded = match()
+    assert recorded == [(0, "001_kokkai")]
+
+    # A new library image would now take scene 1, whose image was generated
+    _library_image(lib, "002_shibuya", ["渋谷", "スクランブル交差点", "夜"])
+    assert match() == [(0, "001_kokkai"), (1, "002_shibuya")]
+    with use_fixtures(archive_path, "replay"):
+        assert match() == recorded
+
+
+def test_route_ranking_replayed(tmp_path, monkeypatch):
+    from oslo.config import RouterConfig
+
+    monkeypatch.setenv("OSLO_CACHE_DIR", str(tmp_path / "cache"))
+    gen = ImageGenerator(
+        "key",
+        ImageGenConfig(routing=RouterConfig(enabled=True)),
+        VideoConfig(width=108, height=192),
+        google_api_key="g",
+    )
+    archive_path = tmp_path / "fx.zip"
+    with use_fixtures(archive_path, "record"):
+        recorded = [c.provider for c, _ in gen._ranking("cat")]
+
+    # Router history changes after recording: the live ranking flips
+    for _ in range(3):
+        gen.router.observe(gen.router.candidates[0], 0.0, error=True)
+    assert [c.provider for c, _ in gen._ranking("cat")] != recorded
+    with use_fixtures(archive_path, "replay"):
+        assert [c.provider for c, _ in gen._ranking("cat")] == recorded
@@ -1,13 +1,15 @@
 """Tests for image generation module."""
 
+import time
 from pathlib import Path
 from unittest.mock import MagicMock, patch
 
 import pytest
 from PIL import Image
 
-from oslo.config import ImageGenConfig, VideoConfig
-from oslo.image_gen import ImageGenerator
+from oslo.config import HedgeConfig, ImageGenConfig, VideoConfig
+from oslo.image_gen import HedgePolicy, HedgeStats, ImageFallback, ImageGenerator
+from oslo.text_processor import Scene
 
 
 @pytest.fixture
@@ -191,3 +193,254 @@ class TestProviderDispatch:
             mock.return_value = Path("test.png")
             gen.generate_image("prompt", Path("test.png"))
             mock.assert_called_once()
+
+
+class TestLibraryImage:
+    def test_library_image_cached_and_linked(self, gemini_config, tmp_path):
+        lib = tmp_path / "images"
+        lib.mkdir()
+        source = lib / "001_a.jpg"
+        Image.new("RGB", (800, 600), "green").save(source)
+        gen = ImageGenerator(
+            openai_api_key="",
+            image_config=gemini_config,
+            video_config=VideoConfig(width=108, height=192),
+        )
+        out_dir = tmp_path / "tmp"
+        out_dir.mkdir()
+        with patch("oslo.library.resolve_image_path", return_value=source):
+            first = gen.copy_and_resize_library_image("001_a", out_dir / "scene_000.png")
+            second = gen.copy_and_resize_library_image("001_a", out_dir / "scene_001.png")
+
+        with Image.open(first) as img:
+            assert img.size == (108, 192)
+        # Both scenes share the cached derivative on disk
+        assert first.stat().st_ino == second.stat().st_ino
+        assert len(list((lib / ".derivatives").glob("*.png"))) == 1
+
+
+def _png_bytes(color):
+    from io import BytesIO
+
+    buf = BytesIO()
+    Image.new("RGB", (64, 96), color).save(buf, format="PNG")
+    return buf.getvalue()
+
+
+def _started(acquired):
+    """What _fetch does once it holds its limiter slot."""
+    if acquired is not None:
+        acquired.set()
+
+
+class TestHedging:
+    def make(self, target="other", initial_delay=0.05, **hedge):
+        config = ImageGenConfig(
+            hedge=HedgeConfig(enabled=True, target=target, initial_delay=initial_delay, **hedge)
+        )
+        return ImageGenerator(
+            openai_api_key="test-openai",
+            image_config=config,
+            video_config=VideoConfig(width=108, height=192),
+            google_api_key="test-google",
+        )
+
+    def test_backup_wins_when_primary_is_slow(self, tmp_path):
+        gen = self.make()
+
+        def fetch(prompt, config, acquired=None):
+            _started(acquired)
+            if config.provider == "gemini":
+                time.sleep(0.5)
+                return _png_bytes("blue")
+            return _png_bytes("red")
+
+        with patch.object(gen, "_fetch", side_effect=fetch) as mock:
+            gen.generate_image("prompt", tmp_path / "out.png")
+        assert [c.args[1].model for c in mock.call_args_list] == [
+            "gemini-3-pro-image-preview",
+            "gpt-image-1",
+        ]
+        with Image.open(tmp_path / "out.png") as img:
+            assert img.getpixel((0, 0)) == (255, 0, 0)
+        assert gen.hedging.stats() == HedgeStats(hedged=1, won=1, max_hedges=3)
+
+    def test_fast_primary_is_not_hedged(self, tmp_path):
+        gen = self.make()
+        with patch.object(gen, "_fetch", return_value=_png_bytes("blue")) as mock:
+            gen.generate_image("prompt", tmp_path / "out.png")
+        assert mock.call_count == 1
+        assert gen.hedging.stats().hedged == 0
+
+    def test_budget_caps_hedges(self, tmp_path):
+        gen = self.make(target="same", max_hedges=1)
+
+        def fetch(prompt, config, acquired=None):
+            _started(acquired)
+            time.sleep(0.15)
+            return _png_bytes("blue")
+
+        with patch.object(gen, "_fetch", side_effect=fetch) as mock:
+            for i in range(3):
+                gen.generate_image("prompt", tmp_path / f"{i}.png")
+        assert mock.call_count == 4
+        assert gen.hedging.stats().hedged == 1
+
+    def test_error_waits_for_backup(self, tmp_path):
+        gen = self.make(target="same")
+        calls = []
+
+        def fetch(prompt, config, acquired=None):
+            _started(acquired)
+            calls.append(config)
+            if len(calls) == 1:
+                time.sleep(0.2)
+                raise RuntimeError("primary failed")
+            time.sleep(0.3)
+            return _png_bytes("blue")
+
+        with patch.object(gen, "_fetch", side_effect=fetch):
+            assert gen.generate_image("prompt", tmp_path / "out.png").exists()
+
+    def test_all_attempts_failing_raises(self, tmp_path):
+        gen = self.make(target="same")
+
+        def fetch(prompt, config, acquired=None):
+            _started(acquired)
+            time.sleep(0.1)
+            raise RuntimeError("no image")
+
+        with patch.object(gen, "_fetch", side_effect=fetch):
+            with pytest.raises(RuntimeError, match="no image"):
+                gen.generate_image("prompt", tmp_path / "out.png")
+
+    def test_limiter_queueing_does_not_trigger_hedges(self, tmp_path):
+        from concurrent.futures import ThreadPoolExecutor
+
+        from oslo import concurrency
+        from oslo.config import ConcurrencyConfig
+
+        # One request at a time, four scenes at once: all but the first queue
+        # for longer than the hedge delay before their request even starts
+        concurrency.reset_limiters()
+        concurrency.configure(ConcurrencyConfig(adaptive=False, ceiling=1))
+        gen = self.make(target="same", initial_delay=0.3, min_samples=100)
+
+        def fetch_gemini(prompt, config):
+            time.sleep(0.2)
+            return _png_bytes("blue")
+
+        try:
+            with (
+                patch.object(gen, "_fetch_gemini", side_effect=fetch_gemini) as mock,
+                ThreadPoolExecutor(max_workers=4) as pool,
+            ):
+                list(pool.map(lambda i: gen.generate_image("p", tmp_path / f"{i}.png"), range(4)))
+        finally:
+            concurrency.reset_limiters()
+        assert mock.call_count == 4
+        assert gen.hedging.stats().hedged == 0
+
+    def test_other_without_key_stays_on_provider(self):
+        gen = self.make()
+        gen._google_api_key = ""
+        config = ImageGenConfig(provider="openai", model="gpt-image-1")
+        assert gen._hedge_config(config) is config
+
+    def test_delay_follows_latency_percentile(self):
+        policy = HedgePolicy(HedgeConfig(percentile=0.9, min_samples=4, initial_delay=30.0))
+        assert policy.delay("gemini") == 30.0
+        for latency in range(1, 11):
+            policy.observe("gemini", float(latency))
+        assert policy.delay("gemini") == 9.0
+        assert policy.delay("openai") == 30.0
+
+
+class TestDeadlines:
+    def make(self):
+        return ImageGenerator(
+            openai_api_key="test-openai",
+            image_config=ImageGenConfig(provider="openai", model="gpt-image-1"),
+            video_config=VideoConfig(width=108, height=192),
+        )
+
+    def run(self, gen, tmp_path, prompts, **deadlines):
+        scenes = [Scene(index=i, narration_text="", image_prompt=p) for i, p in enumerate(prompts)]
+
+        def fake_generate(prompt, output_path):
+            if prompt == "fail":
+                raise RuntimeError("provider down")
+            if prompt == "slow":
+                time.sleep(1.0)
+            Image.new("RGB", (108, 192), "red").save(output_path, format="PNG")
+            return output_path
+
+        with (
+            patch.object(gen, "generate_image", side_effect=fake_generate),
+            patch("oslo.library._get_library_dir", return_value=tmp_path / "no-library"),
+        ):
+            return gen.generate_all_scenes(scenes, tmp_path, **deadlines)
+
+    def test_late_scene_gets_blurred_neighbour(self, tmp_path):
+        gen = self.make()
+        paths = self.run(gen, tmp_path, ["a", "slow", "c"], scene_deadline=0.2)
+        assert gen.fallbacks == {1: ImageFallback("blur", "1", "deadline")}
+        with Image.open(paths[1]) as img:
+            assert img.size == (108, 192)
+            assert img.getpixel((50, 90)) != (255, 0, 0)
+
+    def test_failures_without_neighbours_get_gradient(self, tmp_path):
+        gen = self.make()
+        paths = self.run(gen, tmp_path, ["fail"], scene_deadline=5.0)
+        assert gen.fallbacks[0].kind == "gradient"
+        assert gen.fallbacks[0].reason == "error: provider down"
+        assert paths[0].exists()
+
+    def test_passed_run_deadline_skips_generation(self, tmp_path):
+        gen = self.make()
+        self.run(gen, tmp_path, ["a", "b"], deadline_at=time.monotonic() - 1)
+        assert {f.reason for f in gen.fallbacks.values()} == {"deadline"}
+        assert gen.fallbacks[0].kind == "gradient"
+
+    def test_library_match_preferred(self, tmp_path):
+        gen = self.make()
+        source = tmp_path / "001_a.jpg"
+        Image.new("RGB", (800, 600), "green").save(source)
+        with (
+            patch("oslo.image_gen._best_library_match", return_value="001_a"),
+            patch("oslo.library.resolve_image_path", return_value=source),
+        ):
+            self.run(gen, tmp_path, ["a", "fail"], scene_deadline=5.0)
+        assert gen.fallbacks == {1: ImageFallback("library", "001_a", "error: provider down")}
+
+    def test_deadline_frees_limiter_slot(self, tmp_path):
+        from oslo import concurrency
+        from oslo.config import ConcurrencyConfig
+
+        concurrency.reset_limiters()
+        concurrency.configure(ConcurrencyConfig(adaptive=False, ceiling=1))
+        gen = ImageGenerator(
+            openai_api_key="",
+            image_config=ImageGenConfig(),
+            video_config=VideoConfig(width=108, height=192),
+            google_api_key="test-google",
+        )
+
+        def fetch_gemini(prompt, config):
+            time.sleep(0.5 if prompt == "slow" else 0.0)
+            return _png_bytes("blue")
+
+        try:
+            with patch.object(gen, "_fetch_gemini", side_effect=fetch_gemini):
+                with pytest.raises(TimeoutError):
+                    gen._generate_by("slow", tmp_path / "a.png", 0.1, None)
+                # The abandoned request still runs, but no longer holds the only slot
+                start = time.monotonic()
+                gen.generate_image("fast", tmp_path / "b.png")
+                assert time.monotonic() - start < 0.3
+        finally:
+            concurrency.reset_limiters()
+
+    def test_without_deadline_errors_propagate(self, tmp_path):
+        with pytest.raises(RuntimeError, match="provider down"):
+            self.run(self.make(), tmp_path, ["fail"])
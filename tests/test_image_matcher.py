@@ -0,0 +1,107 @@
+"""Tests for image_matcher module."""
+
+import pytest
+
+from oslo.image_matcher import ImageMatcher, assign_library_images, char_ngrams
+from oslo.text_processor import Scene
+
+
+def _entry(tags, description=""):
+    return {"tags": list(tags), "description": description, "source": ""}
+
+
+ENTRIES = {
+    "001_kokkai": _entry(["国会議事堂", "政治", "建物"], "国会議事堂の正面外観"),
+    "002_shibuya": _entry(["渋谷", "スクランブル交差点", "夜"], "渋谷のスクランブル交差点の夜景"),
+    "003_soka": _entry(["創価学会", "宗教法人", "本部"], "創価学会本部棟の外観"),
+    "004_airport": _entry(["空港", "旅行", "インバウンド"], "仁川国際空港の出発ロビー"),
+}
+
+
+def _scene(index, narration, visual=None, library_image=None):
+    return Scene(
+        index=index,
+        narration_text=narration,
+        image_prompt="",
+        visual_text=visual,
+        library_image=library_image,
+    )
+
+
+@pytest.fixture()
+def library_dir(tmp_path):
+    lib = tmp_path / "images"
+    lib.mkdir()
+    for slug, entry in ENTRIES.items():
+        (lib / f"{slug}.png").write_bytes(b"\x89PNG\r\n\x1a\n")
+        tags = "".join(f"  - {t}\n" for t in entry["tags"])
+        (lib / f"{slug}.yml").write_text(
+            f"tags:\n{tags}description: {entry['description']}\n", encoding="utf-8"
+        )
+    return lib
+
+
+def test_char_ngrams_normalizes_and_splits_runs():
+    grams = char_ngrams("ＡＢ 国会議事堂")
+    assert grams["ab"] == 1
+    assert grams["国会"] == 1 and grams["国会議"] == 1
+    # n-grams never span whitespace or punctuation
+    assert "b国" not in grams
+    assert char_ngrams("夜")["夜"] == 1
+
+
+def test_matcher_ranks_relevant_image_first():
+    matcher = ImageMatcher(ENTRIES)
+    best = matcher.match("創価学会の本部で会見が開かれました")[0]
+    assert best.slug == "003_soka"
+    assert best.score > 0.25
+    assert all(m.score < 0.1 for m in matcher.match("まったく関係のない文章"))
+
+
+def test_matcher_empty_library():
+    assert ImageMatcher({}).match("国会") == []
+
+
+def test_assign_uses_visual_text_and_threshold(library_dir):
+    scenes = [
+        _scene(0, "法案が可決されました。", visual="国会議事堂の正面外観"),
+        _scene(1, "今日はいい天気です。"),
+    ]
+    assigned = assign_library_images(scenes, library_dir, threshold=0.25)
+    assert [(s.index, m.slug) for s, m in assigned] == [(0, "001_kokkai")]
+    assert scenes[0].library_image == "001_kokkai"
+    assert scenes[1].library_image is None
+
+
+def test_assign_logs_each_match(library_dir, caplog):
+    scenes = [_scene(0, "法案が可決されました。", visual="国会議事堂の正面外観")]
+    with caplog.at_level("INFO", logger="oslo.image_matcher"):
+        assign_library_images(scenes, library_dir, threshold=0.25)
+    assert len(caplog.records) == 1
+    assert "Scene 1: auto-matched library image 001_kokkai" in caplog.records[0].getMessage()
+
+
+def test_auto_match_off_by_default():
+    from oslo.config import LibraryConfig, load_config
+
+    assert not LibraryConfig().auto_match
+    assert not load_config(require_api_keys=False).library.auto_match
+    assert load_config(require_api_keys=False, auto_library=True).library.auto_match
+
+
+def test_assign_uses_each_image_once(library_dir):
+    scenes = [
+        _scene(0, "渋谷", visual="渋谷の交差点"),
+        _scene(1, "渋谷のスクランブル交差点の夜景", visual="渋谷のスクランブル交差点の夜景"),
+        _scene(2, "創価学会本部", library_image="003_soka"),
+        _scene(3, "創価学会本部棟の外観", visual="創価学会本部棟の外観"),
+    ]
+    assigned = assign_library_images(scenes, library_dir, threshold=0.25)
+    # The stronger match wins the image; explicit uses are never repeated
+    assert [(s.index, m.slug) for s, m in assigned] == [(1, "002_shibuya")]
+    assert scenes[0].library_image is None
+    assert scenes[3].library_image is None
+
+
+def test_assign_missing_library(tmp_path):
+    assert assign_library_images([_scene(0, "国会")], tmp_path / "none") == []
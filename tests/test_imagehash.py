@@ -0,0 +1,76 @@
+"""Tests for imagehash module."""
+
+import random
+
+import pytest
+from PIL import Image, ImageDraw
+
+from oslo.imagehash import (
+    BKTree,
+    dhash,
+    find_clusters,
+    format_hash,
+    hamming,
+    image_hash,
+    parse_hash,
+)
+
+
+def _picture(path, seed, size=(320, 240), fmt="PNG"):
+    rng = random.Random(seed)
+    img = Image.new("RGB", (320, 240), "white")
+    draw = ImageDraw.Draw(img)
+    for _ in range(12):
+        x, y = rng.randrange(300), rng.randrange(220)
+        color = tuple(rng.randrange(256) for _ in range(3))
+        draw.rectangle([x, y, x + rng.randrange(20, 120), y + rng.randrange(20, 120)], fill=color)
+    img.resize(size).save(path, fmt)
+    return path
+
+
+def test_resized_reencoded_copy_is_close(tmp_path):
+    original = dhash(_picture(tmp_path / "a.png", seed=1))
+    copy = dhash(_picture(tmp_path / "b.jpg", seed=1, size=(160, 120), fmt="JPEG"))
+    assert hamming(original, copy) <= 6
+
+
+def test_different_pictures_are_far(tmp_path):
+    a = dhash(_picture(tmp_path / "a.png", seed=1))
+    b = dhash(_picture(tmp_path / "b.png", seed=2))
+    assert hamming(a, b) > 10
+
+
+def test_image_hash_undecodable(tmp_path):
+    path = tmp_path / "broken.png"
+    path.write_bytes(b"\x89PNG\r\n\x1a\n" + b"\x00" * 10)
+    assert image_hash(path) == ""
+
+
+def test_format_parse_roundtrip():
+    assert parse_hash(format_hash(0xABC)) == 0xABC
+    assert format_hash(1) == "0000000000000001"
+    assert parse_hash("") is None
+    assert parse_hash("zz") is None
+
+
+@pytest.mark.parametrize("threshold", [0, 3, 8])
+def test_bktree_matches_linear_scan(threshold):
+    rng = random.Random(42)
+    values = [rng.getrandbits(16) for _ in range(300)]
+    tree = BKTree((v, i) for i, v in enumerate(values))
+    assert len(tree) == 300
+    for query in values[:20] + [rng.getrandbits(16) for _ in range(20)]:
+        expected = sorted(
+            (hamming(query, v), i) for i, v in enumerate(values) if hamming(query, v) <= threshold
+        )
+        assert sorted(tree.search(query, threshold)) == expected
+
+
+def test_bktree_empty():
+    assert BKTree().search(0, 5) == []
+
+
+def test_find_clusters_transitive():
+    hashes = {"a": 0b0000, "b": 0b0001, "c": 0b0011, "d": 0xFFFF}
+    assert find_clusters(hashes, threshold=1) == [["a", "b", "c"]]
+    assert find_clusters(hashes, threshold=0) == []
@@ -159,3 +159,295 @@ def test_add_image_unsupported_format(library_dir, tmp_path):
 
     with pytest.raises(ValueError, match="Unsupported image format"):
         add_image(src, library_dir=library_dir)
+
+
+def test_index_written_and_reused(library_dir, monkeypatch):
+    import oslo.library_index as library_index
+
+    list_images(library_dir)
+    assert (library_dir / ".index.json").exists()
+
+    # A fresh process state loads the JSON and re-reads no unchanged sidecars
+    monkeypatch.setattr(library_index, "_indexes", {})
+    calls = []
+    original = library_index._read_sidecar
+    monkeypatch.setattr(
+        library_index, "_read_sidecar", lambda p: calls.append(p.name) or original(p)
+    )
+    assert len(list_images(library_dir)) == 2
+    assert calls == []
+
+
+def test_index_rereads_changed_sidecar_only(library_dir, monkeypatch):
+    import os
+
+    import oslo.library_index as library_index
+
+    list_images(library_dir)
+    calls = []
+    original = library_index._read_sidecar
+    monkeypatch.setattr(
+        library_index, "_read_sidecar", lambda p: calls.append(p.name) or original(p)
+    )
+    yml = library_dir / "002_shibuya.yml"
+    yml.write_text("tags:\n  - 渋谷\n  - 雨\n", encoding="utf-8")
+    st = yml.stat()
+    os.utime(yml, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+
+    assert [img.slug for img in search_images(["雨"], library_dir)] == ["002_shibuya"]
+    assert calls == ["002_shibuya.yml"]
+
+
+def test_index_drops_removed_images(library_dir):
+    list_images(library_dir)
+    (library_dir / "002_shibuya.jpg").unlink()
+    assert [img.slug for img in list_images(library_dir)] == ["001_kokkai"]
+    with pytest.raises(FileNotFoundError):
+        resolve_image_path("002_shibuya", library_dir)
+
+
+def test_index_corrupt_file_rebuilt(library_dir, monkeypatch):
+    import oslo.library_index as library_index
+
+    (library_dir / ".index.json").write_text("{not json", encoding="utf-8")
+    monkeypatch.setattr(library_index, "_indexes", {})
+    assert len(list_images(library_dir)) == 2
+
+
+def test_resolve_prefers_extension_order(library_dir):
+    (library_dir / "001_kokkai.jpg").write_bytes(b"\xff\xd8\xff")
+    assert resolve_image_path("001_kokkai", library_dir).name == "001_kokkai.png"
+
+
+def test_next_slug_number_from_index(library_dir):
+    from oslo.library import _next_slug_number
+
+    assert _next_slug_number(library_dir) == 3
+    (library_dir / "041_new.webp").write_bytes(b"RIFF")
+    assert _next_slug_number(library_dir) == 42
+
+
+def test_query_images(library_dir):
+    from oslo.library import query_images
+
+    assert [img.slug for img in query_images("政治 OR 夜", library_dir)] == [
+        "001_kokkai",
+        "002_shibuya",
+    ]
+    assert [img.slug for img in query_images("desc:交差点", library_dir)] == ["002_shibuya"]
+    assert [img.slug for img in query_images("source:unsplash", library_dir)] == ["001_kokkai"]
+
+
+def test_query_images_with_literal_tag(library_dir):
+    from oslo.library import query_images
+
+    assert [img.slug for img in query_images("政治 OR 夜", library_dir, tags=["夜"])] == [
+        "002_shibuya"
+    ]
+    # Tags are matched literally, so a quote cannot break the query
+    assert query_images("政治", library_dir, tags=['a"b']) == []
+
+
+def test_query_images_rebuilds_after_sidecar_change(library_dir):
+    import os
+
+    from oslo.library import query_images
+
+    assert query_images("雨", library_dir) == []
+    yml = library_dir / "001_kokkai.yml"
+    yml.write_text("tags:\n  - 雨\n", encoding="utf-8")
+    st = yml.stat()
+    os.utime(yml, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    assert [img.slug for img in query_images("雨", library_dir)] == ["001_kokkai"]
+
+
+def test_query_images_syntax_error(library_dir):
+    from oslo.library import query_images
+    from oslo.library_query import QuerySyntaxError
+
+    with pytest.raises(QuerySyntaxError):
+        query_images("(政治", library_dir)
+
+
+def _save_picture(path, seed, size=(320, 240), fmt="PNG"):
+    import random
+
+    from PIL import Image, ImageDraw
+
+    rng = random.Random(seed)
+    img = Image.new("RGB", (320, 240), "white")
+    draw = ImageDraw.Draw(img)
+    for _ in range(12):
+        x, y = rng.randrange(300), rng.randrange(220)
+        color = tuple(rng.randrange(256) for _ in range(3))
+        draw.rectangle([x, y, x + rng.randrange(20, 120), y + rng.randrange(20, 120)], fill=color)
+    img.resize(size).save(path, fmt)
+    return path
+
+
+def test_add_image_stores_phash(library_dir, tmp_path):
+    meta = add_image(_save_picture(tmp_path / "photo.png", seed=1), library_dir=library_dir)
+    assert len(meta.phash) == 16
+    assert "phash:" in (library_dir / f"{meta.slug}.yml").read_text(encoding="utf-8")
+    assert load_image_meta(meta.slug, library_dir).phash == meta.phash
+
+
+def test_add_image_rejects_near_duplicate(library_dir, tmp_path):
+    from oslo.library import DuplicateImageError, find_duplicates
+
+    first = add_image(_save_picture(tmp_path / "photo.png", seed=1), library_dir=library_dir)
+    copy = _save_picture(tmp_path / "copy.jpg", seed=1, size=(160, 120), fmt="JPEG")
+
+    assert [m.slug for _, m in find_duplicates(copy, library_dir)] == [first.slug]
+    with pytest.raises(DuplicateImageError, match=first.slug):
+        add_image(copy, library_dir=library_dir)
+
+    second = add_image(copy, library_dir=library_dir, allow_duplicate=True)
+    other = add_image(_save_picture(tmp_path / "other.png", seed=2), library_dir=library_dir)
+
+    from oslo.library import find_duplicate_clusters
+
+    clusters = find_duplicate_clusters(library_dir)
+    assert [[m.slug for m in c] for c in clusters] == [[first.slug, second.slug]]
+    assert other.slug not in {m.slug for c in clusters for m in c}
+
+
+def test_index_hashes_images_without_stored_phash(library_dir, tmp_path):
+    _save_picture(library_dir / "010_legacy.png", seed=3)
+    assert len(load_image_meta("010_legacy", library_dir).phash) == 16
+    # Placeholder bytes cannot be decoded and get no hash
+    assert load_image_meta("001_kokkai", library_dir).phash == ""
+
+
+def test_add_images_bulk_numbering_and_duplicates(library_dir, tmp_path):
+    from oslo.library import add_images
+
+    src = tmp_path / "src"
+    src.mkdir()
+    for i in range(6):
+        _save_picture(src / f"photo{i}.png", seed=10 + i)
+    # Same picture as photo0, and a near-duplicate of 001 inside the batch
+    _save_picture(src / "photo0_copy.jpg", seed=10, size=(160, 120), fmt="JPEG")
+    (src / "notes.txt").write_text("not an image", encoding="utf-8")
+
+    seen = []
+    results = add_images([src], library_dir=library_dir, concurrency=4, on_result=seen.append)
+
+    assert len(results) == 7 and len(seen) == 7
+    added = [r.meta.slug for r in results if r.added]
+    assert added == [f"{n:03d}_photo{i}" for n, i in zip(range(3, 9), range(6))]
+    copy = next(r for r in results if r.source_path.name == "photo0_copy.jpg")
+    assert not copy.added and copy.duplicates == [str(src / "photo0.png")]
+
+
+def test_add_images_concurrent_analysis(library_dir, tmp_path, monkeypatch):
+    import threading
+
+    import oslo.library as library
+
+    active = []
+    peak = []
+    lock = threading.Lock()
+    barrier = threading.Barrier(3, timeout=5)
+
+    def fake_analyze(api_key, path):
+        with lock:
+            active.append(path)
+            peak.append(len(active))
+        barrier.wait()
+        with lock:
+            active.remove(path)
+        if path.name == "bad.png":
+            raise ValueError("not json")
+        return {"tags": [path.stem], "description": "d"}
+
+    monkeypatch.setattr(library, "analyze_image", fake_analyze)
+    paths = [_save_picture(tmp_path / f"p{i}.png", seed=20 + i) for i in range(2)]
+    paths.append(_save_picture(tmp_path / "bad.png", seed=30))
+
+    results = library.add_images(paths, api_key="k", library_dir=library_dir, concurrency=3)
+
+    assert max(peak) == 3
+    assert [r.meta.tags for r in results] == [("p0",), ("p1",), ()]
+    assert results[2].added and "analysis failed" in results[2].error
+
+
+def test_add_images_slug_requires_single_image(library_dir, tmp_path):
+    from oslo.library import add_images
+
+    paths = [_save_picture(tmp_path / f"p{i}.png", seed=40 + i) for i in range(2)]
+    with pytest.raises(ValueError, match="single image"):
+        add_images(paths, slug="custom", library_dir=library_dir)
+
+
+def test_add_image_slug_numbering_under_threads(library_dir, tmp_path):
+    from concurrent.futures import ThreadPoolExecutor
+
+    paths = [tmp_path / f"f{i}.png" for i in range(12)]
+    for path in paths:
+        path.write_bytes(b"\x89PNG\r\n\x1a\n" + path.name.encode())
+    with ThreadPoolExecutor(max_workers=6) as pool:
+        metas = list(pool.map(lambda p: add_image(p, library_dir=library_dir), paths))
+    numbers = sorted(int(m.slug[:3]) for m in metas)
+    assert numbers == list(range(3, 15))
+    assert not list(library_dir.glob(".*.tmp"))
+
+
+def test_encode_for_analysis_downscales(tmp_path):
+    from PIL import Image
+
+    from oslo.library import encode_for_analysis
+
+    big = tmp_path / "big.png"
+    Image.new("RGB", (3000, 1500), "red").save(big)
+    data, media_type = encode_for_analysis(big, max_size=1024)
+    assert media_type == "image/jpeg"
+    import io
+
+    assert Image.open(io.BytesIO(data)).size == (1024, 512)
+
+    small = _save_picture(tmp_path / "small.png", seed=1, size=(200, 100))
+    assert encode_for_analysis(small) == (small.read_bytes(), "image/png")
+
+
+def test_prompt_tags():
+    from oslo.library import prompt_tags
+
+    assert prompt_tags("国会議事堂の外観、晴れた青空の下") == ("国会議事堂", "外観", "青空")
+    assert prompt_tags("ソウルのオフィス街") == ("ソウル", "オフィス")
+    assert prompt_tags("Cinematic vertical composition. Tokyo skyline at dusk") == (
+        "tokyo", "skyline", "dusk",
+    )
+    words = "Alpha Bravo Charlie Delta Foxtrot Hotel India Juliet Kilo Lima Mike November Oscar"
+    assert len(prompt_tags(words)) == 12
+
+
+def test_promote_generated_image(library_dir, tmp_path):
+    import yaml
+
+    from oslo.library import GENERATED_TAG, promote_generated_image, query_images
+
+    image = _save_picture(tmp_path / "scene_000.png", seed=50)
+    meta = promote_generated_image(
+        image,
+        prompt="Cinematic. 夕暮れの東京スカイツリー Do not include any text.",
+        subject="夕暮れの東京スカイツリー",
+        provider="gemini",
+        model="gemini-3-pro-image-preview",
+        conte="003_religion-tax.md",
+        name="gen-003_religion-tax-s1",
+        library_dir=library_dir,
+    )
+    assert meta.slug == "003_gen-003-religion-tax-s1"
+    assert meta.tags == (GENERATED_TAG, "夕暮", "東京", "スカイツリー")
+    assert meta.source == "generated:gemini/gemini-3-pro-image-preview"
+
+    sidecar = yaml.safe_load((library_dir / f"{meta.slug}.yml").read_text(encoding="utf-8"))
+    assert sidecar["provenance"]["prompt"].startswith("Cinematic.")
+    assert sidecar["provenance"]["conte"] == "003_religion-tax.md"
+    assert [m.slug for m in query_images("スカイツリー", library_dir)] == [meta.slug]
+
+    # The same picture again is not stored twice
+    assert promote_generated_image(
+        image, prompt="p", subject="s", provider="gemini", model="m", library_dir=library_dir
+    ) is None
@@ -0,0 +1,74 @@
+"""Tests for library_derivatives module."""
+
+import os
+
+from PIL import Image
+
+import oslo.library_derivatives as derivatives
+from oslo.library_derivatives import (
+    DERIVATIVES_DIR_NAME,
+    cover_size,
+    get_derivative,
+    render_cover,
+)
+
+
+def _image(path, size=(400, 300), color="red", fmt=None):
+    Image.new("RGB", size, color).save(path, fmt)
+    return path
+
+
+def test_cover_size():
+    assert cover_size((400, 300), (108, 192)) == (256, 192)
+    assert cover_size((300, 900), (108, 192)) == (108, 324)
+
+
+def test_render_cover_exact_size(tmp_path):
+    out = render_cover(_image(tmp_path / "a.png"), tmp_path / "out.png", 108, 192)
+    with Image.open(out) as img:
+        assert img.size == (108, 192)
+
+
+def test_render_cover_large_jpeg_uses_draft(tmp_path):
+    source = _image(tmp_path / "big.jpg", size=(4000, 3000), fmt="JPEG")
+    out = render_cover(source, tmp_path / "out.png", 108, 192)
+    with Image.open(out) as img:
+        assert img.size == (108, 192)
+        assert img.getpixel((54, 96))[0] > 200
+
+
+def test_get_derivative_cached(tmp_path, monkeypatch):
+    source = _image(tmp_path / "001_a.png")
+    calls = []
+    original = derivatives.render_cover
+    monkeypatch.setattr(
+        derivatives, "render_cover", lambda *a: calls.append(a) or original(*a)
+    )
+
+    first = get_derivative(source, 108, 192)
+    second = get_derivative(source, 108, 192)
+    assert first == second
+    assert first.parent == tmp_path / DERIVATIVES_DIR_NAME
+    assert len(calls) == 1
+
+    get_derivative(source, 54, 96)
+    assert len(calls) == 2
+
+
+def test_get_derivative_invalidated_by_source_change(tmp_path):
+    source = _image(tmp_path / "001_a.png")
+    other = _image(tmp_path / "001_a-b.png")
+    old = get_derivative(source, 108, 192)
+    other_derivative = get_derivative(other, 108, 192)
+
+    _image(source, color="blue")
+    st = source.stat()
+    os.utime(source, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    new = get_derivative(source, 108, 192)
+
+    assert new != old
+    assert not old.exists()
+    # A slug sharing the prefix keeps its derivative
+    assert other_derivative.exists()
+    with Image.open(new) as img:
+        assert img.getpixel((0, 0))[2] > 200
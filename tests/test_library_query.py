@@ -0,0 +1,119 @@
+"""Tests for library_query module."""
+
+import pytest
+
+from oslo.library_query import (
+    And,
+    Not,
+    Or,
+    QuerySyntaxError,
+    TagIndex,
+    Term,
+    description_tokens,
+    normalize,
+    parse_query,
+)
+
+
+def _entry(tags=(), description="", source=""):
+    return {"tags": list(tags), "description": description, "source": source}
+
+
+@pytest.fixture()
+def index():
+    return TagIndex(
+        {
+            "001_kokkai": _entry(
+                ["政治", "国会議事堂", "建物"], "国会議事堂の正面外観", "Unsplash"
+            ),
+            "002_shibuya": _entry(["渋谷", "街", "夜"], "渋谷のスクランブル交差点"),
+            "003_abe": _entry(["安倍晋三", "政治", "記者会見"], "Press conference at Kantei"),
+            "004_abe_night": _entry(["安倍晋三", "夜"], "官邸前の夜景", "官邸HP"),
+        }
+    )
+
+
+def _run(query, index):
+    return sorted(parse_query(query).evaluate(index))
+
+
+def test_normalize_width_and_case():
+    assert normalize("ＴＯＫＹＯ ") == "tokyo"
+
+
+def test_description_tokens_bigrams_and_words():
+    assert description_tokens("渋谷の交差点 at night") == [
+        "渋谷", "谷の", "の交", "交差", "差点", "at", "night",
+    ]
+
+
+def test_description_tokens_mixed_script():
+    # A Latin-led run stops at CJK text, which is bigrammed
+    assert description_tokens(normalize("AI技術の発展")) == ["ai", "技術", "術の", "の発", "発展"]
+    assert description_tokens(normalize("（E号券）")) == ["e", "号券"]
+
+
+def test_mixed_script_description_search():
+    index = TagIndex({"005_ai": _entry(description="AI技術の発展と東京タワー")})
+    assert _run("desc:技術", index) == ["005_ai"]
+    assert _run("desc:発展", index) == ["005_ai"]
+    assert _run("desc:ai", index) == ["005_ai"]
+
+
+def test_parse_precedence():
+    node = parse_query("a b OR NOT c")
+    assert node == Or((And((Term(None, "a"), Term(None, "b"))), Not(Term(None, "c"))))
+
+
+def test_parse_fields_prefix_and_quotes():
+    assert parse_query('tag:"記者 会見"*') == Term("tag", "記者 会見", prefix=True)
+    assert parse_query("Source:Unsplash") == Term("source", "unsplash")
+    # Unknown field names are part of the term
+    assert parse_query("12:30") == Term(None, "12:30")
+
+
+@pytest.mark.parametrize("query", ["", "(a", "a OR", ")", "tag:", "a AND"])
+def test_parse_errors(query):
+    with pytest.raises(QuerySyntaxError):
+        parse_query(query)
+
+
+def test_implicit_and(index):
+    assert _run("政治 安倍晋三", index) == ["003_abe"]
+
+
+def test_or_and_grouping(index):
+    assert _run("(渋谷 OR 国会議事堂) -夜", index) == ["001_kokkai"]
+
+
+def test_not(index):
+    assert _run("NOT 政治", index) == ["002_shibuya", "004_abe_night"]
+    assert _run("安倍晋三 -夜", index) == ["003_abe"]
+
+
+def test_prefix(index):
+    assert _run("tag:安倍*", index) == ["003_abe", "004_abe_night"]
+    assert _run("slug:00*", index) == ["001_kokkai", "002_shibuya", "003_abe", "004_abe_night"]
+
+
+def test_description_substring(index):
+    assert _run("desc:交差点", index) == ["002_shibuya"]
+    # Both bigrams occur, but not adjacently
+    assert _run("desc:正観", index) == []
+    assert _run("desc:conf*", index) == ["003_abe"]
+    assert _run("desc:夜", index) == ["004_abe_night"]
+
+
+def test_bare_term_matches_tag_or_description(index):
+    assert _run("夜景", index) == ["004_abe_night"]
+    assert _run("夜", index) == ["002_shibuya", "004_abe_night"]
+
+
+def test_source_field(index):
+    assert _run("source:unsplash", index) == ["001_kokkai"]
+    assert _run("source:官邸*", index) == ["004_abe_night"]
+
+
+def test_match_tags_normalized(index):
+    assert index.match_tags(["政治"]) == {"001_kokkai", "003_abe"}
+    assert index.match_tags([]) == index.slugs
@@ -204,6 +204,11 @@ class TestListProfiles:
         (tmp_path / "aaa.yml").write_text("name: aaa\n")
         assert list_profiles(profiles_dir=tmp_path) == ["aaa", "zzz"]
 
+    def test_skips_readings_files(self, tmp_path):
+        (tmp_path / "alpha.yml").write_text("name: alpha\n")
+        (tmp_path / "alpha.readings.yml").write_text("人名: {}\n")
+        assert list_profiles(profiles_dir=tmp_path) == ["alpha"]
+
     def test_nonexistent_directory(self, tmp_path):
         assert list_profiles(profiles_dir=tmp_path / "nonexistent") == []
 
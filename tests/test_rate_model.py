@@ -0,0 +1,104 @@
+"""Tests for rate_model module."""
+
+from oslo.config import TTSConfig
+from oslo.rate_model import (
+    DurationSample,
+    DurationStore,
+    RateModel,
+    fit_units_per_minute,
+    make_sample,
+)
+from oslo.text_processor import DEFAULT_CPM, DEFAULT_WPM, estimate_duration
+
+
+def _sample(units, duration, voice="nova", speed=1.0, cjk=True):
+    return DurationSample(
+        model="gpt-4o-mini-tts", voice=voice, speed=speed, cjk=cjk,
+        units=units, chars=units, duration=duration,
+    )
+
+
+class TestMakeSample:
+    def test_japanese_counts_chars(self):
+        sample = make_sample("これは テストです。", 2.0, TTSConfig(voice="coral", speed=1.1))
+        assert sample.cjk
+        assert sample.units == 9
+        assert sample.voice == "coral"
+        assert sample.speed == 1.1
+
+    def test_english_counts_words(self):
+        sample = make_sample("Hello there world", 1.5, TTSConfig())
+        assert not sample.cjk
+        assert sample.units == 3
+
+
+class TestFitUnitsPerMinute:
+    def test_too_few_samples(self):
+        assert fit_units_per_minute([_sample(100, 15.0)]) is None
+
+    def test_fits_rate(self):
+        samples = [_sample(100, 15.0), _sample(200, 30.0), _sample(40, 6.0)]
+        assert fit_units_per_minute(samples) == 400.0
+
+    def test_normalizes_by_speed(self):
+        samples = [_sample(100, 10.0, speed=1.5)] * 3
+        assert fit_units_per_minute(samples) == 400.0
+
+    def test_ignores_very_short_clips(self):
+        samples = [_sample(100, 15.0)] * 3 + [_sample(5, 0.2)]
+        assert fit_units_per_minute(samples) == 400.0
+
+
+class TestRateModel:
+    def test_defaults_without_samples(self):
+        rate = RateModel([]).rate_for(TTSConfig())
+        assert rate.cpm == DEFAULT_CPM
+        assert rate.wpm == DEFAULT_WPM
+
+    def test_default_scaled_by_speed(self):
+        rate = RateModel([]).rate_for(TTSConfig(speed=2.0))
+        assert rate.cpm == DEFAULT_CPM * 2
+
+    def test_per_voice(self):
+        samples = [_sample(100, 15.0, voice="nova")] * 3 + [
+            _sample(100, 20.0, voice="onyx")
+        ] * 3
+        model = RateModel(samples)
+        assert model.rate_for(TTSConfig(voice="nova")).cpm == 400.0
+        assert model.rate_for(TTSConfig(voice="onyx")).cpm == 300.0
+        assert model.rate_for(TTSConfig(voice="nova")).wpm == DEFAULT_WPM
+
+    def test_prediction_uses_rate(self):
+        model = RateModel([_sample(100, 15.0)] * 3)
+        rate = model.rate_for(TTSConfig(speed=1.0))
+        assert estimate_duration("あ" * 400, rate) == 60.0
+
+
+class TestDurationStore:
+    def test_roundtrip(self, tmp_path):
+        store = DurationStore(tmp_path / "d.jsonl")
+        store.append([_sample(100, 15.0), _sample(50, 8.0, cjk=False)])
+        store.append([_sample(10, 2.0)])
+        loaded = store.load()
+        assert [s.units for s in loaded] == [100, 50, 10]
+        assert loaded[1].cjk is False
+
+    def test_missing_file(self, tmp_path):
+        assert DurationStore(tmp_path / "none.jsonl").load() == []
+
+    def test_skips_corrupt_lines(self, tmp_path):
+        path = tmp_path / "d.jsonl"
+        path.write_text("not json\n{\"bad\": 1}\n", encoding="utf-8")
+        DurationStore(path).append([_sample(100, 15.0)])
+        assert len(DurationStore(path).load()) == 1
+
+    def test_compacted_to_newest_per_voice(self, tmp_path, monkeypatch):
+        monkeypatch.setattr("oslo.rate_model.MAX_SAMPLES", 3)
+        store = DurationStore(tmp_path / "d.jsonl")
+        store.append([_sample(units, 10.0) for units in range(1, 6)])
+        store.append([_sample(7, 10.0, voice="alloy")])
+        loaded = store.load()
+        assert [(s.voice, s.units) for s in loaded] == [
+            ("nova", 3), ("nova", 4), ("nova", 5), ("alloy", 7),
+        ]
+        assert len(store.path.read_text(encoding="utf-8").splitlines()) == 4
@@ -1,6 +1,12 @@
 """Tests for readings module."""
 
-from oslo.readings import apply_readings, load_readings
+from oslo.readings import (
+    ReadingsMatcher,
+    apply_readings,
+    find_readings_files,
+    load_layered_readings,
+    load_readings,
+)
 
 
 class TestLoadReadings:
@@ -44,3 +50,69 @@ class TestApplyReadings:
     def test_empty_readings(self):
         result = apply_readings("安野貴博氏が", {})
         assert result == "安野貴博氏が"
+
+    def test_longest_match_wins_over_prefix(self):
+        readings = {"安野": "あんの", "安野貴博": "あんのたかひろ"}
+        result = apply_readings("安野貴博氏と安野氏", readings)
+        assert result == "あんのたかひろ氏とあんの氏"
+
+    def test_replacement_output_not_rescanned(self):
+        readings = {"東京": "とうきょう", "とう": "X"}
+        assert apply_readings("東京都", readings) == "とうきょう都"
+
+    def test_match_at_end_of_text(self):
+        assert apply_readings("氏は安野", {"安野": "あんの"}) == "氏はあんの"
+
+
+class TestReadingsMatcher:
+    def test_len(self):
+        matcher = ReadingsMatcher({"安野": "あんの", "": "ignored"})
+        assert len(matcher) == 1
+
+    def test_partial_prefix_without_terminal(self):
+        matcher = ReadingsMatcher({"安野貴博": "あんのたかひろ"})
+        assert matcher.apply("安野貴氏") == "安野貴氏"
+
+
+class TestLoadLayeredReadings:
+    def test_later_file_overrides(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("OSLO_CACHE_DIR", str(tmp_path / "cache"))
+        repo = tmp_path / "readings.yml"
+        repo.write_text("人名:\n  安野: あんの\n  田中: たなか\n", encoding="utf-8")
+        prof = tmp_path / "p.readings.yml"
+        prof.write_text("人名:\n  田中: でんちゅう\n", encoding="utf-8")
+
+        matcher = load_layered_readings([repo, prof])
+        assert matcher.apply("安野と田中") == "あんのとでんちゅう"
+
+    def test_missing_files_give_empty_matcher(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("OSLO_CACHE_DIR", str(tmp_path / "cache"))
+        matcher = load_layered_readings([tmp_path / "none.yml"])
+        assert len(matcher) == 0
+
+    def test_cache_invalidated_by_file_change(self, tmp_path, monkeypatch):
+        import os
+
+        monkeypatch.setenv("OSLO_CACHE_DIR", str(tmp_path / "cache"))
+        path = tmp_path / "readings.yml"
+        path.write_text("人名:\n  安野: あんの\n", encoding="utf-8")
+        assert load_layered_readings([path]).apply("安野") == "あんの"
+        assert list((tmp_path / "cache" / "readings").glob("*.pickle"))
+
+        path.write_text("人名:\n  安野: やすの\n", encoding="utf-8")
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+        assert load_layered_readings([path]).apply("安野") == "やすの"
+
+
+class TestFindReadingsFiles:
+    def test_input_dir_then_profile(self, tmp_path, monkeypatch):
+        import oslo.profile
+
+        monkeypatch.setattr(oslo.profile, "_get_profiles_dir", lambda: tmp_path / "profiles")
+        (tmp_path / "readings.yml").write_text("", encoding="utf-8")
+        paths = find_readings_files(tmp_path / "input.md", "tiktok-politics")
+        assert paths == [
+            tmp_path / "readings.yml",
+            tmp_path / "profiles" / "tiktok-politics.readings.yml",
+        ]
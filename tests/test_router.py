@@ -0,0 +1,126 @@
+import json
+from io import BytesIO
+from unittest.mock import patch
+
+import pytest
+from PIL import Image
+
+from oslo.config import ImageGenConfig, RouterConfig, VideoConfig
+from oslo.image_gen import ImageGenerator
+from oslo.router import (
+    ERROR_HALF_LIFE,
+    ImageRouter,
+    ProviderStats,
+    RouteStatsStore,
+    route_key,
+)
+
+GEMINI = ImageGenConfig()
+OPENAI = ImageGenConfig(provider="openai", model="gpt-image-1", quality="low")
+
+
+@pytest.fixture
+def store(tmp_path):
+    return RouteStatsStore(tmp_path / "stats.json")
+
+
+def _router(store, **config):
+    return ImageRouter(RouterConfig(enabled=True, **config), [GEMINI, OPENAI], store=store)
+
+
+def _seed(store, gemini_latency, openai_latency):
+    store.update(
+        {
+            route_key(GEMINI): ProviderStats(latency=gemini_latency, error_rate=0.0),
+            route_key(OPENAI): ProviderStats(latency=openai_latency, error_rate=0.0),
+        }
+    )
+
+
+class TestRanking:
+    def test_fastest(self, store):
+        _seed(store, gemini_latency=40.0, openai_latency=12.0)
+        assert [c.provider for c, _ in _router(store).rank()] == ["openai", "gemini"]
+
+    def test_cheapest(self, store):
+        # OpenAI low quality ($0.016) undercuts Gemini Pro ($0.134)
+        ranked = _router(store, objective="cheapest").rank()
+        assert ranked[0] == (OPENAI, "cheapest")
+
+    def test_deadline_prefers_cheapest_that_fits(self, store):
+        _seed(store, gemini_latency=10.0, openai_latency=25.0)
+        ranked = _router(store, objective="deadline", deadline=15.0).rank()
+        assert ranked == [(GEMINI, "within deadline"), (OPENAI, "fastest")]
+        ranked = _router(store, objective="deadline", deadline=30.0).rank()
+        assert ranked[0] == (OPENAI, "within deadline")
+
+    def test_degraded_provider_goes_last_and_recovers(self, store):
+        router = _router(store)
+        for _ in range(3):
+            router.observe(OPENAI, 0.0, error=True)
+        router.observe(GEMINI, 40.0, error=False)
+        assert router.rank()[-1] == (OPENAI, "degraded")
+
+        later = router.stats_for(OPENAI).updated + 3 * ERROR_HALF_LIFE
+        with patch("oslo.router.time.time", return_value=later):
+            assert (OPENAI, "fastest") in router.rank()
+
+
+class TestStats:
+    def test_ewma_and_persistence(self, store):
+        router = _router(store)
+        router.observe(GEMINI, 10.0, error=False)
+        stats = router.stats_for(GEMINI)
+        assert stats.latency == pytest.approx(0.7 * 20.0 + 0.3 * 10.0)
+        assert stats.calls == 1
+        router.decide(GEMINI, "fastest")
+        router.save()
+        router.save()
+
+        reloaded = _router(store)
+        assert reloaded.stats_for(GEMINI) == stats
+        log = store.path.with_name("image_routes.jsonl").read_text().splitlines()
+        assert len(log) == 1
+        assert json.loads(log[0])["key"] == "gemini/gemini-3-pro-image-preview"
+
+    def test_errors_do_not_move_latency(self, store):
+        router = _router(store)
+        before = router.stats_for(OPENAI).latency
+        router.observe(OPENAI, 300.0, error=True)
+        assert router.stats_for(OPENAI).latency == before
+        assert router.stats_for(OPENAI).error_rate == pytest.approx(0.3)
+
+    def test_newer_stats_win_on_merge(self, store):
+        store.update({"k": ProviderStats(latency=1.0, error_rate=0.0, updated=200.0)})
+        store.update({"k": ProviderStats(latency=9.0, error_rate=0.0, updated=100.0)})
+        assert store.load()["k"].latency == 1.0
+
+
+def test_generator_falls_back_and_records_source(tmp_path, monkeypatch):
+    monkeypatch.setenv("OSLO_CACHE_DIR", str(tmp_path / "cache"))
+    gen = ImageGenerator(
+        openai_api_key="test-openai",
+        image_config=ImageGenConfig(routing=RouterConfig(enabled=True)),
+        video_config=VideoConfig(width=108, height=192),
+        google_api_key="test-google",
+    )
+    buf = BytesIO()
+    Image.new("RGB", (64, 96), "red").save(buf, format="PNG")
+
+    def fetch(prompt, config):
+        if config.provider == "gemini":
+            gen.router.observe(config, 1.0, error=True)
+            raise RuntimeError("gemini down")
+        return buf.getvalue()
+
+    output = tmp_path / "out.png"
+    with patch.object(gen, "_fetch", side_effect=fetch):
+        gen.generate_image("prompt", output)
+
+    assert gen.sources[output].provider == "openai"
+    assert gen.routes[output].fallback == 1
+    assert [d.key for d in gen.router.decisions] == [
+        "gemini/gemini-3-pro-image-preview",
+        "openai/gpt-image-1",
+    ]
+    assert gen.router.stats_for(ImageGenConfig()).error_rate > 0
@@ -0,0 +1,73 @@
+"""Tests for series module."""
+
+import warnings
+
+from oslo.conte import parse_conte, parse_conte_title
+from oslo.series import iter_paragraphs, iter_parts, write_series
+from oslo.text_processor import estimate_duration
+
+_JA = "人工知能の急速な発展により、私たちの働き方は大きく変わろうとしています。"
+
+
+class TestIterParagraphs:
+    def test_splits_on_blank_lines(self):
+        lines = ["one\n", "two\n", "\n", "  \n", "three\n"]
+        assert list(iter_paragraphs(lines)) == ["one\ntwo", "three"]
+
+    def test_long_paragraph_flushed(self, monkeypatch):
+        import oslo.series
+
+        monkeypatch.setattr(oslo.series, "MAX_PARAGRAPH_CHARS", 10)
+        lines = ["abcdef\n"] * 4
+        assert list(iter_paragraphs(lines)) == ["abcdef\nabcdef", "abcdef\nabcdef"]
+
+
+class TestIterParts:
+    def test_parts_fit_duration(self):
+        paragraphs = [_JA * 3] * 20
+        parts = list(iter_parts(paragraphs, max_duration=30.0))
+        assert len(parts) > 1
+        for part in parts:
+            assert estimate_duration(part) <= 30.0
+
+    def test_keeps_all_text(self):
+        paragraphs = [_JA * 3] * 20
+        parts = list(iter_parts(paragraphs, max_duration=30.0))
+        assert sum(p.count(_JA) for p in parts) == 60
+
+    def test_long_paragraph_split_at_sentences(self):
+        paragraph = _JA * 40  # ~2000 chars, far over 30s
+        parts = list(iter_parts([paragraph], max_duration=30.0))
+        assert len(parts) > 1
+        assert all(p.endswith("。") for p in parts)
+
+    def test_long_sentence_hard_split(self):
+        sentence = "word " * 500
+        parts = list(iter_parts([sentence], max_duration=30.0))
+        assert [len(p.split()) for p in parts] == [75] * 6 + [50]
+
+    def test_is_lazy(self):
+        def paragraphs():
+            yield _JA * 10
+            yield _JA * 10
+            raise AssertionError("read too far")
+
+        parts = iter_parts(paragraphs(), max_duration=30.0)
+        assert next(parts)
+
+
+class TestWriteSeries:
+    def test_writes_parseable_contes(self, tmp_path):
+        source = tmp_path / "article.txt"
+        source.write_text(("\n\n".join([_JA * 3] * 30)) + "\n", encoding="utf-8")
+
+        paths = list(write_series(source, tmp_path / "out", max_duration=30.0))
+        assert [p.name for p in paths[:2]] == ["part_01.md", "part_02.md"]
+
+        text = paths[0].read_text(encoding="utf-8")
+        assert parse_conte_title(text) == "article (1)"
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            scenes = parse_conte(text)
+        assert scenes
+        assert all("\n" not in s.narration_text for s in scenes)
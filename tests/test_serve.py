@@ -0,0 +1,210 @@
+import os
+import threading
+import time
+from pathlib import Path
+
+import httpx
+import pytest
+
+from oslo.serve import RenderDaemon, make_server
+
+
+def fake_render(input_path, output_path, profile, options):
+    text = Path(input_path).read_text(encoding="utf-8")
+    if text.startswith("boom"):
+        raise RuntimeError("render failed")
+    if text.startswith("crash"):
+        os._exit(1)
+    if text.startswith("slow"):
+        time.sleep(0.5)
+    Path(output_path).write_bytes(f"mp4:{text}:{profile}".encode())
+    return os.getpid()
+
+
+def _wait(daemon, job_id, timeout=30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = daemon.get(job_id)
+        if job.status in ("done", "failed", "cancelled"):
+            return job
+        time.sleep(0.02)
+    raise AssertionError(f"job {job_id} still {job.status}")
+
+
+@pytest.fixture(scope="module")
+def daemon(tmp_path_factory):
+    d = RenderDaemon(tmp_path_factory.mktemp("serve"), workers=1, render=fake_render)
+    d.start()
+    yield d
+    d.shutdown()
+
+
+class TestDaemon:
+    def test_renders_text_job(self, daemon):
+        job = daemon.submit({"text": "hello", "filename": "clip.md", "profile": "p"})
+        job = _wait(daemon, job.id)
+        assert job.status == "done"
+        assert job.output_path.name == "clip.mp4"
+        assert job.output_path.read_bytes() == b"mp4:hello:p"
+        assert job.worker != os.getpid()
+
+    def test_workers_stay_warm(self, daemon):
+        first = _wait(daemon, daemon.submit({"text": "a"}).id)
+        second = _wait(daemon, daemon.submit({"text": "b"}).id)
+        assert first.worker == second.worker
+
+    def test_priority_order(self, daemon):
+        blocker = daemon.submit({"text": "slow"})
+        low = daemon.submit({"text": "low", "priority": 0})
+        high = daemon.submit({"text": "high", "priority": 5})
+        for job in (blocker, low, high):
+            _wait(daemon, job.id)
+        assert high.started < low.started
+
+    def test_failure_reported(self, daemon):
+        job = _wait(daemon, daemon.submit({"text": "boom"}).id)
+        assert job.status == "failed"
+        assert "render failed" in job.error
+
+    def test_cancel_queued(self, daemon):
+        blocker = daemon.submit({"text": "slow"})
+        queued = daemon.submit({"text": "later"})
+        assert daemon.cancel(queued.id)
+        _wait(daemon, blocker.id)
+        assert daemon.get(queued.id).status == "cancelled"
+        assert not daemon.cancel(blocker.id)
+
+    @pytest.mark.parametrize(
+        "spec",
+        [
+            {},
+            {"text": "x", "options": {"bogus": 1}},
+            {"text": "x", "priority": "high"},
+            {"text": "x", "filename": ".."},
+            {"text": "x", "filename": "a/.."},
+        ],
+    )
+    def test_invalid_specs(self, daemon, spec):
+        with pytest.raises(ValueError):
+            daemon.submit(spec)
+
+    def test_input_paths_disabled_without_root(self, daemon, tmp_path):
+        conte = tmp_path / "a.md"
+        conte.write_text("hello", encoding="utf-8")
+        with pytest.raises(ValueError, match="disabled"):
+            daemon.submit({"input": str(conte)})
+
+    def test_failed_job_dir_removed(self, daemon):
+        job = _wait(daemon, daemon.submit({"text": "boom"}).id)
+        assert job.status == "failed"
+        assert not job.output_path.parent.exists()
+
+    def test_cancelled_job_dir_removed(self, daemon):
+        blocker = daemon.submit({"text": "slow"})
+        queued = daemon.submit({"text": "later"})
+        assert daemon.cancel(queued.id)
+        assert not queued.output_path.parent.exists()
+        _wait(daemon, blocker.id)
+
+
+class TestInputRoot:
+    def test_inside_root(self, tmp_path):
+        root = tmp_path / "contes"
+        root.mkdir()
+        (root / "a.md").write_text("hello", encoding="utf-8")
+        daemon = RenderDaemon(tmp_path / "state", input_root=root)
+        assert daemon.submit({"input": "a.md"}).input_path == (root / "a.md").resolve()
+        assert daemon.submit({"input": str(root / "a.md")}).input_path.name == "a.md"
+
+    @pytest.mark.parametrize("value", ["../secret.md", "/etc/passwd", "sub/../../secret.md"])
+    def test_outside_root_refused(self, tmp_path, value):
+        root = tmp_path / "contes"
+        root.mkdir()
+        (tmp_path / "secret.md").write_text("x", encoding="utf-8")
+        daemon = RenderDaemon(tmp_path / "state", input_root=root)
+        with pytest.raises(ValueError, match="must be under"):
+            daemon.submit({"input": value})
+
+    def test_input_path_must_exist(self, tmp_path):
+        daemon = RenderDaemon(tmp_path / "state", input_root=tmp_path)
+        with pytest.raises(ValueError, match="not found"):
+            daemon.submit({"input": "missing.md"})
+
+
+def test_expired_jobs_purged(tmp_path):
+    daemon = RenderDaemon(tmp_path, workers=1, render=fake_render, retention=0.0)
+    daemon.start()
+    try:
+        first = _wait(daemon, daemon.submit({"text": "first"}).id)
+        assert first.output_path.exists()
+        second = daemon.submit({"text": "second"})
+        assert daemon.get(first.id) is None
+        assert not first.output_path.parent.exists()
+        assert _wait(daemon, second.id).status == "done"
+    finally:
+        daemon.shutdown()
+
+
+def test_crashed_worker_fails_only_its_job(tmp_path):
+    daemon = RenderDaemon(tmp_path, workers=2, render=fake_render)
+    daemon.start()
+    try:
+        healthy = daemon.submit({"text": "slow"})
+        time.sleep(0.1)
+        crashed = _wait(daemon, daemon.submit({"text": "crash"}).id)
+        assert crashed.status == "failed"
+        assert crashed.error == "worker process died"
+        assert _wait(daemon, healthy.id).status == "done"
+        # The dead worker was replaced
+        jobs = [daemon.submit({"text": f"after {i}"}) for i in range(2)]
+        assert [_wait(daemon, job.id).status for job in jobs] == ["done", "done"]
+    finally:
+        daemon.shutdown()
+
+
+def _serve(server):
+    thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05})
+    thread.start()
+    return thread
+
+
+def test_http_api(daemon):
+    server = make_server(daemon, port=0)
+    thread = _serve(server)
+    try:
+        client = httpx.Client(base_url=f"http://127.0.0.1:{server.server_address[1]}")
+        resp = client.post("/jobs", json={"text": "via http"})
+        assert resp.status_code == 201
+        job_id = resp.json()["id"]
+        _wait(daemon, job_id)
+        assert client.get(f"/jobs/{job_id}").json()["status"] == "done"
+        assert client.get(f"/jobs/{job_id}/video").content == b"mp4:via http:None"
+        assert any(j["id"] == job_id for j in client.get("/jobs").json())
+        assert client.get("/jobs/000000000000").status_code == 404
+        assert client.post("/jobs", json={"nope": 1}).status_code == 400
+        assert client.get("/health").json()["workers"] == 1
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join()
+
+
+def test_unix_socket_api(daemon, tmp_path):
+    socket_path = tmp_path / "oslo.sock"
+    server = make_server(daemon, socket_path=socket_path)
+    thread = _serve(server)
+    try:
+        client = httpx.Client(
+            transport=httpx.HTTPTransport(uds=str(socket_path)), base_url="http://oslo"
+        )
+        blocker = daemon.submit({"text": "slow"})
+        resp = client.post("/jobs", json={"text": "queued"})
+        job_id = resp.json()["id"]
+        assert client.get(f"/jobs/{job_id}/video").status_code == 409
+        _wait(daemon, blocker.id)
+        _wait(daemon, job_id)
+        assert client.get(f"/jobs/{job_id}/video").status_code == 200
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join()
@@ -0,0 +1,83 @@
+"""Tests for silence module."""
+
+import numpy as np
+import pytest
+
+from oslo.silence import Silence, detect_silences, find_scene_cuts, to_mono_float
+
+SAMPLE_RATE = 8000
+
+
+def _tone(ms: int) -> np.ndarray:
+    t = np.arange(SAMPLE_RATE * ms // 1000) / SAMPLE_RATE
+    return (0.5 * np.sin(2 * np.pi * 440 * t)).astype(np.float32)
+
+
+def _silence(ms: int) -> np.ndarray:
+    return np.zeros(SAMPLE_RATE * ms // 1000, dtype=np.float32)
+
+
+class TestToMonoFloat:
+    def test_stereo_is_averaged(self):
+        samples = np.array([16384, -16384, 16384, 16384], dtype=np.int16)
+        result = to_mono_float(samples, channels=2, sample_width=2)
+        assert result.tolist() == [0.0, 0.5]
+
+    def test_mono_is_scaled(self):
+        samples = np.array([-32768, 0], dtype=np.int16)
+        result = to_mono_float(samples, channels=1, sample_width=2)
+        assert result.tolist() == [-1.0, 0.0]
+
+
+class TestDetectSilences:
+    def test_finds_pause_between_speech(self):
+        audio = np.concatenate([_tone(500), _silence(1000), _tone(500)])
+        silences = detect_silences(audio, SAMPLE_RATE)
+        assert len(silences) == 1
+        assert silences[0].start_ms == pytest.approx(500, abs=20)
+        assert silences[0].end_ms == pytest.approx(1500, abs=20)
+
+    def test_ignores_short_pauses(self):
+        audio = np.concatenate([_tone(500), _silence(200), _tone(500)])
+        assert detect_silences(audio, SAMPLE_RATE) == []
+
+    def test_ignores_leading_and_trailing_silence(self):
+        audio = np.concatenate([_silence(800), _tone(500), _silence(800)])
+        assert detect_silences(audio, SAMPLE_RATE) == []
+
+    def test_empty_input(self):
+        assert detect_silences(np.zeros(0, dtype=np.float32), SAMPLE_RATE) == []
+
+
+class TestFindSceneCuts:
+    def test_picks_longest_pauses_in_order(self):
+        silences = [
+            Silence(1000, 1450),  # sentence gap
+            Silence(3000, 4500),  # scene marker
+            Silence(6000, 6500),  # sentence gap
+            Silence(8000, 9200),  # scene marker
+        ]
+        cuts = find_scene_cuts(silences, n_scenes=3)
+        assert cuts == [(3150, 4350), (8150, 9050)]
+
+    def test_single_scene_needs_no_cuts(self):
+        assert find_scene_cuts([], n_scenes=1) == []
+
+    def test_not_enough_pauses_raises(self):
+        with pytest.raises(ValueError, match="need 2"):
+            find_scene_cuts([Silence(1000, 2000)], n_scenes=3)
+
+    def test_cuts_match_predicted_scene_ends(self):
+        silences = [Silence(3000, 4500), Silence(8000, 9200)]
+        cuts = find_scene_cuts(silences, n_scenes=3, weights=[30, 35, 25], total_ms=12200)
+        assert cuts == [(3150, 4350), (8150, 9050)]
+
+    def test_dramatic_pause_inside_scene_rejected(self):
+        # Scene 1 has a long pause halfway; the real boundary is a shorter gap
+        silences = [Silence(1500, 3500), Silence(4500, 5500)]
+        with pytest.raises(ValueError, match="predicted end of scene 1"):
+            find_scene_cuts(silences, n_scenes=2, weights=[30, 30], total_ms=9000)
+
+    def test_padding_capped_for_short_pauses(self):
+        cuts = find_scene_cuts([Silence(1000, 1200)], n_scenes=2)
+        assert cuts == [(1100, 1100)]
@@ -0,0 +1,135 @@
+"""Tests for store module."""
+
+import hashlib
+import os
+import time
+
+import pytest
+
+import oslo.store as store_module
+from oslo.config import StoreConfig
+from oslo.store import ArtifactStore, file_digest
+
+
+@pytest.fixture()
+def store(tmp_path):
+    return ArtifactStore(tmp_path / "store", quota_bytes=None)
+
+
+def _file(path, content: bytes):
+    path.write_bytes(content)
+    return path
+
+
+def _age(store, digest, seconds):
+    blob = store.blob_path(digest)
+    t = time.time() - seconds
+    os.utime(blob, (t, t))
+
+
+def test_put_is_content_addressed_and_sharded(store, tmp_path):
+    digest = store.put(_file(tmp_path / "a.mp3", b"audio"))
+    assert digest == hashlib.sha256(b"audio").hexdigest()
+    assert store.blob_path(digest) == store.root / "objects" / digest[:2] / digest
+    assert store.blob_path(digest).read_bytes() == b"audio"
+    # Same content, different name: one blob
+    assert store.put(_file(tmp_path / "b.mp3", b"audio")) == digest
+    assert store.stats().blobs == 1
+
+
+def test_put_copies_but_adopt_links(store, tmp_path):
+    copied = _file(tmp_path / "copied.bin", b"one")
+    adopted = _file(tmp_path / "adopted.bin", b"two")
+    store.put(copied)
+    digest = store.adopt(adopted)
+    assert copied.stat().st_nlink == 1
+    assert adopted.stat().st_ino == store.blob_path(digest).stat().st_ino
+    # Shared inodes are read-only so in-place edits cannot corrupt the store
+    assert not adopted.stat().st_mode & 0o222
+
+
+def test_adopt_copies_already_linked_file(store, tmp_path):
+    # A scene image hardlinked from the library's derivative cache
+    derivative = _file(tmp_path / "derivative.png", b"library")
+    scene = tmp_path / "scene_000.png"
+    os.link(derivative, scene)
+    digest = store.adopt(scene)
+    assert derivative.stat().st_mode & 0o200
+    assert scene.stat().st_ino != store.blob_path(digest).stat().st_ino
+    derivative.write_bytes(b"rebuilt")
+
+
+def test_checkout_hardlinks(store, tmp_path):
+    digest = store.put(_file(tmp_path / "a.png", b"image"))
+    (tmp_path / "work").mkdir()
+    dest = store.checkout(digest, tmp_path / "work" / "scene_000.png")
+    assert dest.read_bytes() == b"image"
+    assert dest.stat().st_ino == store.blob_path(digest).stat().st_ino
+
+
+def test_checkout_missing(store, tmp_path):
+    with pytest.raises(KeyError):
+        store.checkout("0" * 64, tmp_path / "x")
+
+
+def test_refs_roundtrip_and_prune(store):
+    store.set_ref("runs/a", {"artifacts": {"video": "x"}})
+    time.sleep(0.01)
+    store.set_ref("runs/b", {"artifacts": {}})
+    assert store.get_ref("runs/a") == {"artifacts": {"video": "x"}}
+    assert store.get_ref("runs/missing") is None
+    assert store.list_refs("runs") == ["runs/a", "runs/b"]
+    assert store.prune_refs("runs", keep=1) == ["runs/a"]
+    assert store.list_refs() == ["runs/b"]
+    with pytest.raises(ValueError):
+        store.set_ref("../escape", {})
+
+
+def test_evict_lru_respects_refs_and_grace(store, tmp_path):
+    old = store.put(_file(tmp_path / "old", b"o" * 100))
+    pinned = store.put(_file(tmp_path / "pinned", b"p" * 100))
+    middle = store.put(_file(tmp_path / "middle", b"m" * 100))
+    fresh = store.put(_file(tmp_path / "fresh", b"f" * 100))
+    _age(store, pinned, 10_000)
+    _age(store, old, 9_000)
+    _age(store, middle, 8_000)
+    store.set_ref("runs/keep", {"artifacts": {"images": [pinned]}})
+
+    freed = store.evict(quota_bytes=250)
+
+    assert freed == 200
+    assert not store.has(old) and not store.has(middle)
+    assert store.has(pinned) and store.has(fresh)
+
+
+def test_evict_under_quota_is_noop(store, tmp_path):
+    digest = store.put(_file(tmp_path / "a", b"x" * 10))
+    _age(store, digest, 10_000)
+    assert store.evict(quota_bytes=100) == 0
+    assert store.has(digest)
+
+
+def test_evict_takes_lock(store, monkeypatch):
+    taken = []
+    monkeypatch.setattr(store_module, "file_lock", lambda p: taken.append(p) or _null())
+    store.evict(quota_bytes=0)
+    assert taken == [store.root / ".lock"]
+
+
+def _null():
+    import contextlib
+
+    return contextlib.nullcontext()
+
+
+def test_from_config(tmp_path, monkeypatch):
+    monkeypatch.setenv("OSLO_CACHE_DIR", str(tmp_path / "cache"))
+    default = ArtifactStore.from_config(StoreConfig())
+    assert default.root == tmp_path / "cache" / "store"
+    custom = ArtifactStore.from_config(StoreConfig(directory=str(tmp_path / "s"), quota_bytes=5))
+    assert (custom.root, custom.quota_bytes) == (tmp_path / "s", 5)
+
+
+def test_file_digest_streams(tmp_path):
+    data = os.urandom(3 << 20)
+    assert file_digest(_file(tmp_path / "big", data)) == hashlib.sha256(data).hexdigest()
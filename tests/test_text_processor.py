@@ -3,7 +3,9 @@
 from oslo.text_processor import (
     Scene,
     _is_cjk_dominant,
+    _merge_short_segments,
     _split_for_subtitles,
+    analyze_text,
     estimate_duration,
     generate_image_prompt,
     split_into_scenes,
@@ -25,6 +27,53 @@ class TestCJKDetection:
         assert not _is_cjk_dominant("")
 
 
+class TestAnalyzeText:
+    def test_counts(self):
+        stats = analyze_text(" AIが変える未来。 Next. ")
+        assert stats.chars == 17
+        assert stats.stripped_chars == 15
+        assert stats.cjk_chars == 7
+        assert stats.space_chars == 3
+        assert stats.words == 2
+        assert stats.sentence_ends == (9, 15)
+
+    def test_segment_length_by_language(self):
+        assert analyze_text("one two three").segment_length == 3
+        assert analyze_text("これはテスト").segment_length == 6
+
+    def test_joined_matches_reanalysis(self):
+        a, b = "これはテストです。", "Second part here."
+        joined = analyze_text(a).joined(analyze_text(b))
+        expected = analyze_text(a + "\n" + b)
+        assert joined.chars == expected.chars
+        assert joined.stripped_chars == expected.stripped_chars
+        assert joined.cjk_chars == expected.cjk_chars
+        assert joined.space_chars == expected.space_chars
+        assert joined.words == expected.words
+
+    def test_scene_stats(self):
+        scene = Scene(index=0, narration_text="これは日本語です。", image_prompt="p")
+        assert scene.stats is analyze_text("これは日本語です。")
+        assert scene.stats.is_cjk
+
+
+class TestMergeShortSegments:
+    def test_short_segments_merged(self):
+        segments = ["Short one.", "Another short.", "word " * 12]
+        assert _merge_short_segments(segments) == [
+            "Short one.\nAnother short.\n" + "word " * 12
+        ]
+
+    def test_short_tail_merged_into_previous(self):
+        long_seg = "word " * 12
+        assert _merge_short_segments([long_seg, long_seg, "Tail."]) == [
+            long_seg, long_seg + "\nTail."
+        ]
+
+    def test_empty(self):
+        assert _merge_short_segments([]) == []
+
+
 class TestEstimateDuration:
     def test_english_estimation(self):
         # 150 words at 150 wpm = 60 seconds
@@ -72,6 +121,12 @@ class TestTruncateToDuration:
         result = truncate_to_duration(text, max_duration=60.0)
         assert result == text
 
+    def test_japanese_truncated_at_sentence_boundary(self):
+        text = "これはテストの文章です。" * 100
+        result = truncate_to_duration(text, max_duration=10.0)
+        assert len(result) <= int((10.0 / 60.0) * 350)
+        assert result.endswith("。")
+
 
 class TestSplitForSubtitles:
     def test_english_splits_on_spaces(self):
@@ -0,0 +1,43 @@
+"""Tests for the TTS client."""
+
+from unittest.mock import patch
+
+import pytest
+
+from oslo.config import TTSConfig
+from oslo.text_processor import Scene
+from oslo.tts import MAX_INPUT_CHARS, TTSClient, tts_request_count
+
+
+def _scenes(count, length):
+    return [Scene(index=i, narration_text="あ" * length, image_prompt="") for i in range(count)]
+
+
+def _fake_speech(text, output_path, instructions=None):
+    output_path.write_bytes(b"mp3")
+    return output_path
+
+
+class TestSingleRequest:
+    def test_combined_rejects_narration_over_limit(self, tmp_path):
+        client = TTSClient("key", TTSConfig(single_request=True))
+        scenes = _scenes(3, MAX_INPUT_CHARS // 2)
+        with patch.object(client, "generate_speech", side_effect=_fake_speech) as speech:
+            with pytest.raises(ValueError, match="request limit"):
+                client.generate_combined(scenes, tmp_path)
+        speech.assert_not_called()
+
+    def test_long_narration_falls_back_to_per_scene(self, tmp_path):
+        client = TTSClient("key", TTSConfig(single_request=True))
+        scenes = _scenes(3, MAX_INPUT_CHARS // 2)
+        with patch.object(client, "generate_speech", side_effect=_fake_speech) as speech:
+            paths = client.generate_all_scenes(scenes, tmp_path)
+        assert [p.name for p in paths] == [f"scene_{i:03d}.mp3" for i in range(3)]
+        assert speech.call_count == 3
+        assert all(len(c.args[0]) == MAX_INPUT_CHARS // 2 for c in speech.call_args_list)
+
+    def test_request_count(self):
+        single = TTSConfig(single_request=True)
+        assert tts_request_count(_scenes(3, 10), single) == 1
+        assert tts_request_count(_scenes(3, MAX_INPUT_CHARS // 2), single) == 3
+        assert tts_request_count(_scenes(3, 10), TTSConfig()) == 3